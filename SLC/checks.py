@@ -0,0 +1,62 @@
+# SLC/checks.py
+
+"""
+Systemchecks für die Datenbankverbindung (persistente Verbindungen / psycopg-Pool).
+Registriert in accounts.apps.AccountsConfig.ready().
+"""
+
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.core.checks import Error, Warning, Tags, register
+from django.db import connections
+
+
+@register()
+def check_database_connection_settings(app_configs, **kwargs):
+    errors = []
+
+    for alias, db in settings.DATABASES.items():
+        pool = (db.get("OPTIONS") or {}).get("pool")
+        if not pool:
+            if not db.get("CONN_MAX_AGE"):
+                errors.append(Warning(
+                    f"Datenbank '{alias}': weder Pool noch persistente Verbindungen aktiv.",
+                    hint="DB_CONN_MAX_AGE > 0 oder DB_POOL=True setzen.",
+                    id="slc.W001",
+                ))
+            continue
+
+        if "postgresql" not in db.get("ENGINE", ""):
+            errors.append(Error(
+                f"Datenbank '{alias}': Connection-Pool wird nur mit PostgreSQL unterstützt.",
+                id="slc.E001",
+            ))
+        if find_spec("psycopg_pool") is None:
+            errors.append(Error(
+                f"Datenbank '{alias}': DB_POOL ist aktiv, aber psycopg_pool ist nicht installiert.",
+                hint='pip install "psycopg[pool]"',
+                id="slc.E002",
+            ))
+        if db.get("CONN_MAX_AGE"):
+            errors.append(Error(
+                f"Datenbank '{alias}': CONN_MAX_AGE muss bei aktivem Pool 0 sein.",
+                id="slc.E003",
+            ))
+
+    return errors
+
+
+@register(Tags.database)
+def check_database_reachable(app_configs, databases=None, **kwargs):
+    # Läuft nur, wenn Checks mit Datenbanken angefordert werden (z. B. migrate, check --database)
+    errors = []
+    for alias in databases or ():
+        try:
+            connections[alias].ensure_connection()
+        except Exception as exc:
+            errors.append(Error(
+                f"Datenbank '{alias}' nicht erreichbar: {exc}",
+                id="slc.E004",
+            ))
+    return errors
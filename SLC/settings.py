@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from django.contrib.messages import constants as messages
+from django.core.exceptions import ImproperlyConfigured
 import environ
 import os
 
@@ -57,6 +58,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.humanize',
+    'django.contrib.postgres',
 
     'django_extensions',
     'import_export',
@@ -78,10 +80,10 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
 
+    'accounts.middleware.SessionRefreshMiddleware',
     'accounts.middleware.LoginRequiredMiddleware',
 
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "debug_toolbar.middleware.DebugToolbarMiddleware",
 ]
@@ -120,6 +122,80 @@ DATABASES = {
 # Optional: Falls DATABASE_URL fehlt
 DATABASES['default'].setdefault('ENGINE', 'django.db.backends.postgresql')
 
+# Verbindungen wiederverwenden: entweder psycopg-Pool (DB_POOL=True, benötigt psycopg[pool])
+# oder persistente Verbindungen je Worker (CONN_MAX_AGE). Beides zusammen geht nicht.
+if env.bool("DB_POOL", default=False):
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        "min_size": env.int("DB_POOL_MIN_SIZE", default=1),
+        "max_size": env.int("DB_POOL_MAX_SIZE", default=4),   # je Gunicorn-Worker
+        "timeout": env.int("DB_POOL_TIMEOUT", default=10),
+        "max_idle": env.int("DB_POOL_MAX_IDLE", default=300),
+    }
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = env.int("DB_CONN_MAX_AGE", default=60)
+
+# Wiederverwendete Verbindungen vor der Nutzung prüfen (z. B. nach DB-Neustart)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = env.bool("DB_CONN_HEALTH_CHECKS", default=True)
+
+
+# --- Cache ---
+# Gemeinsamer Cache für alle Gunicorn-Worker. CACHE_URL im django-environ-Format, z. B.
+#   filecache:///var/www/SLC/cache   (Standard: <BASE_DIR>/cache)
+#   dbcache://slc_cache              (vorher: python manage.py createcachetable)
+#   rediscache://127.0.0.1:6379/1    (benötigt das Paket "redis")
+if env("CACHE_URL", default=""):
+    CACHES = {"default": env.cache("CACHE_URL")}
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": BASE_DIR / "cache",
+        }
+    }
+CACHES["default"].setdefault("TIMEOUT", env.int("CACHE_TIMEOUT", default=300))
+CACHES["default"].setdefault("KEY_PREFIX", env("CACHE_KEY_PREFIX", default="slc"))
+
+# Datei-/Speicher-Cache klein halten: FileBasedCache durchsucht bei jedem set() das ganze
+# Verzeichnis (_cull). Beim Überlauf nur 1/CULL_FREQUENCY der Einträge löschen.
+if CACHES["default"]["BACKEND"].endswith(("FileBasedCache", "LocMemCache")):
+    CACHES["default"].setdefault("OPTIONS", {})
+    CACHES["default"]["OPTIONS"].setdefault("MAX_ENTRIES", env.int("CACHE_MAX_ENTRIES", default=3000))
+    CACHES["default"]["OPTIONS"].setdefault("CULL_FREQUENCY", env.int("CACHE_CULL_FREQUENCY", default=10))
+
+# PV-Texte und PV-Diffs (je Seite und Befragtengruppe, viele Einträge, set_many über ganze
+# Umfragen) in eigenem Cache: Standard ist eine DB-Tabelle (per Migration angelegt),
+# alternativ z. B. rediscache://127.0.0.1:6379/2
+CACHES["pv"] = env.cache("PV_CACHE_URL", default="dbcache://slc_pv_cache")
+CACHES["pv"].setdefault("TIMEOUT", CACHES["default"]["TIMEOUT"])
+CACHES["pv"].setdefault("KEY_PREFIX", CACHES["default"]["KEY_PREFIX"])
+if CACHES["pv"]["BACKEND"].endswith(("DatabaseCache", "FileBasedCache", "LocMemCache")):
+    CACHES["pv"].setdefault("OPTIONS", {})
+    CACHES["pv"]["OPTIONS"].setdefault("MAX_ENTRIES", env.int("PV_CACHE_MAX_ENTRIES", default=100000))
+    CACHES["pv"]["OPTIONS"].setdefault("CULL_FREQUENCY", env.int("CACHE_CULL_FREQUENCY", default=10))
+
+# Versionszähler der Cache-Namensräume (SLC/slc_cache.py) getrennt von den Daten ablegen,
+# damit sie beim Ausdünnen des Daten-Caches nicht mitgelöscht werden. Ein Zähler je
+# Namensraum: die Obergrenze von 100000 Einträgen wird nie erreicht, also nie ausgedünnt.
+if env("CACHE_VERSIONS_URL", default=""):
+    CACHES["versions"] = env.cache("CACHE_VERSIONS_URL")
+else:
+    CACHES["versions"] = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache-versions",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    }
+CACHES["versions"].setdefault("TIMEOUT", None)
+CACHES["versions"].setdefault("KEY_PREFIX", CACHES["default"]["KEY_PREFIX"])
+
+
+# --- Suche ---
+# Fragen- und Variablen-Zweig der Hauptsuche parallel ausführen (je Zweig eine eigene
+# DB-Verbindung); nach SEARCH_BRANCH_TIMEOUT Sekunden werden Teilergebnisse angezeigt
+SEARCH_PARALLEL = env.bool("SEARCH_PARALLEL", default=True)
+SEARCH_BRANCH_TIMEOUT = env.int("SEARCH_BRANCH_TIMEOUT", default=10)
+SEARCH_MAX_THREADS = env.int("SEARCH_MAX_THREADS", default=4)
+
 
 # --- Auth Settings ---
 LOGIN_URL = "login"
@@ -128,7 +204,17 @@ LOGOUT_REDIRECT_URL = "login"
 
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 SESSION_COOKIE_AGE = 60 * 60    # automatic logout after 1 hour of inactivity
-SESSION_SAVE_EVERY_REQUEST = True
+
+# Session nicht bei jedem Request speichern: SessionRefreshMiddleware verlängert sie
+# höchstens alle SESSION_REFRESH_INTERVAL Sekunden
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_INTERVAL = env.int("SESSION_REFRESH_INTERVAL", default=5 * 60)
+
+# Session-Backend: db (Standard), cached_db, cache oder signed_cookies
+SESSION_BACKEND = env("SESSION_BACKEND", default="db")
+if SESSION_BACKEND not in {"db", "cached_db", "cache", "signed_cookies"}:
+    raise ImproperlyConfigured(f"Unbekanntes SESSION_BACKEND: {SESSION_BACKEND!r}")
+SESSION_ENGINE = f"django.contrib.sessions.backends.{SESSION_BACKEND}"
 
 
 
@@ -0,0 +1,143 @@
+# SLC/slc_cache.py
+
+"""
+Gemeinsame Cache-Helfer für alle Apps.
+
+- Schlüssel sind nach Namensräumen getrennt (`<namespace>:v<version>:<teile>`, das globale
+  Präfix setzt CACHES["default"]["KEY_PREFIX"]).
+- Jeder Namensraum hat eine Versionsnummer; `bump()` erhöht sie und macht damit alle
+  Einträge des Namensraums auf einen Schlag ungültig (auch in anderen Workern).
+  Die Zähler liegen im eigenen Cache-Alias "versions", der nicht mit den Daten ausgedünnt wird.
+  Geht ein Zähler trotzdem verloren, startet er mit der aktuellen Zeit neu und kann so
+  nie auf eine frühere Version zurückfallen.
+- `get_or_build()` schützt teure Builder gegen Cache-Stampedes (best effort, siehe dort).
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Optional
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+# Alias für die Versionszähler (Fallback: default)
+VERSIONS_ALIAS = "versions"
+
+# Lebensdauer der Versionszähler (praktisch unbegrenzt)
+_VERSION_TIMEOUT = None
+
+# Stampede-Schutz
+LOCK_TIMEOUT = 30        # Sekunden, nach denen eine Rebuild-Sperre verfällt
+WAIT_TIMEOUT = 2.0       # Sekunden, die ohne Wert auf einen fremden Rebuild gewartet wird
+_WAIT_STEP = 0.05
+
+
+def _versions():
+    try:
+        return caches[VERSIONS_ALIAS]
+    except InvalidCacheBackendError:
+        return cache
+
+
+def _version_key(namespace: str) -> str:
+    return f"{namespace}:version"
+
+
+def _fresh_version() -> int:
+    # Monoton steigend: ein neu angelegter Zähler liegt immer über allen früheren Versionen
+    return int(time.time())
+
+
+def namespace_version(namespace: str) -> int:
+    versions = _versions()
+    version = versions.get(_version_key(namespace))
+    if version is None:
+        # add() statt set(): parallele Initialisierung überschreibt kein bump()
+        fresh = _fresh_version()
+        versions.add(_version_key(namespace), fresh, _VERSION_TIMEOUT)
+        version = versions.get(_version_key(namespace)) or fresh
+    return version
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    """
+    Versionierter Schlüssel im Namensraum.
+    """
+    suffix = ":".join(str(p) for p in parts)
+    return f"{namespace}:v{namespace_version(namespace)}:{suffix}"
+
+
+def bump(namespace: str) -> None:
+    """
+    Alle Einträge des Namensraums ungültig machen.
+    """
+    versions = _versions()
+    try:
+        versions.incr(_version_key(namespace))
+    except ValueError:
+        # Zähler existiert (noch) nicht oder ist verdrängt worden
+        versions.set(_version_key(namespace), _fresh_version(), _VERSION_TIMEOUT)
+
+
+def _soft_expiry(timeout: Optional[int]) -> Optional[float]:
+    return None if timeout is None else time.time() + timeout
+
+
+def _hard_timeout(timeout: Optional[int]) -> Optional[int]:
+    # abgelaufene Werte bleiben noch eine Weile liegen, damit sie während eines Rebuilds
+    # ausgeliefert werden können
+    return None if timeout is None else timeout * 2
+
+
+def get_or_build(
+    namespace: str,
+    *parts: Any,
+    builder: Callable[[], Any],
+    timeout: Optional[int] = 300,
+) -> Any:
+    """
+    Wert aus dem Cache holen oder mit `builder()` erzeugen.
+
+    Stampede-Schutz (best effort):
+    - Ist der Wert abgelaufen, baut ihn in der Regel nur ein Prozess neu (Sperre per
+      cache.add), alle anderen liefern solange den alten Wert aus.
+    - Fehlt der Wert ganz, warten andere Prozesse bis zu WAIT_TIMEOUT auf den Rebuild
+      und bauen danach notfalls selbst.
+    cache.add ist nur bei Redis/Memcached/DB-Cache atomar; beim Datei-Cache können
+    vereinzelt zwei Prozesse gleichzeitig bauen. Der Builder muss das vertragen.
+    """
+    key = make_key(namespace, *parts)
+    lock_key = f"{key}:lock"
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, soft_expiry = entry
+        if soft_expiry is None or soft_expiry > time.time():
+            return value
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            return value  # ein anderer Prozess baut gerade neu
+        return _rebuild(key, lock_key, builder, timeout)
+
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        return _rebuild(key, lock_key, builder, timeout)
+
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(_WAIT_STEP)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+
+    value = builder()
+    cache.set(key, (value, _soft_expiry(timeout)), _hard_timeout(timeout))
+    return value
+
+
+def _rebuild(key: str, lock_key: str, builder: Callable[[], Any], timeout: Optional[int]) -> Any:
+    try:
+        value = builder()
+        cache.set(key, (value, _soft_expiry(timeout)), _hard_timeout(timeout))
+        return value
+    finally:
+        cache.delete(lock_key)
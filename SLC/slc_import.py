@@ -0,0 +1,329 @@
+# SLC/slc_import.py
+
+"""
+Gemeinsame Bausteine für schnelle Importe (django-import-export) der Altdaten.
+
+- `CachedForeignKeyWidget` / `CachedManyToManyWidget` laden die Zuordnung
+  legacy_id -> Objekt einmal pro Import statt einer Query pro Zeile.
+- `BulkImportMixin` lädt vorhandene Datensätze einmal vorab (statt `get()` pro Zeile)
+  und schreibt M2M-Felder gesammelt per bulk_create in die Zwischentabelle,
+  weil import-export im Bulk-Modus keine M2M-Felder speichert.
+- Bei geänderten Datensätzen setzt `BulkImportMixin` die auto_now-Felder selbst, weil
+  `QuerySet.bulk_update` sie (anders als save()) nicht aktualisiert.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.utils import timezone
+from import_export.widgets import ForeignKeyWidget, Widget
+
+# Standard-Batchgröße für use_bulk
+BULK_BATCH_SIZE = 1000
+
+# Abfragen mit __in werden in Blöcken dieser Größe gestellt
+_IN_CHUNK = 5000
+
+# Präfix für Instanz-Attribute, in denen M2M-Werte bis zum Bulk-Insert zwischengespeichert werden
+BULK_M2M_PREFIX = "_bulk_m2m_"
+
+
+def bulk_m2m_attribute(name: str) -> str:
+    return f"{BULK_M2M_PREFIX}{name}"
+
+
+def _norm(value: Any) -> Optional[str]:
+    """
+    Vergleichbarer Schlüssel für Legacy-IDs aus Excel/CSV (1, "1", 1.0, " 1 " -> "1").
+    """
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    if text.endswith(".0") and text[:-2].lstrip("-").isdigit():
+        text = text[:-2]
+    return text or None
+
+
+def _chunks(values: list, size: int = _IN_CHUNK):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class _LegacyLookupMixin:
+    """
+    Zuordnung Schlüsselwert -> Objekt (nur pk + Schlüsselfeld), einmal pro Import geladen.
+    """
+
+    def lookup_queryset(self):
+        return self.model._default_manager.all()
+
+    def lookup(self) -> dict[str, Any]:
+        if getattr(self, "_lookup", None) is None:
+            qs = self.lookup_queryset().only("pk", self.field)
+            self._lookup = {
+                _norm(getattr(obj, self.field)): obj
+                for obj in qs.iterator(chunk_size=_IN_CHUNK)
+            }
+        return self._lookup
+
+    def by_pk(self) -> dict[Any, Any]:
+        if getattr(self, "_by_pk", None) is None:
+            self._by_pk = {obj.pk: obj for obj in self.lookup().values()}
+        return self._by_pk
+
+    def reset(self) -> None:
+        self._lookup = None
+        self._by_pk = None
+
+
+class CachedForeignKeyWidget(_LegacyLookupMixin, ForeignKeyWidget):
+    """
+    ForeignKeyWidget mit vorab geladener Zuordnung statt einer Query pro Zeile.
+    """
+
+    def lookup_queryset(self):
+        return self.get_queryset(None, None)
+
+    def clean(self, value, row=None, **kwargs):
+        key = _norm(value)
+        if key is None:
+            return None
+        obj = self.lookup().get(key)
+        if obj is None:
+            raise ValueError(f"{self.model._meta.verbose_name} mit {self.field}={key} nicht gefunden.")
+        return obj
+
+
+class CachedManyToManyWidget(_LegacyLookupMixin, Widget):
+    """
+    Ersatz für ManyToManyWidget mit vorab geladener Zuordnung.
+
+    Liefert die sortierten Primärschlüssel (Tupel) statt eines QuerySets, damit
+    `BulkImportMixin` sie vergleichen und gesammelt speichern kann. Bewusst keine
+    Unterklasse von ManyToManyWidget: import-export würde das Feld sonst selbst
+    zeilenweise per .set() speichern. Unbekannte Werte werden wie dort ignoriert.
+    """
+
+    def __init__(self, model, field="pk", separator=",", **kwargs):
+        self.model = model
+        self.field = field
+        self.separator = separator
+        super().__init__(**kwargs)
+
+    def clean(self, value, row=None, **kwargs):
+        if value in (None, ""):
+            return ()
+        if isinstance(value, (float, int)):
+            parts = [value]
+        else:
+            parts = str(value).split(self.separator)
+        lookup = self.lookup()
+        pks = {lookup[k].pk for k in map(_norm, parts) if k in lookup}
+        return tuple(sorted(pks))
+
+    def render(self, value, obj=None, **kwargs):
+        if not value:
+            return ""
+        by_pk = self.by_pk()
+        return self.separator.join(
+            str(getattr(by_pk[pk], self.field)) for pk in value if pk in by_pk
+        )
+
+
+class BulkImportMixin:
+    """
+    Mixin für ModelResources, die große Altdatenbestände importieren.
+
+    - Vorhandene Datensätze werden einmal pro Import anhand der import_id_fields geladen.
+    - Alle Cached*-Widgets werden zu Beginn jedes Imports zurückgesetzt.
+    - M2M-Felder aus `bulk_m2m_fields` werden am Ende gesammelt in die Zwischentabelle
+      geschrieben. Das Resource-Feld muss dafür `attribute=bulk_m2m_attribute(name)` und
+      ein `CachedManyToManyWidget` verwenden (Export über `dehydrate_<name>`).
+
+    Im Bulk-Modus laufen weder save() noch post_save-Signale der Models. auto_now-Felder
+    (z. B. updated_at, Grundlage des PV-Stempels) werden bei geänderten Zeilen hier gesetzt.
+    """
+
+    bulk_m2m_fields: tuple[str, ...] = ()
+
+    def before_import(self, dataset, **kwargs):
+        super().before_import(dataset, **kwargs)
+        for field in self.fields.values():
+            if hasattr(field.widget, "reset"):
+                field.widget.reset()
+        self._bulk_m2m_pending = []
+        self._instance_cache = self._load_instances(dataset)
+
+    # --- Vorhandene Datensätze -------------------------------------------
+
+    def _id_fields(self):
+        return [self.fields[name] for name in self.get_import_id_fields()]
+
+    def _instance_key(self, values) -> Optional[tuple]:
+        key = tuple(_norm(v.pk if hasattr(v, "_meta") else v) for v in values)
+        return None if any(k is None for k in key) else key
+
+    def _row_key(self, row) -> Optional[tuple]:
+        return self._instance_key(field.clean(row) for field in self._id_fields())
+
+    def _load_instances(self, dataset) -> Optional[dict[tuple, Any]]:
+        id_fields = self._id_fields()
+        try:
+            keys = {self._row_key(row) for row in dataset.dict}
+        except (KeyError, ValueError):
+            # Spalte fehlt oder Wert ungültig: Fehler meldet der reguläre Zeilenimport
+            return None
+        keys.discard(None)
+
+        model_opts = self._meta.model._meta
+        attnames = [model_opts.get_field(f.attribute).attname for f in id_fields]
+
+        # Nach dem ersten ID-Feld vorfiltern, dann über den vollständigen Schlüssel zuordnen
+        first_values = sorted({k[0] for k in keys})
+        cache: dict[tuple, Any] = {}
+        for chunk in _chunks(first_values):
+            qs = self.get_queryset().filter(**{f"{attnames[0]}__in": chunk})
+            for obj in qs:
+                key = self._instance_key(getattr(obj, a) for a in attnames)
+                if key in keys:
+                    cache[key] = obj
+
+        self._prime_relations(list(cache.values()))
+        self._preload_m2m(list(cache.values()))
+        return cache
+
+    def _prime_relations(self, instances) -> None:
+        # Fremdschlüssel der geladenen Datensätze aus den Widget-Zuordnungen setzen,
+        # damit skip_unchanged beim Vergleich keine Query pro Zeile auslöst
+        model_opts = self._meta.model._meta
+        for field in self.fields.values():
+            if not isinstance(field.widget, CachedForeignKeyWidget) or not field.attribute:
+                continue
+            model_field = model_opts.get_field(field.attribute)
+            by_pk = field.widget.by_pk()
+            for obj in instances:
+                related_id = getattr(obj, model_field.attname)
+                if related_id is None or related_id in by_pk:
+                    model_field.set_cached_value(obj, by_pk.get(related_id))
+
+    def get_instance(self, instance_loader, row):
+        if getattr(self, "_instance_cache", None) is None:
+            return super().get_instance(instance_loader, row)
+        return self._instance_cache.get(self._row_key(row))
+
+    # --- auto_now bei bulk_update ----------------------------------------
+
+    def _auto_now_fields(self):
+        return [
+            f for f in self._meta.model._meta.concrete_fields
+            if getattr(f, "auto_now", False)
+        ]
+
+    def before_save_instance(self, instance, row, **kwargs):
+        super().before_save_instance(instance, row, **kwargs)
+        # Neue Zeilen bekommen auto_now über bulk_create, geänderte nicht
+        if not instance._state.adding:
+            now = timezone.now()
+            for field in self._auto_now_fields():
+                setattr(instance, field.attname, now)
+
+    def get_bulk_update_fields(self):
+        # Nur konkrete Model-Felder (ohne PK, Import-IDs und M2M-Zwischenspeicher),
+        # dazu die auto_now-Felder
+        model_opts = self._meta.model._meta
+        id_attrs = {field.attribute for field in self._id_fields()}
+        names = []
+        for field in self.fields.values():
+            attr = field.attribute
+            if not attr or attr in id_attrs or "__" in attr:
+                continue
+            try:
+                model_field = model_opts.get_field(attr)
+            except FieldDoesNotExist:
+                continue
+            if model_field.primary_key or not model_field.concrete or model_field.many_to_many:
+                continue
+            if model_field.name not in names:
+                names.append(model_field.name)
+        for field in self._auto_now_fields():
+            if field.name not in names:
+                names.append(field.name)
+        return names
+
+    # --- M2M gesammelt speichern -----------------------------------------
+
+    def _m2m_through(self, name):
+        m2m = self._meta.model._meta.get_field(name)
+        through = m2m.remote_field.through
+        source = through._meta.get_field(m2m.m2m_field_name()).attname
+        target = through._meta.get_field(m2m.m2m_reverse_field_name()).attname
+        return through, source, target
+
+    def _preload_m2m(self, instances) -> None:
+        # Aktuelle M2M-Werte an die Instanzen hängen, damit skip_unchanged ohne Queries vergleicht
+        if not self.bulk_m2m_fields or not instances:
+            return
+        by_pk = {obj.pk: obj for obj in instances}
+        for name in self.bulk_m2m_fields:
+            through, source, target = self._m2m_through(name)
+            current: dict[int, set] = {pk: set() for pk in by_pk}
+            for chunk in _chunks(list(by_pk)):
+                for src, tgt in through.objects.filter(**{f"{source}__in": chunk}).values_list(source, target):
+                    current[src].add(tgt)
+            for pk, obj in by_pk.items():
+                setattr(obj, bulk_m2m_attribute(name), tuple(sorted(current[pk])))
+
+    def after_save_instance(self, instance, row, **kwargs):
+        super().after_save_instance(instance, row, **kwargs)
+        if self.bulk_m2m_fields:
+            self._bulk_m2m_pending.append(instance)
+
+    def after_import(self, dataset, result, **kwargs):
+        super().after_import(dataset, result, **kwargs)
+        pending = [obj for obj in getattr(self, "_bulk_m2m_pending", ()) if obj.pk is not None]
+        # Probelauf ohne Transaktion: nichts schreiben
+        if kwargs.get("dry_run") and not kwargs.get("using_transactions"):
+            pending = []
+        if pending:
+            with transaction.atomic():
+                for name in self.bulk_m2m_fields:
+                    self._write_m2m(name, pending)
+        self._bulk_m2m_pending = []
+        self._instance_cache = None
+
+    def _write_m2m(self, name, instances) -> None:
+        attr = bulk_m2m_attribute(name)
+        desired = {
+            obj.pk: set(getattr(obj, attr))
+            for obj in instances
+            if getattr(obj, attr, None) is not None
+        }
+        if not desired:
+            return
+
+        through, source, target = self._m2m_through(name)
+        stale_ids = []
+        existing = set()
+        for chunk in _chunks(list(desired)):
+            rows = through.objects.filter(**{f"{source}__in": chunk}).values_list("pk", source, target)
+            for pk, src, tgt in rows:
+                if tgt in desired[src]:
+                    existing.add((src, tgt))
+                else:
+                    stale_ids.append(pk)
+
+        for chunk in _chunks(stale_ids):
+            through.objects.filter(pk__in=chunk).delete()
+
+        new_rows = [
+            through(**{source: src, target: tgt})
+            for src, targets in desired.items()
+            for tgt in targets
+            if (src, tgt) not in existing
+        ]
+        through.objects.bulk_create(new_rows, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
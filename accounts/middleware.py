@@ -1,10 +1,26 @@
 # accounts/middleware.py
 
+import re
+import time
+from functools import cached_property
 from urllib.parse import quote
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
 from django.shortcuts import redirect
-from django.urls import resolve, reverse
+from django.urls import Resolver404, URLPattern, URLResolver, get_resolver, resolve, reverse
+
+
+# Helper: alle URL-Patterns mit vollständigem View-Namen (inkl. Namespace, z. B. "app:view")
+# und vollständiger Regex (inkl. include-Präfixe) durchlaufen
+def _iter_url_patterns(patterns, prefix="", namespace=""):
+    for p in patterns:
+        regex = p.pattern.regex.pattern.lstrip("^")
+        if isinstance(p, URLResolver):
+            ns = f"{namespace}{p.namespace}:" if p.namespace else namespace
+            yield from _iter_url_patterns(p.url_patterns, prefix + regex, ns)
+        elif isinstance(p, URLPattern) and p.name:
+            yield f"{namespace}{p.name}", prefix + regex
 
 
 class LoginRequiredMiddleware:
@@ -14,62 +30,160 @@ class LoginRequiredMiddleware:
     Logik:
     - Authentifizierte Nutzer dürfen alle Seiten sehen
     - Unauthentifizierte Nutzer:
-        * dürfen nur Whitelist-Views (z. B. login) + admin + debug + static/media in DEBUG
+        * dürfen nur Whitelist-Views (z. B. login) + admin + debug + static (+ media in DEBUG)
+        * nicht auflösbare Pfade werden normal weitergereicht (404)
         * alles andere wird auf LOGIN_URL mit ?next=... umgeleitet.
+
+    Öffentliche Pfad-Präfixe und die Whitelist werden einmal vorberechnet
+    (exakte Pfade bzw. kompilierte Patterns). Aufgelöst wird nur noch bei
+    unangemeldeten Requests kurz vor der Umleitung.
+    Läuft synchron (WSGI) und asynchron (ASGI) ohne Thread-Wechsel.
     """
 
+    sync_capable = True
+    async_capable = True
+
+    # View-Namen (mit Namespace, falls vorhanden: "app:view"), die ohne Login erreichbar sein dürfen
+    whitelisted_view_names = frozenset({
+        "login",                    # Login-Seite
+        "password_reset",           # Formular "Passwort vergessen?"
+        "password_reset_done",      # "Mail wurde verschickt"
+        "password_reset_confirm",   # Link aus der Mail (Token-Seite)
+        "password_reset_complete",  # "Passwort geändert"
+        # hier können weitere View-Namen ergänzt werden
+    })
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+        # 1) Admin und Debug-Toolbar nie blockieren, Static immer, Media nur im DEBUG-Modus
+        prefixes = ["/admin/", "/__debug__/", "/favicon.ico", "/robots.txt"]
+        if settings.STATIC_URL:
+            prefixes.append(self._absolute(settings.STATIC_URL))
+        if settings.DEBUG and settings.MEDIA_URL:
+            prefixes.append(self._absolute(settings.MEDIA_URL))
+        self.public_prefixes = tuple(prefixes)
+
+    @staticmethod
+    def _absolute(url):
+        return url if url.startswith("/") else f"/{url}"
+
+    @cached_property
+    def _whitelist(self):
+        # Beim ersten anonymen Request berechnet (URLconf muss geladen sein):
+        # Patterns ohne Parameter als exakte Pfade, übrige als kompilierte Regex
+        exact = set()
+        regexes = []
+        for name, regex in _iter_url_patterns(get_resolver().url_patterns):
+            if name not in self.whitelisted_view_names:
+                continue
+            try:
+                exact.add(reverse(name))
+            except Exception:
+                regexes.append(re.compile(regex))
+        return frozenset(exact), tuple(regexes)
+
+    def _is_public(self, path):
+        if path.startswith(self.public_prefixes):
+            return True
+        exact, regexes = self._whitelist
+        if path in exact:
+            return True
+        relative = path[1:]
+        return any(r.match(relative) for r in regexes)
+
+    @staticmethod
+    def _resolves(path):
+        try:
+            resolve(path)
+        except Resolver404:
+            return False
+        return True
+
+    def _login_redirect(self, request):
+        login_url = reverse(settings.LOGIN_URL)
+        return redirect(f"{login_url}?next={quote(request.get_full_path())}")
 
-        # View-Namen, die ohne Login erreichbar sein dürfen
-        self.whitelisted_view_names = {
-            "login",                    # Login-Seite
-            "password_reset",           # Formular "Passwort vergessen?"
-            "password_reset_done",      # "Mail wurde verschickt"
-            "password_reset_confirm",   # Link aus der Mail (Token-Seite)
-            "password_reset_complete",  # "Passwort geändert"
-            # hier können weitere View-Namen ergänzt werden
-        }
+    def _has_session_cookie(self, request):
+        # Hat der Browser ein Session-Cookie, obwohl der User jetzt anonym ist?
+        return settings.SESSION_COOKIE_NAME in request.COOKIES
 
     def __call__(self, request):
-        path = request.path
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
 
-        # 1) Admin und Debug-Toolbar nie blockieren
-        if path.startswith("/admin/") or path.startswith("/__debug__/"):
+        if self._is_public(request.path) or request.user.is_authenticated:
             return self.get_response(request)
 
-        # 2) Static/Media-Dateien im DEBUG-Modus durchlassen
-        if settings.DEBUG:
-            if settings.STATIC_URL and path.startswith(settings.STATIC_URL):
-                return self.get_response(request)
-            if settings.MEDIA_URL and path.startswith(settings.MEDIA_URL):
-                return self.get_response(request)
-
-        # 3) Wenn der Nutzer eingeloggt ist → nichts zu tun
-        if request.user.is_authenticated:
+        # Für nicht auflösbare Pfade: Anfrage normal weiterreichen (404)
+        if not self._resolves(request.path):
             return self.get_response(request)
 
-        # 4) Unangemeldet: Prüfen, ob die View auf der Whitelist steht
-        try:
-            match = resolve(path)
-        except Exception:
-            # Für nicht auflösbare Pfade (404 etc.): Anfrage normal weiterreichen
-            return self.get_response(request)
+        if self._has_session_cookie(request):
+            # Flag in der (neuen) Session setzen:
+            request.session["slc_session_expired"] = True
 
-        if match.url_name in self.whitelisted_view_names:
-            return self.get_response(request)
+        return self._login_redirect(request)
 
-        # 5) Ansonsten: auf Login umleiten, next=aktueller Pfad
-        login_url = reverse(settings.LOGIN_URL)
-        full_path = request.get_full_path()
+    async def __acall__(self, request):
+        if self._is_public(request.path):
+            return await self.get_response(request)
 
-        # Hat der Browser ein Session-Cookie, obwohl der User jetzt anonym ist?
-        session_cookie_name = settings.SESSION_COOKIE_NAME
-        has_session_cookie = session_cookie_name in request.COOKIES
+        user = await request.auser()
+        if user.is_authenticated or not self._resolves(request.path):
+            return await self.get_response(request)
+
+        if self._has_session_cookie(request):
+            await request.session.aset("slc_session_expired", True)
+
+        return self._login_redirect(request)
 
-        if has_session_cookie:
-            # Flag in der (neuen) Session setzen:
-            request.session["slc_session_expired"] = True
 
-        return redirect(f"{login_url}?next={quote(full_path)}")
+class SessionRefreshMiddleware:
+    """
+    Verlängert die Session eingeloggter Nutzer höchstens alle
+    SESSION_REFRESH_INTERVAL Sekunden (statt SESSION_SAVE_EVERY_REQUEST).
+
+    Die Inaktivitäts-Abmeldung nach SESSION_COOKIE_AGE bleibt erhalten, kann aber
+    bis zu SESSION_REFRESH_INTERVAL früher greifen. Autocomplete & Co. lösen so keinen
+    Session-Schreibzugriff pro Request mehr aus.
+
+    Muss nach SessionMiddleware und AuthenticationMiddleware stehen.
+    """
 
+    sync_capable = True
+    async_capable = True
+
+    SESSION_KEY = "_slc_session_refreshed_at"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.interval = getattr(settings, "SESSION_REFRESH_INTERVAL", 5 * 60)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if request.user.is_authenticated:
+            now = int(time.time())
+            last = request.session.get(self.SESSION_KEY, 0)
+            if now - last >= self.interval:
+                # Änderung markiert die Session als modified -> SessionMiddleware speichert
+                # sie und setzt das Ablaufdatum neu
+                request.session[self.SESSION_KEY] = now
+
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        user = await request.auser()
+        if user.is_authenticated:
+            now = int(time.time())
+            last = await request.session.aget(self.SESSION_KEY, 0)
+            if now - last >= self.interval:
+                await request.session.aset(self.SESSION_KEY, now)
+
+        return await self.get_response(request)
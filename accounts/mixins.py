@@ -1,4 +1,5 @@
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.core.exceptions import PermissionDenied
 
 class EditorRequiredMixin(LoginRequiredMixin, PermissionRequiredMixin):
     """
@@ -6,3 +7,17 @@ class EditorRequiredMixin(LoginRequiredMixin, PermissionRequiredMixin):
     """
     permission_required = "accounts.can_edit_slc"
     raise_exception = True  # -> 403 
+
+
+class AsyncEditorRequiredMixin:
+    """
+    Wie EditorRequiredMixin, aber für async Views (ohne synchronen Zugriff auf request.user).
+    Nicht angemeldet oder ohne Editor-Recht -> 403.
+    """
+    permission_required = "accounts.can_edit_slc"
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated or not await user.ahas_perm(self.permission_required):
+            raise PermissionDenied
+        return await super().dispatch(request, *args, **kwargs)
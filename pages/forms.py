@@ -1,7 +1,10 @@
 from django.core.validators import FileExtensionValidator
 
+from functools import cached_property
+
 from django import forms
 from django.forms import formset_factory, BaseFormSet
+from django.forms.models import ModelChoiceIterator
 
 from django.core.exceptions import ValidationError
 
@@ -258,10 +261,116 @@ class WavePageContentForm(forms.ModelForm):
 
 
 
+# Einmal geladene Auswahlobjekte, die sich alle Forms eines Formsets teilen
+class PreloadedChoices:
+    """
+    Wertet ein QuerySet höchstens einmal aus und stellt Objekte, PK-Map und
+    fertige Choices für beliebig viele Felder bereit (Rendern und Validieren ohne weitere Queries).
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    @cached_property
+    def objects(self):
+        return list(self.queryset)
+
+    @cached_property
+    def by_pk(self):
+        return {str(obj.pk): obj for obj in self.objects}
+
+    @cached_property
+    def pks(self):
+        return {obj.pk for obj in self.objects}
+
+    def get(self, value):
+        if isinstance(value, self.queryset.model):
+            value = value.pk
+        return self.by_pk.get(str(value))
+
+    def choices_for(self, iterator):
+        # Labels werden einmal berechnet und von allen Forms wiederverwendet
+        if "_choices" not in self.__dict__:
+            self._choices = [iterator.choice(obj) for obj in self.objects]
+        return self._choices
+
+
+class _PreloadedChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        preloaded = self.field.preloaded
+        if preloaded is None:
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        yield from preloaded.choices_for(self)
+
+    def __len__(self):
+        preloaded = self.field.preloaded
+        if preloaded is None:
+            return super().__len__()
+        return len(preloaded.objects) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        preloaded = self.field.preloaded
+        if preloaded is None:
+            return super().__bool__()
+        return self.field.empty_label is not None or bool(preloaded.objects)
+
+
+# ModelChoiceField, das Auswahl und Validierung aus PreloadedChoices bedient
+class PreloadedModelChoiceField(forms.ModelChoiceField):
+    iterator = _PreloadedChoiceIterator
+    preloaded = None
+
+    def set_preloaded(self, preloaded: PreloadedChoices):
+        self.queryset = preloaded.queryset
+        self.preloaded = preloaded
+
+    def to_python(self, value):
+        if self.preloaded is None:
+            return super().to_python(value)
+        if value in self.empty_values:
+            return None
+        obj = self.preloaded.get(value)
+        if obj is None:
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return obj
+
+
+# ModelMultipleChoiceField mit derselben gemeinsamen Auswahl
+class PreloadedModelMultipleChoiceField(forms.ModelMultipleChoiceField):
+    iterator = _PreloadedChoiceIterator
+    preloaded = None
+
+    def set_preloaded(self, preloaded: PreloadedChoices):
+        self.queryset = preloaded.queryset
+        self.preloaded = preloaded
+
+    def _check_values(self, value):
+        if self.preloaded is None:
+            return super()._check_values(value)
+        objs = []
+        for v in dict.fromkeys(str(x) for x in value):
+            obj = self.preloaded.get(v)
+            if obj is None:
+                raise ValidationError(
+                    self.error_messages["invalid_choice"],
+                    code="invalid_choice",
+                    params={"value": v},
+                )
+            objs.append(obj)
+        return objs
+
+
 # Formset zum Verknüpfen von Fragen mit der Seite und den Befragtengruppen
 class PageQuestionLinkForm(forms.Form):
 
-    question = forms.ModelChoiceField(
+    question = PreloadedModelChoiceField(
         queryset=Question.objects.none(),
         required=True,
         label="Frage",
@@ -269,7 +378,7 @@ class PageQuestionLinkForm(forms.Form):
         error_messages={"required": "Bitte wähle eine Frage aus."},
     )
 
-    waves = forms.ModelMultipleChoiceField(
+    waves = PreloadedModelMultipleChoiceField(
         queryset=Wave.objects.none(),
         required=True,
         label="Befragtengruppe(n)",
@@ -287,22 +396,36 @@ class PageQuestionLinkForm(forms.Form):
 
     def __init__(self, *args, allowed_waves=None,  allowed_questions=None,**kwargs):
         """
-        allowed_waves: QuerySet[Wave] – Befragtengruppen, die für diese Page auswählbar sind.
+        allowed_waves: QuerySet[Wave] oder PreloadedChoices – Befragtengruppen, die für diese Page auswählbar sind.
+        allowed_questions: QuerySet[Question] oder PreloadedChoices – auswählbare Fragen.
+        Im Formset werden beide einmal geladen und von allen Forms geteilt.
         """
         super().__init__(*args, **kwargs)
 
-        if allowed_waves is not None:
-            allowed_waves = allowed_waves
-        else:
-            allowed_waves = Wave.objects.none()
+        choices = self.preload_choices(allowed_waves=allowed_waves, allowed_questions=allowed_questions)
 
-        self.fields["waves"].queryset = allowed_waves
-        self._allowed_wave_ids = set(allowed_waves.values_list("id", flat=True))
+        self.fields["waves"].set_preloaded(choices["allowed_waves"])
+        self._allowed_wave_ids = choices["allowed_waves"].pks
 
-        if allowed_questions is None:
-            allowed_questions = Question.objects.none()
+        self.fields["question"].set_preloaded(choices["allowed_questions"])
 
-        self.fields["question"].queryset = allowed_questions.order_by("id")
+    @staticmethod
+    def preload_choices(*, allowed_waves=None, allowed_questions=None) -> dict:
+        """
+        QuerySets in (noch nicht ausgewertete) PreloadedChoices überführen.
+        """
+        if not isinstance(allowed_waves, PreloadedChoices):
+            if allowed_waves is None:
+                allowed_waves = Wave.objects.none()
+            # Wave.__str__ nutzt die Befragung
+            allowed_waves = PreloadedChoices(allowed_waves.select_related("survey"))
+
+        if not isinstance(allowed_questions, PreloadedChoices):
+            if allowed_questions is None:
+                allowed_questions = Question.objects.none()
+            allowed_questions = PreloadedChoices(allowed_questions.order_by("id"))
+
+        return {"allowed_waves": allowed_waves, "allowed_questions": allowed_questions}
 
     def clean(self):
         cleaned = super().clean()
@@ -338,7 +461,18 @@ class BasePageQuestionLinkFormSet(BaseFormSet):
     """
     Formset-weite Regeln:
     - gleiche Frage darf nicht mehrfach vorkommen (außer gelöschte Zeilen)
+
+    Erlaubte Fragen und Befragtengruppen werden einmal pro Formset geladen
+    und allen Forms (inkl. empty_form) gemeinsam übergeben.
     """
+    def __init__(self, *args, form_kwargs=None, **kwargs):
+        form_kwargs = dict(form_kwargs or {})
+        form_kwargs.update(PageQuestionLinkForm.preload_choices(
+            allowed_waves=form_kwargs.get("allowed_waves"),
+            allowed_questions=form_kwargs.get("allowed_questions"),
+        ))
+        super().__init__(*args, form_kwargs=form_kwargs, **kwargs)
+
     def clean(self):
         super().clean()
 
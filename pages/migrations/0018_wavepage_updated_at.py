@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0017_alter_wavepagequestion_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wavepage',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
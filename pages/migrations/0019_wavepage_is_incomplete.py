@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+# Vollständigkeit einer Seite wird beim Schreiben per Trigger berechnet und gespeichert,
+# statt bei jedem Lesen per Annotation (Listen, Übersichten, Arbeitsliste).
+SQL_FORWARDS = """
+CREATE OR REPLACE FUNCTION pages_wavepage_incomplete_fn() RETURNS trigger AS $$
+BEGIN
+  NEW.is_incomplete := coalesce(NEW.pagename, '') = '' OR coalesce(NEW.transitions, '') = '';
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS pages_wavepage_incomplete_trg ON pages_wavepage;
+CREATE TRIGGER pages_wavepage_incomplete_trg
+BEFORE INSERT OR UPDATE OF pagename, transitions, is_incomplete ON pages_wavepage
+FOR EACH ROW
+EXECUTE FUNCTION pages_wavepage_incomplete_fn();
+
+UPDATE pages_wavepage
+SET is_incomplete = coalesce(pagename, '') = '' OR coalesce(transitions, '') = '';
+"""
+
+SQL_BACKWARDS = """
+DROP TRIGGER IF EXISTS pages_wavepage_incomplete_trg ON pages_wavepage;
+DROP FUNCTION IF EXISTS pages_wavepage_incomplete_fn();
+"""
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_FORWARDS)
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_BACKWARDS)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0018_wavepage_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wavepage',
+            name='is_incomplete',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='wavepage',
+            index=models.Index(condition=models.Q(('is_incomplete', True)), fields=['id'], name='idx_wavepage_incomplete'),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.db import migrations
+
+# Tabelle für den PV-Cache (CACHES["pv"], Standard: dbcache://slc_pv_cache) anlegen,
+# damit kein separates "createcachetable" beim Deployment nötig ist.
+def forwards(apps, schema_editor):
+    pv_cache = settings.CACHES.get("pv", {})
+    if pv_cache.get("BACKEND", "").endswith("DatabaseCache"):
+        call_command(
+            "createcachetable",
+            pv_cache["LOCATION"],
+            database=schema_editor.connection.alias,
+            verbosity=0,
+        )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0019_wavepage_is_incomplete"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
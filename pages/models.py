@@ -1,23 +1,13 @@
 from django.db import models
 from waves.models import Wave
 from questions.models import Question
-from django.db.models import Q, Case, When, Value, BooleanField
+from django.db.models import Q
 
 
-# QuerySet mit Annotations zur Vollständigkeitsprüfung von Seiten
+# QuerySet für Seiten (Vollständigkeit wird per DB-Trigger in `is_incomplete` gepflegt)
 class WavePageQuerySet(models.QuerySet):
-    def with_completeness(self):
-        missing = (
-            Q(pagename__isnull=True) | Q(pagename="") |
-            Q(transitions__isnull=True) | Q(transitions="")
-        )
-        return self.annotate(
-            is_incomplete=Case(
-                When(missing, then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
-            )
-        )
+    def incomplete(self):
+        return self.filter(is_incomplete=True)
 
 # Modell für Befragungsseiten
 class WavePage(models.Model):
@@ -111,12 +101,20 @@ class WavePage(models.Model):
         help_text="Zusätzliche Hinweise zur Programmierung (hi).",
     )
 
+    # Zeitpunkt der letzten Änderung (u. a. für den Versionsstempel der PV)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Unvollständig (Seitenname oder Filter fehlt); per DB-Trigger gepflegt
+    is_incomplete = models.BooleanField(default=True, editable=False)
 
 
     class Meta:
         ordering = ["pagename"]
         verbose_name = "page"
         verbose_name_plural = "pages"
+        indexes = [
+            models.Index(fields=["id"], condition=Q(is_incomplete=True), name="idx_wavepage_incomplete"),
+        ]
 
     def __str__(self) -> str:
         return self.pagename
@@ -0,0 +1,167 @@
+# pages/services/page_bulk.py
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Max
+
+from pages.models import WavePage, WavePageQuestion, WavePageWave
+from waves.models import Wave, WaveModule
+
+from .page_cleanup import apply_question_removals, get_new_orphan_question_ids
+
+
+class BulkPageOperationError(Exception):
+    """Fachlicher Fehler einer Sammeloperation (Meldung ist für die Anzeige gedacht)."""
+
+
+@dataclass(frozen=True)
+class BulkDeleteResult:
+    deleted_pages: int
+    deleted_wavequestions: int
+    deleted_variable_wave_links: int
+    orphan_question_ids: list[int]
+
+
+@dataclass(frozen=True)
+class BulkMoveResult:
+    moved_pages: int
+
+
+# Helper: Seiten-IDs einer Befragtengruppe auflösen (explizite Liste oder alle Seiten eines Moduls)
+def resolve_wave_page_ids(
+    *,
+    wave: Wave,
+    page_ids: Optional[Iterable[int]] = None,
+    module_id: Optional[int] = None,
+) -> list[int]:
+    links = WavePageWave.objects.filter(wave=wave)
+
+    if page_ids is not None:
+        requested = list(dict.fromkeys(int(x) for x in page_ids))
+        found = set(links.filter(page_id__in=requested).values_list("page_id", flat=True))
+        if len(found) != len(requested):
+            raise BulkPageOperationError("Mindestens eine Seite gehört nicht zu dieser Befragung.")
+        return requested
+
+    if module_id is not None:
+        if not WaveModule.objects.filter(wave=wave, id=module_id).exists():
+            raise BulkPageOperationError("Das Modul gehört nicht zu dieser Befragung.")
+        return list(
+            links.filter(module_id=module_id)
+            .order_by("sort_order", "id")
+            .values_list("page_id", flat=True)
+        )
+
+    raise BulkPageOperationError("Keine Seiten ausgewählt.")
+
+
+def bulk_delete_pages(*, page_ids: Iterable[int]) -> BulkDeleteResult:
+    """
+    Löscht mehrere Seiten in einer Transaktion.
+    Die Bereinigung (WaveQuestion, Triaden, Variable↔Wave) läuft gesammelt:
+    ein Statement je Kombination von Befragtengruppen (i. d. R. genau eins),
+    Orphans werden einmal am Ende für alle Fragen bestimmt.
+    """
+    page_ids = list(dict.fromkeys(int(x) for x in page_ids))
+    if not page_ids:
+        return BulkDeleteResult(0, 0, 0, [])
+
+    with transaction.atomic():
+        # Sperrlogik: keine Seite darf an einer gesperrten Befragung hängen
+        if WavePageWave.objects.filter(page_id__in=page_ids, wave__is_locked=True).exists():
+            raise BulkPageOperationError(
+                "Mindestens eine Seite ist mit einer abgeschlossenen Befragung verknüpft."
+            )
+
+        waves_by_page: dict[int, set[int]] = defaultdict(set)
+        for pid, wid in WavePageWave.objects.filter(page_id__in=page_ids).values_list("page_id", "wave_id"):
+            waves_by_page[pid].add(wid)
+
+        questions_by_page: dict[int, list[int]] = defaultdict(list)
+        for pid, qid in (
+            WavePageQuestion.objects
+            .filter(wave_page_id__in=page_ids)
+            .order_by("wave_page_id", "sort_order", "id")
+            .values_list("wave_page_id", "question_id")
+        ):
+            questions_by_page[pid].append(qid)
+
+        # Seiten mit identischen Befragtengruppen zusammenfassen
+        qids_by_wave_set: dict[frozenset[int], list[int]] = defaultdict(list)
+        for pid in page_ids:
+            qids_by_wave_set[frozenset(waves_by_page.get(pid, ()))].extend(questions_by_page.get(pid, []))
+
+        deleted_wq = 0
+        deleted_m2m = 0
+        for wave_ids, qids in qids_by_wave_set.items():
+            if not wave_ids or not qids:
+                continue
+            r = apply_question_removals(
+                page_ids=page_ids,
+                removed_question_ids=qids,
+                wave_ids=wave_ids,
+                compute_orphans=False,
+            )
+            deleted_wq += r.deleted_wavequestions
+            deleted_m2m += r.deleted_variable_wave_links
+
+        all_qids = list(dict.fromkeys(q for pid in page_ids for q in questions_by_page.get(pid, [])))
+        orphan_qids = get_new_orphan_question_ids(all_qids)
+
+        deleted_pages = WavePage.objects.filter(id__in=page_ids).count()
+        WavePage.objects.filter(id__in=page_ids).delete()
+
+    return BulkDeleteResult(
+        deleted_pages=deleted_pages,
+        deleted_wavequestions=deleted_wq,
+        deleted_variable_wave_links=deleted_m2m,
+        orphan_question_ids=orphan_qids,
+    )
+
+
+def bulk_move_pages(
+    *,
+    wave: Wave,
+    page_ids: Iterable[int],
+    target_module_id: Optional[int],
+) -> BulkMoveResult:
+    """
+    Ordnet mehrere Seiten einer Befragtengruppe einem Modul zu (oder keinem)
+    und hängt sie in der übergebenen Reihenfolge ans Ende der Sortierung an.
+    """
+    page_ids = list(dict.fromkeys(int(x) for x in page_ids))
+    if not page_ids:
+        return BulkMoveResult(moved_pages=0)
+
+    if wave.is_locked:
+        raise BulkPageOperationError("Befragung ist gesperrt.")
+
+    if target_module_id is not None and not WaveModule.objects.filter(wave=wave, id=target_module_id).exists():
+        raise BulkPageOperationError("Das Zielmodul gehört nicht zu dieser Befragung.")
+
+    with transaction.atomic():
+        links = list(WavePageWave.objects.select_for_update().filter(wave=wave, page_id__in=page_ids))
+        if len(links) != len(page_ids):
+            raise BulkPageOperationError("Mindestens eine Seite gehört nicht zu dieser Befragung.")
+
+        max_sort = (
+            WavePageWave.objects
+            .filter(wave=wave)
+            .exclude(page_id__in=page_ids)
+            .aggregate(m=Max("sort_order"))["m"]
+        ) or 0
+
+        link_by_page = {l.page_id: l for l in links}
+        for idx, pid in enumerate(page_ids, start=1):
+            l = link_by_page[pid]
+            l.sort_order = max_sort + idx
+            l.module_id = target_module_id
+
+        WavePageWave.objects.bulk_update(links, ["sort_order", "module"])
+
+    return BulkMoveResult(moved_pages=len(links))
@@ -3,14 +3,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, Set
+from typing import Iterable
 
-from variables.models import Variable
-from questions.models import QuestionVariableWave
 from waves.models import WaveQuestion
-from pages.models import WavePage, WavePageQuestion
+from pages.models import WavePage
 
-from django.db.models import OuterRef, Exists
+from django.db import connection
 
 
 @dataclass(frozen=True)
@@ -21,6 +19,19 @@ class RemovalCleanupResult:
 
 
 # Funktion bereinigt Datenbankeinträge nach dem Entfernen von Fragen durh die Seitenbearbeitung.
+#
+# Dies kann aus zwei Gründen notwendig sein:
+#   1) weil gesamte Seiten gelöscht werden
+#   2) weil Fragen von Seiten entfernt werden (oder für bestimmte Befragungen ausgeblendet werden)
+#
+# Dabei werden folgende Bereinigungen durchgeführt (für alle betroffenen Befragungen zugleich):
+#   - Löschen der WaveQuestion-Verknüpfungen, wenn die Frage in der Befragung auf keiner anderen Seite mehr vorkommt
+#   - Löschen der Triad-Einträge (QuestionVariableWave) für diese Fragen
+#   - Entfernen der M2M-Einträge Variable↔Wave für Variablen, die in der Befragung
+#     nicht mehr über verbleibende Fragen gebraucht werden.
+#   - Technische Variablen werden nicht angefasst, da diese in Befragungen vorkommen können, ohne auf Seiten zu sein.
+#
+# Die übergebene Seite zählt dabei nie als "verbleibende" Seite (sie wird bearbeitet oder gleich gelöscht).
 def apply_question_removals_from_page(
     *,
     page: WavePage,
@@ -28,140 +39,125 @@ def apply_question_removals_from_page(
     wave_ids: list[int],
     compute_orphans: bool = True,
 ) -> RemovalCleanupResult:
-    deleted_wq = cleanup_wavequestions_for_removed_questions(
-        page=page,
+    return apply_question_removals(
+        page_ids=[page.pk],
         removed_question_ids=removed_question_ids,
         wave_ids=wave_ids,
+        compute_orphans=compute_orphans,
     )
 
-    deleted_m2m_total = 0
-    for wid in wave_ids:
-        deleted_m2m_total += cleanup_after_removing_questions(
-            wave_id=wid,
-            removed_question_ids=removed_question_ids,
-        )
-
-    orphan_qids = get_new_orphan_question_ids(removed_question_ids) if compute_orphans else []
 
-    return RemovalCleanupResult(
-        deleted_wavequestions=deleted_wq,
-        deleted_variable_wave_links=deleted_m2m_total,
-        orphan_question_ids=orphan_qids,
+# Ein Statement: alle Löschungen als datenverändernde CTEs, Anti-Joins gegen die übrigen Seiten.
+# Alle CTEs sehen denselben Snapshot; die gelöschten Triad-Zeilen fallen im "still used"-Check
+# trotzdem heraus, weil deren Fragen per Definition auf keiner anderen Seite der Befragung liegen.
+_CLEANUP_SQL = """
+    WITH removed AS (
+        SELECT q.id AS question_id, w.id AS wave_id
+        FROM unnest(%(question_ids)s::bigint[]) AS q(id)
+        CROSS JOIN unnest(%(wave_ids)s::bigint[]) AS w(id)
+    ),
+    gone AS (
+        -- Fragen, die in der Befragung auf keiner anderen Seite mehr vorkommen
+        SELECT r.question_id, r.wave_id
+        FROM removed r
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM pages_wavepagequestion wpq
+            JOIN pages_wavepagewave wpw ON wpw.page_id = wpq.wave_page_id
+            WHERE wpq.question_id = r.question_id
+              AND wpw.wave_id = r.wave_id
+              AND wpq.wave_page_id <> ALL(%(page_ids)s::bigint[])
+        )
+    ),
+    del_wq AS (
+        DELETE FROM waves_wavequestion wq
+        USING gone g
+        WHERE wq.question_id = g.question_id
+          AND wq.wave_id = g.wave_id
+        RETURNING wq.id
+    ),
+    del_triad AS (
+        DELETE FROM variables_questionvariablewave qvw
+        USING gone g
+        WHERE qvw.question_id = g.question_id
+          AND qvw.wave_id = g.wave_id
+        RETURNING qvw.variable_id, qvw.wave_id
+    ),
+    del_m2m AS (
+        DELETE FROM variables_variable_waves vw
+        USING (SELECT DISTINCT variable_id, wave_id FROM del_triad) a,
+              variables_variable v
+        WHERE vw.variable_id = a.variable_id
+          AND vw.wave_id = a.wave_id
+          AND v.id = a.variable_id
+          AND v.is_technical = false
+          AND NOT EXISTS (
+              -- Variable wird in der Befragung noch über eine Frage auf einer anderen Seite gebraucht
+              SELECT 1
+              FROM variables_questionvariablewave qvw2
+              JOIN pages_wavepagequestion wpq ON wpq.question_id = qvw2.question_id
+              JOIN pages_wavepagewave wpw ON wpw.page_id = wpq.wave_page_id
+                                         AND wpw.wave_id = qvw2.wave_id
+              WHERE qvw2.variable_id = a.variable_id
+                AND qvw2.wave_id = a.wave_id
+                AND wpq.wave_page_id <> ALL(%(page_ids)s::bigint[])
+          )
+        RETURNING vw.id
     )
-
-
-
-# Funktion bereinigt Datenbankeinträge nach dem Entfernen von Fragen durh die Seitenbearbeitung.
-#
-# Dies kann aus zwei Gründen notwendig sein:
-#   1) weil gesamte Seiten gelöscht werden
-#   2) weil Fragen von Seiten entfernt werden (oder für bestimmte Befragungen ausgeblendet werden)
-#
-# Dabei werden folgende Bereinigungen durchgeführt:
-#   - Löschen der Triad-Einträge (QuestionVariableWave) für die entfernten Fragen
-#   - Entfernen der M2M-Einträge Variable↔Wave für Variablen, die in der Befragung
-#     nicht mehr über verbleibende Fragen gebraucht werden.
-#   - Technische Variablen werden nicht angefasst, da diese in Befragungen vorkommen können, ohne auf Seiten zu sein.
-
-
-def cleanup_after_removing_questions(
+    SELECT
+        (SELECT count(*) FROM del_wq),
+        (SELECT count(*) FROM del_m2m),
+        CASE WHEN %(compute_orphans)s THEN ARRAY(
+            -- Orphans: Fragen ohne WaveQuestion nach den Löschungen oben
+            SELECT c.id
+            FROM unnest(%(question_ids)s::bigint[]) AS c(id)
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM waves_wavequestion wq2
+                WHERE wq2.question_id = c.id
+                  AND wq2.id NOT IN (SELECT id FROM del_wq)
+            )
+        ) ELSE ARRAY[]::bigint[] END
+"""
+
+
+def apply_question_removals(
     *,
-    wave_id: int,
+    page_ids: Iterable[int],
     removed_question_ids: Iterable[int],
-) -> int:
-
-    removed_qids = set(int(x) for x in removed_question_ids or [])
-    if not removed_qids:
-        return 0
-
-    # 1) Welche Fragen kommen in dieser Befragungsgruppe (nach dem Entfernen) noch irgendwo auf Seiten vor?
-    remaining_qids_in_wave: Set[int] = set(
-        WavePageQuestion.objects
-        .filter(wave_page__waves__id=wave_id)
-        .values_list("question_id", flat=True)
-        .distinct()
-    )
-
-    # 2) Behalte nur die Fragen, die auf keiner Seite der Befragung mehr vorkommen
-    actually_removed_qids = removed_qids - remaining_qids_in_wave
-    if not actually_removed_qids:
-        return 0
-
-
-    # 3) Triad-Zeilen (Questions - Variables - Waves) für diese entfernten Fragen holen
-    triad_qs = QuestionVariableWave.objects.filter(
-        wave_id=wave_id,
-        question_id__in=actually_removed_qids,
-    )
-
-    affected_var_ids = set(triad_qs.values_list("variable_id", flat=True).distinct())
-
-    # a) Triad-Einträge löschen (Verknüpfung der Variablen mit den entfernten Fragen in der Befragung)
-    triad_qs.delete()
-
-    if not affected_var_ids:
-        return 0
-
-
-    # 4) Identifiziere Variablen, die in der Befragungsgruppe noch über verbleibende Fragen gebraucht werden
-    still_used_var_ids = set(
-        QuestionVariableWave.objects.filter(
-            wave_id=wave_id,
-            question_id__in=remaining_qids_in_wave,
-            variable_id__in=affected_var_ids,
-        ).values_list("variable_id", flat=True).distinct()
-    )
-
-    to_remove_var_ids = affected_var_ids - still_used_var_ids
-    if not to_remove_var_ids:
-        return 0
-
-    non_technical_var_ids = list(
-        Variable.objects.filter(
-            id__in=to_remove_var_ids,
-            is_technical=False,
-        ).values_list("id", flat=True)
-    )
-    if not non_technical_var_ids:
-        return 0
-
-    # 5) Variable↔Wave M2M bereinigen
-    through = Variable._meta.get_field("waves").remote_field.through
-    deleted, _ = through.objects.filter(
-        wave_id=wave_id,
-        variable_id__in=non_technical_var_ids,
-    ).delete()
-
-    return deleted
-
+    wave_ids: Iterable[int],
+    compute_orphans: bool = True,
+) -> RemovalCleanupResult:
+    """
+    Bereinigt nach dem Entfernen von Fragen von einer oder mehreren Seiten
+    alle betroffenen Befragungen in einem Statement.
+    """
+    # Reihenfolge der Fragen beibehalten (für die Orphan-Liste)
+    qids: list[int] = list(dict.fromkeys(int(x) for x in removed_question_ids or []))
+    if not qids:
+        return RemovalCleanupResult(
+            deleted_wavequestions=0,
+            deleted_variable_wave_links=0,
+            orphan_question_ids=[],
+        )
 
+    with connection.cursor() as cur:
+        cur.execute(_CLEANUP_SQL, {
+            "question_ids": qids,
+            "wave_ids": sorted(set(int(x) for x in wave_ids or [])),
+            "page_ids": sorted(set(int(x) for x in page_ids or [])),
+            "compute_orphans": bool(compute_orphans),
+        })
+        deleted_wq, deleted_m2m, orphan_ids = cur.fetchone()
 
+    orphan_set = set(orphan_ids or [])
 
-# Orphan Cleanup Utilities for Questions after deleting or modifiying Pages
-def cleanup_wavequestions_for_removed_questions(*, page, removed_question_ids: list[int], wave_ids: list[int]) -> int:
-    """
-    Phase (a): Entfernt WaveQuestion-Verknüpgungen (wave, question),
-    wenn die Frage in dieser Befragtengruppe auf keiner anderen Seite mehr vorkommt (bei core sollte das nicht sein, bei episodes möglich).
-    Gibt Anzahl gelöschter WaveQuestion-Links zurück.
-    """
-    if not removed_question_ids or not wave_ids:
-        return 0
-
-    other_usage = WavePageQuestion.objects.filter(
-        question_id=OuterRef("question_id"),
-        wave_page__waves__id=OuterRef("wave_id"),
-    ).exclude(wave_page=page)
-
-    wq_qs = WaveQuestion.objects.filter(
-        wave_id__in=wave_ids,
-        question_id__in=removed_question_ids,
-    ).annotate(
-        keep=Exists(other_usage)
+    return RemovalCleanupResult(
+        deleted_wavequestions=int(deleted_wq),
+        deleted_variable_wave_links=int(deleted_m2m),
+        orphan_question_ids=[qid for qid in qids if qid in orphan_set],
     )
 
-    deleted, _ = wq_qs.filter(keep=False).delete()
-    return deleted
-
 
 def get_new_orphan_question_ids(candidate_question_ids: list[int]) -> list[int]:
     """
@@ -0,0 +1,323 @@
+# pages/services/page_copy.py
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+from django.db import transaction
+from django.db.models import Max
+
+from pages.models import WavePage, WavePageQuestion, WavePageWave
+from variables.models import QuestionVariableWave, Variable
+from waves.models import Wave, WaveModule, WaveQuestion
+
+
+# Inhaltsfelder einer Seite, die beim Kopieren übernommen werden
+PAGE_CONTENT_FIELDS = (
+    "page_heading",
+    "introduction",
+    "transition_control",
+    "visibility_conditions",
+    "answer_validations",
+    "correction_notes",
+    "forcing_variables",
+    "helper_variables",
+    "control_variables",
+    "formatting",
+    "transitions",
+    "page_programming_notes",
+)
+
+
+class PageCopyError(Exception):
+    """Fachlicher Fehler beim Kopieren; `collisions` enthält ggf. bereits vergebene Seitennamen."""
+
+    def __init__(self, message: str, *, collisions: Sequence[str] = (), status: int = 400):
+        super().__init__(message)
+        self.collisions = tuple(collisions)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class PageCopyResult:
+    # (Quell-Seite, neue Seite) in Kopierreihenfolge
+    page_map: tuple[tuple[int, int], ...]
+    created_page_links: int
+    created_question_links: int
+    created_wavequestions: int
+    created_variable_links: int
+
+    @property
+    def new_page_ids(self) -> list[int]:
+        return [new_id for _, new_id in self.page_map]
+
+
+# Helper: Ziel-Befragtengruppen laden und prüfen (alle im Ziel-Survey, keine gesperrt)
+def load_target_waves(*, survey_id, wave_ids: Iterable) -> list[Wave]:
+    try:
+        ids = sorted({int(x) for x in wave_ids})
+    except (TypeError, ValueError):
+        raise PageCopyError("Ungültige Gruppenauswahl.")
+
+    if not ids:
+        raise PageCopyError("Bitte mindestens eine Gruppe auswählen.")
+
+    waves = list(Wave.objects.filter(id__in=ids, survey_id=survey_id).order_by("cycle", "instrument", "id"))
+    if len(waves) != len(ids):
+        raise PageCopyError("Ungültige Gruppen (gehören nicht zur gewählten Befragung).")
+    if any(w.is_locked for w in waves):
+        raise PageCopyError("Mindestens eine ausgewählte Gruppe ist gesperrt. Kopieren nicht möglich.", status=403)
+    return waves
+
+
+def find_pagename_collisions(*, survey_id: int, pagenames: Iterable[str]) -> list[str]:
+    """
+    Liefert alle Namen, die in der Ziel-Befragung bereits vergeben sind
+    oder in der Auswahl selbst mehrfach vorkommen (eine Query).
+    """
+    names = [n for n in pagenames]
+    seen: set[str] = set()
+    duplicates: list[str] = []
+    for n in names:
+        if n in seen and n not in duplicates:
+            duplicates.append(n)
+        seen.add(n)
+
+    existing = set(
+        WavePage.objects
+        .filter(pagename__in=seen, waves__survey_id=survey_id)
+        .values_list("pagename", flat=True)
+        .distinct()
+    )
+    return sorted(existing | set(duplicates))
+
+
+def copy_pages(
+    *,
+    sources: Sequence[tuple[int, str]],
+    target_waves: Sequence[Wave],
+    include_questions: bool = True,
+    include_variables: bool = False,
+    target_module_name: Optional[str] = None,
+) -> PageCopyResult:
+    """
+    Kopiert mehrere Seiten (Quell-ID, neuer Name) in die Ziel-Befragtengruppen.
+    Alles läuft in einer Transaktion, Sortierpositionen werden einmal je Gruppe ermittelt,
+    alle Zeilen werden per bulk_create angelegt.
+
+    Mit `target_module_name` landen die Kopien in jeder Zielgruppe in einem gleichnamigen
+    Modul (wird bei Bedarf am Ende angelegt).
+
+    Die Flags werden unverändert übernommen; ob Variablen ohne Fragen kopiert werden
+    dürfen, entscheidet der Aufrufer.
+    """
+    sources = list(sources)
+    target_waves = list(target_waves)
+    if not sources:
+        raise PageCopyError("Keine Seiten ausgewählt.")
+    if not target_waves:
+        raise PageCopyError("Bitte mindestens eine Gruppe auswählen.")
+
+    survey_ids = {w.survey_id for w in target_waves}
+    if len(survey_ids) != 1 or None in survey_ids:
+        raise PageCopyError("Alle Zielgruppen müssen zur selben Befragung gehören.")
+    target_survey_id = survey_ids.pop()
+
+    source_ids = [sid for sid, _ in sources]
+    if len(set(source_ids)) != len(source_ids):
+        raise PageCopyError("Eine Seite wurde mehrfach ausgewählt.")
+
+    # Namenskonflikte vorab vollständig melden
+    collisions = find_pagename_collisions(survey_id=target_survey_id, pagenames=[n for _, n in sources])
+    if collisions:
+        raise PageCopyError(
+            "Mindestens ein Seitenname existiert in der Ziel-Befragung bereits.",
+            collisions=collisions,
+        )
+
+    source_pages = WavePage.objects.in_bulk(source_ids)
+    if len(source_pages) != len(source_ids):
+        raise PageCopyError("Mindestens eine Quellseite existiert nicht.")
+
+    target_wave_ids = [w.id for w in target_waves]
+
+    with transaction.atomic():
+        # --- 1) Seiten anlegen
+        new_pages = WavePage.objects.bulk_create([
+            WavePage(
+                pagename=new_name,
+                **{f: getattr(source_pages[sid], f) for f in PAGE_CONTENT_FIELDS},
+            )
+            for sid, new_name in sources
+        ])
+        page_map = tuple((sid, p.pk) for (sid, _), p in zip(sources, new_pages))
+
+        # --- 2) Seiten in Zielgruppen einhängen (Sortierung: einmal Max je Gruppe)
+        max_sort_by_wave = dict(
+            WavePageWave.objects
+            .filter(wave_id__in=target_wave_ids)
+            .values("wave_id")
+            .annotate(m=Max("sort_order"))
+            .values_list("wave_id", "m")
+        )
+
+        module_by_wave: dict[int, Optional[int]] = {wid: None for wid in target_wave_ids}
+        if target_module_name:
+            module_by_wave.update(_ensure_modules(wave_ids=target_wave_ids, name=target_module_name))
+
+        page_links = [
+            WavePageWave(
+                wave_id=wid,
+                page_id=new_id,
+                sort_order=(max_sort_by_wave.get(wid) or 0) + idx,
+                module_id=module_by_wave[wid],
+            )
+            for wid in target_wave_ids
+            for idx, (_, new_id) in enumerate(page_map, start=1)
+        ]
+        WavePageWave.objects.bulk_create(page_links)
+
+        created_q_links = 0
+        created_wq = 0
+        created_var_links = 0
+
+        # --- 3) Fragen übernehmen (Fragen der Quellseiten werden auch für die Variablen gebraucht)
+        links_by_page: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        if include_questions or include_variables:
+            for pid, qid, sort_order in (
+                WavePageQuestion.objects
+                .filter(wave_page_id__in=source_ids)
+                .order_by("wave_page_id", "sort_order", "id")
+                .values_list("wave_page_id", "question_id", "sort_order")
+            ):
+                links_by_page[pid].append((qid, sort_order))
+
+        if include_questions:
+            new_id_by_source = dict(page_map)
+            created_q_links = len(WavePageQuestion.objects.bulk_create(
+                [
+                    WavePageQuestion(wave_page_id=new_id_by_source[sid], question_id=qid, sort_order=sort_order)
+                    for sid in source_ids
+                    for qid, sort_order in links_by_page.get(sid, [])
+                ],
+                ignore_conflicts=True,
+            ))
+
+            all_qids = sorted({qid for links in links_by_page.values() for qid, _ in links})
+            created_wq = len(WaveQuestion.objects.bulk_create(
+                [WaveQuestion(wave_id=wid, question_id=qid) for wid in target_wave_ids for qid in all_qids],
+                ignore_conflicts=True,
+            ))
+
+        # --- 4) Variablen übernehmen
+        # Es werden nur Variablen kopiert, die im Quell-Survey der jeweiligen Seite an deren Fragen hängen.
+        if include_variables and links_by_page:
+            created_var_links = _copy_variable_links(
+                source_ids=source_ids,
+                links_by_page=links_by_page,
+                target_wave_ids=target_wave_ids,
+            )
+
+    return PageCopyResult(
+        page_map=page_map,
+        created_page_links=len(page_links),
+        created_question_links=created_q_links,
+        created_wavequestions=created_wq,
+        created_variable_links=created_var_links,
+    )
+
+
+# Helper: Modul mit Namen `name` in allen Zielgruppen sicherstellen -> {wave_id: module_id}
+def _ensure_modules(*, wave_ids: list[int], name: str) -> dict[int, int]:
+    existing = dict(
+        WaveModule.objects
+        .filter(wave_id__in=wave_ids, name=name)
+        .values_list("wave_id", "id")
+    )
+    missing = [wid for wid in wave_ids if wid not in existing]
+    if missing:
+        max_sort = dict(
+            WaveModule.objects
+            .filter(wave_id__in=missing)
+            .values("wave_id")
+            .annotate(m=Max("sort_order"))
+            .values_list("wave_id", "m")
+        )
+        created = WaveModule.objects.bulk_create([
+            WaveModule(wave_id=wid, name=name, sort_order=(max_sort.get(wid) or 0) + 1)
+            for wid in missing
+        ])
+        existing.update({m.wave_id: m.pk for m in created})
+    return existing
+
+
+# Helper: Triaden und Variable↔Wave-Links für die kopierten Seiten anlegen
+def _copy_variable_links(
+    *,
+    source_ids: list[int],
+    links_by_page: dict[int, list[tuple[int, int]]],
+    target_wave_ids: list[int],
+) -> int:
+    # Quell-Survey je Seite (eine Query); Seiten an mehreren Befragungen sind nicht eindeutig
+    surveys_by_page: dict[int, set[int]] = defaultdict(set)
+    for pid, sid in (
+        WavePageWave.objects
+        .filter(page_id__in=source_ids)
+        .values_list("page_id", "wave__survey_id")
+        .distinct()
+    ):
+        surveys_by_page[pid].add(sid)
+
+    for pid in source_ids:
+        if not links_by_page.get(pid):
+            continue
+        if not surveys_by_page.get(pid):
+            raise PageCopyError("Quelle konnte nicht bestimmt werden (Seite hat keine Waves).")
+        if len(surveys_by_page[pid]) > 1:
+            raise PageCopyError("Quelle ist nicht eindeutig (Seite hängt an mehreren Befragungen).")
+
+    source_survey_ids = {next(iter(s)) for s in surveys_by_page.values() if len(s) == 1}
+    all_qids = {qid for links in links_by_page.values() for qid, _ in links}
+
+    # (Frage, Survey) -> Variablen, eine Query über alle Seiten
+    vars_by_q_survey: dict[tuple[int, int], set[int]] = defaultdict(set)
+    for qid, vid, sid in (
+        QuestionVariableWave.objects
+        .filter(question_id__in=all_qids, wave__survey_id__in=source_survey_ids)
+        .values_list("question_id", "variable_id", "wave__survey_id")
+        .distinct()
+    ):
+        vars_by_q_survey[(qid, sid)].add(vid)
+
+    qv_pairs: set[tuple[int, int]] = set()
+    for pid in source_ids:
+        if not links_by_page.get(pid):
+            continue
+        sid = next(iter(surveys_by_page[pid]))
+        for qid, _ in links_by_page[pid]:
+            for vid in vars_by_q_survey.get((qid, sid), ()):
+                qv_pairs.add((qid, vid))
+
+    if not qv_pairs:
+        return 0
+
+    # Triaden für alle Ziel-Waves setzen
+    created = QuestionVariableWave.objects.bulk_create(
+        [
+            QuestionVariableWave(question_id=qid, variable_id=vid, wave_id=wid)
+            for (qid, vid) in sorted(qv_pairs)
+            for wid in target_wave_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+    # Direktes Variable↔Wave M2M setzen
+    through = Variable.waves.through
+    var_ids = sorted({vid for (_, vid) in qv_pairs})
+    through.objects.bulk_create(
+        [through(variable_id=vid, wave_id=wid) for vid in var_ids for wid in target_wave_ids],
+        ignore_conflicts=True,
+    )
+    return len(created)
@@ -3,12 +3,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Set, Tuple, List
+from typing import Dict, Set, Tuple, List, Iterable
 
 from waves.models import WaveQuestion
-from pages.models import WavePage, WavePageQuestion
+from pages.models import WavePage
 
-from django.db.models import Q
+from django.db import connection
 
 
 @dataclass(frozen=True)
@@ -66,47 +66,20 @@ def sync_wavequestions_for_page(
         return WaveQuestionSyncResult(created=0, deleted=0)
 
 
-    # 4) Kandidaten fürs Löschen müssen „Other page“-Check bestehen.
-    #
-    # Die Verknüpfung einer Frage mit einer Befragung über WaveQuestion ist nur dann löschbar,
-    # wenn die Frage nicht auf einer anderen Seite derselben Befragung erscheint.
-    
-    deletable_pairs: List[Tuple[int, int]] = []
-    if candidate_deletes:
-        by_wid: Dict[int, Set[int]] = {}
-        for qid, wid in candidate_deletes:
-            by_wid.setdefault(wid, set()).add(qid)
-
-        for wid, qid_set in by_wid.items():
-            other_qids = set(
-                WavePageQuestion.objects
-                .filter(
-                    question_id__in=qid_set,
-                    wave_page__waves__id=wid,
-                )
-                .exclude(wave_page=page)
-                .values_list("question_id", flat=True)
-                .distinct()
-            )
-            # löschbar = Kandidaten, die nicht auf anderen Seiten derselben Befragung liegen
-            for qid in (qid_set - other_qids):
-                deletable_pairs.append((qid, wid))
-
-
-    # 5) DB schreiben (bulk create, dann bulk delete)
+    # 4) + 5) DB schreiben (bulk create, dann ein einziges DELETE)
     created_count = 0
-    deleted_count = 0
 
     if to_create:
         objs = [WaveQuestion(question_id=qid, wave_id=wid) for (qid, wid) in to_create]
         WaveQuestion.objects.bulk_create(objs, ignore_conflicts=True)
         created_count = len(to_create)
 
-    if deletable_pairs:
-        q = Q()
-        for qid, wid in deletable_pairs:
-            q |= Q(question_id=qid, wave_id=wid)
-        deleted_count, _ = WaveQuestion.objects.filter(q).delete()
+    # Kandidaten fürs Löschen müssen den „Other page“-Check bestehen:
+    # Die Verknüpfung einer Frage mit einer Befragung über WaveQuestion ist nur dann löschbar,
+    # wenn die Frage nicht auf einer anderen Seite derselben Befragung erscheint.
+    # Prüfung (Anti-Join) und Löschen laufen für alle Befragungen in einem Statement.
+    deletable_pairs = _delete_pairs_not_on_other_pages(page_id=page.pk, pairs=candidate_deletes)
+    deleted_count = len(deletable_pairs)
 
     if write_debug_pairs:
         return WaveQuestionSyncResult(
@@ -116,4 +89,38 @@ def sync_wavequestions_for_page(
             deleted_pairs=tuple(sorted(deletable_pairs)),
         )
 
-    return WaveQuestionSyncResult(created=created_count, deleted=deleted_count)
\ No newline at end of file
+    return WaveQuestionSyncResult(created=created_count, deleted=deleted_count)
+
+
+def _delete_pairs_not_on_other_pages(*, page_id: int, pairs: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Löscht WaveQuestion-Paare (question_id, wave_id), sofern die Frage in der jeweiligen
+    Befragung auf keiner anderen Seite als `page_id` liegt. Gibt die gelöschten Paare zurück.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+
+    values_sql = ", ".join(["(%s::bigint, %s::bigint)"] * len(pairs))
+    params: List[int] = [v for pair in pairs for v in pair]
+    params.append(page_id)
+
+    sql = f"""
+        DELETE FROM waves_wavequestion wq
+        USING (VALUES {values_sql}) AS c(question_id, wave_id)
+        WHERE wq.question_id = c.question_id
+          AND wq.wave_id = c.wave_id
+          AND NOT EXISTS (
+              SELECT 1
+              FROM pages_wavepagequestion wpq
+              JOIN pages_wavepagewave wpw ON wpw.page_id = wpq.wave_page_id
+              WHERE wpq.question_id = c.question_id
+                AND wpw.wave_id = c.wave_id
+                AND wpq.wave_page_id <> %s
+          )
+        RETURNING wq.question_id, wq.wave_id
+    """
+
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        return [(int(qid), int(wid)) for qid, wid in cur.fetchall()]
\ No newline at end of file
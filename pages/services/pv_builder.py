@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Iterable, Optional
+from typing import Iterable, Mapping, Optional, Sequence
 
 
 @dataclass(frozen=True)
 class PVContext:
     page: object
-    questions: list[object]
-    vars_by_qid: dict[int, list[str]] | None = None
+    questions: Sequence[object]
+    vars_by_qid: Mapping[int, Sequence[str]] | None = None
     active_wave: Optional[object] = None
 
 
@@ -0,0 +1,118 @@
+# pages/services/pv_cache.py
+
+from __future__ import annotations
+
+import hashlib
+from typing import Callable, Optional
+
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import TextField
+from django.db.models.expressions import RawSQL
+
+
+# Formatversion der PV: erhöhen, wenn sich build_pv() ändert -> alte Cache-Einträge werden ignoriert
+PV_FORMAT_VERSION = 1
+
+# Lebensdauer eines Cache-Eintrags (Sekunden); Invalidierung läuft über den Stempel
+PV_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Eigener Cache-Alias für PV-Texte und PV-Diffs (siehe CACHES in settings.py)
+PV_CACHE_ALIAS = "pv"
+
+
+# SQL-Fragment: Versionsstempel aller Daten, aus denen die PV einer Seite gebaut wird
+# - Seitenfelder (updated_at)
+# - Fragen der Seite inkl. Reihenfolge (Frage-ID, sort_order, updated_at der Frage)
+# - Variablenzuordnungen (Anzahl, max. ID, letzte Änderung einer Variable)
+# {page} wird durch die Spalte bzw. den Platzhalter der Seiten-ID ersetzt,
+# {wave_filter} schränkt die Variablenzuordnungen optional auf eine Befragtengruppe ein.
+_STAMP_SQL = """
+    (
+        SELECT wp.updated_at::text
+        FROM pages_wavepage wp
+        WHERE wp.id = {page}
+    )
+    || '|' ||
+    COALESCE((
+        SELECT string_agg(
+            wpq.question_id::text || ':' || wpq.sort_order::text || '@' || q.updated_at::text,
+            ',' ORDER BY wpq.sort_order, wpq.id
+        )
+        FROM pages_wavepagequestion wpq
+        JOIN questions_question q ON q.id = wpq.question_id
+        WHERE wpq.wave_page_id = {page}
+    ), '')
+    || '|' ||
+    COALESCE((
+        SELECT count(*)::text || ':' || COALESCE(max(qvw.id), 0)::text || '@' || COALESCE(max(v.updated_at)::text, '')
+        FROM variables_questionvariablewave qvw
+        JOIN variables_variable v ON v.id = qvw.variable_id
+        WHERE qvw.question_id IN (
+            SELECT wpq2.question_id
+            FROM pages_wavepagequestion wpq2
+            WHERE wpq2.wave_page_id = {page}
+        )
+        {wave_filter}
+    ), '')
+"""
+
+
+def _stamp_sql(page_ref: str, wave_id: Optional[int]) -> tuple[str, list]:
+    wave_filter = ""
+    params: list = []
+    if wave_id is not None:
+        wave_filter = "AND qvw.wave_id = %s"
+        params.append(wave_id)
+    return _STAMP_SQL.format(page=page_ref, wave_filter=wave_filter), params
+
+
+def with_pv_stamp(qs, wave_id: Optional[int] = None, *, name: str = "pv_stamp"):
+    """
+    Annotiert ein WavePage-Queryset mit dem Versionsstempel `name` (ein Subselect pro Seite, keine Zusatzqueries).
+    """
+    sql, params = _stamp_sql('"pages_wavepage"."id"', wave_id)
+    return qs.annotate(**{name: RawSQL(sql, params, output_field=TextField())})
+
+
+def compute_pv_stamp(page_id: int, wave_id: Optional[int] = None) -> str:
+    """
+    Ermittelt den Versionsstempel für eine einzelne Seite.
+    """
+    sql, wave_params = _stamp_sql("%s", wave_id)
+    # Platzhalter-Reihenfolge: Seite (3x), danach ggf. Befragtengruppe
+    params = [page_id, page_id, page_id, *wave_params]
+
+    with connection.cursor() as cur:
+        cur.execute(f"SELECT {sql}", params)
+        row = cur.fetchone()
+    return (row[0] if row else "") or ""
+
+
+def pv_store():
+    return caches[PV_CACHE_ALIAS]
+
+
+def pv_cache_key(page_id: int, wave_id: Optional[int], stamp: str) -> str:
+    digest = hashlib.sha1((stamp or "").encode("utf-8")).hexdigest()
+    return f"pv:{PV_FORMAT_VERSION}:{page_id}:{wave_id or 'all'}:{digest}"
+
+
+def get_or_build_pv(
+    *,
+    page_id: int,
+    wave_id: Optional[int],
+    stamp: str,
+    builder: Callable[[], str],
+) -> str:
+    """
+    Liefert die PV aus dem Cache oder baut sie über `builder` neu.
+    Der Schlüssel enthält den Stempel: jede Änderung an Seite, Fragen oder Variablen
+    erzeugt einen neuen Schlüssel, veraltete Einträge laufen einfach aus.
+    """
+    key = pv_cache_key(page_id, wave_id, stamp)
+    text = pv_store().get(key)
+    if text is None:
+        text = builder()
+        pv_store().set(key, text, PV_CACHE_TIMEOUT)
+    return text
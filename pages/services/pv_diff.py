@@ -0,0 +1,202 @@
+# pages/services/pv_diff.py
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from diff_match_patch import diff_match_patch
+
+from pages.models import WavePage, WavePageWave
+
+from .pv_builder import build_pv
+from .pv_loader import load_pv_contexts
+from .pv_cache import PV_CACHE_TIMEOUT, PV_FORMAT_VERSION, pv_cache_key, pv_store, with_pv_stamp
+
+
+# Status einer Seite im Vergleich zweier Befragtengruppen
+STATUS_UNCHANGED = "unchanged"
+STATUS_CHANGED = "changed"
+STATUS_ADDED = "added"      # nur in Gruppe B
+STATUS_REMOVED = "removed"  # nur in Gruppe A
+
+# Zeilen-Operationen im Diff
+OP_EQUAL = "="
+OP_DELETE = "-"
+OP_INSERT = "+"
+
+_DMP_OPS = {
+    diff_match_patch.DIFF_EQUAL: OP_EQUAL,
+    diff_match_patch.DIFF_DELETE: OP_DELETE,
+    diff_match_patch.DIFF_INSERT: OP_INSERT,
+}
+
+
+@dataclass(frozen=True)
+class PageDiff:
+    page_id: int
+    pagename: str
+    status: str
+    lines: tuple[tuple[str, str], ...] = ()  # (Operation, Zeile)
+    added: int = 0
+    removed: int = 0
+
+
+@dataclass(frozen=True)
+class SurveyPVDiffResult:
+    wave_a_id: int
+    wave_b_id: int
+    pages: tuple[PageDiff, ...]
+    rediffed: int  # Anzahl Seiten, die neu verglichen werden mussten (Rest aus dem Cache)
+
+    @property
+    def changed_pages(self) -> tuple[PageDiff, ...]:
+        return tuple(p for p in self.pages if p.status != STATUS_UNCHANGED)
+
+
+def diff_pv_lines(text_a: str, text_b: str) -> list[tuple[str, str]]:
+    """
+    Zeilenbasierter Diff zweier PV-Texte (diff-match-patch im Line-Mode).
+    """
+    dmp = diff_match_patch()
+    chars_a, chars_b, line_array = dmp.diff_linesToChars(text_a or "", text_b or "")
+    diffs = dmp.diff_main(chars_a, chars_b, False)
+    dmp.diff_charsToLines(diffs, line_array)
+
+    result: list[tuple[str, str]] = []
+    for op, chunk in diffs:
+        for ln in chunk.splitlines():
+            result.append((_DMP_OPS[op], ln))
+    return result
+
+
+def _diff_cache_key(page_id: int, wave_a_id: int, wave_b_id: int, stamp_a: str, stamp_b: str) -> str:
+    digest = hashlib.sha1(f"{stamp_a}\n{stamp_b}".encode("utf-8")).hexdigest()
+    return f"pvdiff:{PV_FORMAT_VERSION}:{page_id}:{wave_a_id}:{wave_b_id}:{digest}"
+
+
+def _build_pv_texts(pages: Iterable, wave_id: int) -> dict[int, str]:
+    """
+    Baut die PV für mehrere Seiten einer Befragtengruppe (Loader mit konstanter Query-Anzahl).
+    """
+    contexts = load_pv_contexts(list(pages), wave_id=wave_id)
+    return {pid: build_pv(ctx) for pid, ctx in contexts.items()}
+
+
+def _get_pv_texts(pages: list, wave_id: int, stamp_attr: str) -> dict[int, str]:
+    """
+    PV-Texte aus dem Cache holen, fehlende gesammelt bauen und zurückschreiben.
+    """
+    if not pages:
+        return {}
+
+    keys = {p.id: pv_cache_key(p.id, wave_id, getattr(p, stamp_attr)) for p in pages}
+    cached = pv_store().get_many(list(keys.values()))
+
+    texts = {pid: cached[key] for pid, key in keys.items() if key in cached}
+    missing = [p for p in pages if p.id not in texts]
+    if missing:
+        built = _build_pv_texts(missing, wave_id)
+        pv_store().set_many({keys[pid]: txt for pid, txt in built.items()}, PV_CACHE_TIMEOUT)
+        texts.update(built)
+    return texts
+
+
+def diff_survey_pvs(*, wave_a, wave_b, only_page_ids: Optional[Iterable[int]] = None) -> SurveyPVDiffResult:
+    """
+    Vergleicht die PVs aller Seiten zweier Befragtengruppen.
+    Neu verglichen werden nur Seiten, deren Versionsstempel sich geändert hat;
+    alle anderen Ergebnisse kommen aus dem Cache.
+    """
+    if wave_a.survey_id != wave_b.survey_id:
+        raise ValueError("Die Befragtengruppen gehören nicht zur selben Befragung.")
+
+    # Zugehörigkeit und Reihenfolge der Seiten in beiden Gruppen (eine Query)
+    link_qs = (
+        WavePageWave.objects
+        .filter(wave_id__in=[wave_a.id, wave_b.id])
+        .select_related("module")
+    )
+    if only_page_ids is not None:
+        link_qs = link_qs.filter(page_id__in=list(only_page_ids))
+
+    order_a: dict[int, tuple] = {}
+    order_b: dict[int, tuple] = {}
+    for link in link_qs:
+        module_sort = link.module.sort_order if link.module_id else -1
+        target = order_a if link.wave_id == wave_a.id else order_b
+        target[link.page_id] = (module_sort, link.sort_order)
+
+    page_ids = set(order_a) | set(order_b)
+    if not page_ids:
+        return SurveyPVDiffResult(wave_a_id=wave_a.id, wave_b_id=wave_b.id, pages=(), rediffed=0)
+
+    # Seiten inkl. Versionsstempel für beide Gruppen (eine Query)
+    pages_qs = WavePage.objects.filter(id__in=page_ids)
+    pages_qs = with_pv_stamp(pages_qs, wave_a.id, name="stamp_a")
+    pages_qs = with_pv_stamp(pages_qs, wave_b.id, name="stamp_b")
+    pages = list(pages_qs)
+
+    # Reihenfolge wie im Fragebogen von Gruppe B, entfernte Seiten nach Position in A dahinter
+    pages.sort(key=lambda p: (
+        p.id not in order_b,
+        order_b.get(p.id) or order_a.get(p.id) or (0, 0),
+        p.pagename or "",
+    ))
+
+    # Diff-Ergebnisse gesammelt aus dem Cache holen
+    def stamp_of(p, side):
+        if side == "a":
+            return p.stamp_a if p.id in order_a else "-"
+        return p.stamp_b if p.id in order_b else "-"
+
+    diff_keys = {
+        p.id: _diff_cache_key(p.id, wave_a.id, wave_b.id, stamp_of(p, "a"), stamp_of(p, "b"))
+        for p in pages
+    }
+    cached = pv_store().get_many(list(diff_keys.values()))
+    results: dict[int, PageDiff] = {
+        pid: cached[key] for pid, key in diff_keys.items() if key in cached
+    }
+
+    stale = [p for p in pages if p.id not in results]
+    if stale:
+        texts_a = _get_pv_texts([p for p in stale if p.id in order_a], wave_a.id, "stamp_a")
+        texts_b = _get_pv_texts([p for p in stale if p.id in order_b], wave_b.id, "stamp_b")
+
+        fresh: dict[int, PageDiff] = {}
+        for p in stale:
+            in_a, in_b = p.id in order_a, p.id in order_b
+            text_a, text_b = texts_a.get(p.id, ""), texts_b.get(p.id, "")
+
+            if in_a and in_b and text_a == text_b:
+                fresh[p.id] = PageDiff(page_id=p.id, pagename=p.pagename, status=STATUS_UNCHANGED)
+                continue
+
+            lines = tuple(diff_pv_lines(text_a, text_b))
+            if not in_a:
+                status = STATUS_ADDED
+            elif not in_b:
+                status = STATUS_REMOVED
+            else:
+                status = STATUS_CHANGED
+
+            fresh[p.id] = PageDiff(
+                page_id=p.id,
+                pagename=p.pagename,
+                status=status,
+                lines=lines,
+                added=sum(1 for op, _ in lines if op == OP_INSERT),
+                removed=sum(1 for op, _ in lines if op == OP_DELETE),
+            )
+
+        pv_store().set_many({diff_keys[pid]: d for pid, d in fresh.items()}, PV_CACHE_TIMEOUT)
+        results.update(fresh)
+
+    return SurveyPVDiffResult(
+        wave_a_id=wave_a.id,
+        wave_b_id=wave_b.id,
+        pages=tuple(results[p.id] for p in pages),
+        rediffed=len(stale),
+    )
@@ -0,0 +1,202 @@
+# pages/services/pv_loader.py
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Iterable, Optional
+
+from pages.models import WavePage, WavePageQuestion
+from questions.models import Question
+from variables.models import QuestionVariableWave
+
+from .pv_builder import PVContext
+
+
+# Seitenfelder, die in die PV eingehen
+PV_PAGE_FIELDS = (
+    "id",
+    "pagename",
+    "page_heading",
+    "introduction",
+    "transition_control",
+    "visibility_conditions",
+    "answer_validations",
+    "correction_notes",
+    "forcing_variables",
+    "helper_variables",
+    "control_variables",
+    "formatting",
+    "transitions",
+    "page_programming_notes",
+)
+
+# Fragefelder, die in die PV eingehen
+PV_QUESTION_FIELDS = (
+    "id",
+    "question_type",
+    "question_type_other",
+    "questiontext",
+    "instruction",
+    "item_stem",
+    "missing_values",
+    "top_categories",
+    "items",
+    "answer_options",
+)
+
+_QUESTION_TYPE_LABELS = dict(Question.QuestionType.choices)
+
+
+@dataclass(frozen=True)
+class PVPage:
+    id: int
+    pagename: str = ""
+    page_heading: str = ""
+    introduction: str = ""
+    transition_control: str = ""
+    visibility_conditions: str = ""
+    answer_validations: str = ""
+    correction_notes: str = ""
+    forcing_variables: str = ""
+    helper_variables: str = ""
+    control_variables: str = ""
+    formatting: str = ""
+    transitions: str = ""
+    page_programming_notes: str = ""
+
+
+@dataclass(frozen=True)
+class PVQuestion:
+    id: int
+    question_type: str = ""
+    question_type_label: str = ""
+    question_type_other: str = ""
+    questiontext: str = ""
+    instruction: str = ""
+    item_stem: str = ""
+    missing_values: str = ""
+    top_categories: str = ""
+    items: tuple = ()
+    answer_options: tuple = ()
+
+    # gleiche Schnittstelle wie das Model (wird von build_pv genutzt)
+    def get_question_type_display(self) -> str:
+        return self.question_type_label
+
+
+def _freeze(value: Any) -> Any:
+    # JSON-Werte (items, answer_options) schreibgeschützt machen: dict -> MappingProxyType, list -> tuple
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _pv_page(page) -> PVPage:
+    if isinstance(page, PVPage):
+        return page
+    return PVPage(**{f: getattr(page, f) if f == "id" else (getattr(page, f) or "") for f in PV_PAGE_FIELDS})
+
+
+def load_pv_contexts(
+    pages: Iterable,
+    *,
+    wave_id: Optional[int] = None,
+    active_wave=None,
+) -> dict[int, PVContext]:
+    """
+    Lädt alle PV-Daten für beliebig viele Seiten mit konstant drei Queries
+    (Seiten, Fragen in Seitenreihenfolge, Variablennamen) und liefert je Seite
+    einen unveränderlichen PVContext: Records frozen, Mappings als MappingProxyType,
+    JSON-Listen als Tupel (auch verschachtelt), damit Nutzer eines geteilten Kontexts
+    ihn nicht verändern können.
+
+    `pages` darf Seiten-IDs oder bereits geladene WavePage-Objekte enthalten
+    (dann entfällt die Seiten-Query). Mit `wave_id` werden nur Variablen dieser Gruppe geladen.
+    """
+    if active_wave is not None and wave_id is None:
+        wave_id = active_wave.pk
+
+    given: dict[int, PVPage] = {}
+    missing_ids: list[int] = []
+    order: list[int] = []
+    for p in pages:
+        if isinstance(p, int):
+            missing_ids.append(p)
+            order.append(p)
+        else:
+            given[p.id] = _pv_page(p)
+            order.append(p.id)
+
+    # 1) Seiten
+    if missing_ids:
+        for row in WavePage.objects.filter(id__in=missing_ids).values(*PV_PAGE_FIELDS):
+            given[row["id"]] = PVPage(**{k: (v if k == "id" else (v or "")) for k, v in row.items()})
+
+    page_ids = [pid for pid in dict.fromkeys(order) if pid in given]
+    if not page_ids:
+        return {}
+
+    # 2) Fragen aller Seiten in Seitenreihenfolge
+    question_fields = [f"question__{f}" for f in PV_QUESTION_FIELDS]
+    questions_by_page: dict[int, list[PVQuestion]] = defaultdict(list)
+    for row in (
+        WavePageQuestion.objects
+        .filter(wave_page_id__in=page_ids)
+        .order_by("wave_page_id", "sort_order", "id")
+        .values_list("wave_page_id", *question_fields)
+    ):
+        page_id, values = row[0], dict(zip(PV_QUESTION_FIELDS, row[1:]))
+        qt = values["question_type"] or ""
+        questions_by_page[page_id].append(PVQuestion(
+            id=values["id"],
+            question_type=qt,
+            question_type_label=_QUESTION_TYPE_LABELS.get(qt, ""),
+            question_type_other=values["question_type_other"] or "",
+            questiontext=values["questiontext"] or "",
+            instruction=values["instruction"] or "",
+            item_stem=values["item_stem"] or "",
+            missing_values=values["missing_values"] or "",
+            top_categories=values["top_categories"] or "",
+            items=_freeze(values["items"] or ()),
+            answer_options=_freeze(values["answer_options"] or ()),
+        ))
+
+    # 3) Variablennamen aller Fragen (optional auf eine Gruppe beschränkt)
+    q_ids = {q.id for qs in questions_by_page.values() for q in qs}
+    varnames_by_qid: dict[int, list[str]] = defaultdict(list)
+    if q_ids:
+        qvw_qs = QuestionVariableWave.objects.filter(question_id__in=q_ids)
+        if wave_id is not None:
+            qvw_qs = qvw_qs.filter(wave_id=wave_id)
+        for qid, varname in (
+            qvw_qs.values_list("question_id", "variable__varname")
+            .distinct()
+            .order_by("question_id", "variable__varname")
+        ):
+            varnames_by_qid[qid].append(varname)
+
+    contexts: dict[int, PVContext] = {}
+    for pid in page_ids:
+        questions = tuple(questions_by_page.get(pid, ()))
+        contexts[pid] = PVContext(
+            page=given[pid],
+            questions=questions,
+            vars_by_qid=MappingProxyType({q.id: tuple(varnames_by_qid.get(q.id, ())) for q in questions}),
+            active_wave=active_wave,
+        )
+    return contexts
+
+
+def load_pv_context(page, *, wave_id: Optional[int] = None, active_wave=None) -> PVContext:
+    """
+    PVContext für eine einzelne Seite (ID oder WavePage).
+    """
+    page_id = page if isinstance(page, int) else page.id
+    contexts = load_pv_contexts([page], wave_id=wave_id, active_wave=active_wave)
+    if page_id not in contexts:
+        raise WavePage.DoesNotExist(f"WavePage {page_id} existiert nicht.")
+    return contexts[page_id]
@@ -19,9 +19,16 @@ urlpatterns = [
     # Ein POST-Endpunkt zum Löschen einer Seite
     path("<int:pk>/delete/", views.WavePageDeleteView.as_view(), name="page-delete"),
 
+    # Sammeloperationen (Löschen / Verschieben) für mehrere Seiten einer Befragtengruppe
+    path("api/waves/<int:wave_id>/pages/bulk/", views.WavePagesBulkApiView.as_view(), name="api-pages-bulk"),
+
     # Programmiervorlage (PV) einer Seite anzeigen
     path("<int:pk>/pv/", views.WavePagePVView.as_view(), name="pv"),
 
+    # PV-Vergleich zwischen zwei Befragtengruppen einer Befragung (HTML + JSON)
+    path("pv-diff/<int:survey_id>/", views.SurveyPVDiffView.as_view(), name="pv-diff"),
+    path("api/surveys/<int:survey_id>/pv-diff/", views.SurveyPVDiffApiView.as_view(), name="api-pv-diff"),
+
     # API für Modal zum Duplizieren von Seiten
     path("api/surveys/", views.SurveyListApiView.as_view(), name="api-surveys"),
     path("api/surveys/<int:survey_id>/waves/", views.WavesBySurveyApiView.as_view(), name="api-waves-by-survey"),
@@ -30,6 +37,9 @@ urlpatterns = [
     # Seite duplizieren
     path("<int:pk>/copy/", views.WavePageCopyView.as_view(), name="page-copy"),
 
+    # Mehrere Seiten bzw. ein ganzes Modul in andere Gruppen kopieren
+    path("api/waves/<int:wave_id>/pages/copy/", views.WavePagesBulkCopyApiView.as_view(), name="api-pages-bulk-copy"),
+
     # QML-Datei einer Seite anzeigen
     path("<int:pk>/qml/", views.WavePageQmlView.as_view(), name="page-qml"),
 
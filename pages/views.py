@@ -1,5 +1,6 @@
 # pages/views.py
 import re
+import json
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views import View
 from django.views.generic import DetailView, UpdateView, TemplateView
@@ -8,21 +9,31 @@ from django.http import JsonResponse
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.contrib import messages
 
-from accounts.mixins import EditorRequiredMixin
+from accounts.mixins import AsyncEditorRequiredMixin, EditorRequiredMixin
 
 from django.db import IntegrityError, transaction
-from django.db.models import Prefetch, OuterRef, Exists, Max
+from django.db.models import Prefetch, OuterRef, Exists
 
-from waves.models import Survey, WaveQuestion, Wave
-from .models import WavePage, WavePageQuestion, WavePageWave, WavePageQml
-from questions.models import Question, QuestionVariableWave
-from variables.models import Variable
+from waves.models import Survey, WaveQuestion, Wave, WaveModule
+from waves.services.lock_state import get_lock_state
+from .models import WavePage, WavePageQuestion, WavePageQml
+from questions.models import Question
 
 from .forms import WavePageBaseForm, WavePageContentForm, PageQuestionLinkFormSet
 
-from .services.pv_builder import PVContext, build_pv
+from .services.pv_builder import build_pv
+from .services.pv_loader import load_pv_context
+from .services.pv_cache import with_pv_stamp, compute_pv_stamp, get_or_build_pv
+from .services.pv_diff import diff_survey_pvs
 from .services.page_sync import sync_wavequestions_for_page
 from .services.page_cleanup import apply_question_removals_from_page
+from .services.page_copy import PageCopyError, copy_pages, load_target_waves
+from .services.page_bulk import (
+    BulkPageOperationError,
+    bulk_delete_pages,
+    bulk_move_pages,
+    resolve_wave_page_ids,
+)
 
 # Session-Key für verwaiste Fragen-Review
 ORPHAN_REVIEW_SESSION_KEY = "orphan_review"
@@ -49,6 +60,25 @@ def _get_active_wave_from_qs(request, waves_qs, *, default_first=True):
     return active_wave
 
 
+# Helper: ID aus JSON-Payload (int oder Ziffern-String, kein bool); None, falls ungültig
+def _json_id(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isascii() and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+# Helper: ID-Liste aus JSON-Payload; None, falls keine Liste oder eine ID ungültig ist
+def _json_id_list(values):
+    if not isinstance(values, list):
+        return None
+    ids = [_json_id(v) for v in values]
+    return None if any(i is None for i in ids) else ids
+
+
 # Helper: Frage-IDs aus POST-Daten extrahieren
 def _extract_posted_question_ids(post_data, prefix="qfs"):
     ids = set()
@@ -188,10 +218,6 @@ class WavePageDetailView(DetailView):
             )
         )
 
-        # Vollständigkeitsinfo ran hängen (nur für Editoren erforderlich)
-        if self.can_edit:
-            qs = qs.with_completeness()
-
         return qs
     
 
@@ -224,43 +250,23 @@ class WavePageDetailView(DetailView):
             )
         
         # Gib die Info mit, ob die Seite mit einer gesperrten Befragung verknüpft ist
-        page_is_locked = waves_qs.filter(is_locked=True).exists()    
+        lock_state = get_lock_state(self.request)
+        page_is_locked = lock_state.is_page_locked(page.pk)
 
         question_ids = list(
             page_questions_qs.values_list("question_id", flat=True).distinct()
         )
 
         # locked-Flag setzen
-        locked_question_ids = set()
-        if question_ids:
-            locked_question_ids = set(
-                WaveQuestion.objects.filter(
-                    question_id__in=question_ids,
-                    wave__is_locked=True,
-                ).values_list("question_id", flat=True)
-            )
+        locked_question_ids = lock_state.locked_question_ids(question_ids)
 
         for pq in page_questions_qs:
             pq.question_is_locked = pq.question_id in locked_question_ids
 
 
-        if self.can_edit and question_ids:
-            questions_by_id = {
-                q.id: q
-                for q in (
-                    Question.objects
-                    .filter(id__in=question_ids)
-                    .with_completeness()
-                    .only("id")
-                )
-            }
-            
-            for pq in page_questions_qs:
-                q = questions_by_id.get(pq.question_id)
-                pq.question_is_incomplete = bool(getattr(q, "is_incomplete", False))
-        else:
-            for pq in page_questions_qs:
-                pq.question_is_incomplete = False
+        # Vollständigkeit steht gespeichert an der Frage (per select_related geladen)
+        for pq in page_questions_qs:
+            pq.question_is_incomplete = self.can_edit and pq.question.is_incomplete
 
         # QML-Info mitgeben
         try:
@@ -687,6 +693,78 @@ class WavePageDeleteView(EditorRequiredMixin, View):
     
 
 
+# API-View: Sammeloperationen (Löschen / Verschieben) für mehrere Seiten einer Befragtengruppe
+# Payload: {"action": "delete"|"move", "page_ids": [...]} oder {"action": ..., "module_id": X}
+#          bei "move" zusätzlich "target_module_id" (null = ohne Modul)
+class WavePagesBulkApiView(EditorRequiredMixin, View):
+    http_method_names = ["post"]
+
+    def post(self, request, wave_id, *args, **kwargs):
+        wave = get_object_or_404(Wave.objects.select_related("survey"), pk=wave_id)
+
+        if wave.is_locked:
+            return JsonResponse({"ok": False, "error": "Befragung ist gesperrt."}, status=403)
+
+        try:
+            payload = json.loads(request.body.decode("utf-8"))
+        except Exception:
+            return JsonResponse({"ok": False, "error": "Ungültiges JSON."}, status=400)
+
+        if not isinstance(payload, dict):
+            return JsonResponse({"ok": False, "error": "Payload ungültig."}, status=400)
+
+        action = payload.get("action")
+        if action not in ("delete", "move"):
+            return JsonResponse({"ok": False, "error": "action ungültig."}, status=400)
+
+        page_ids = payload.get("page_ids")
+        module_id = payload.get("module_id")
+        target_module_id = payload.get("target_module_id")
+
+        if page_ids is not None and (not isinstance(page_ids, list) or any(isinstance(x, bool) for x in page_ids)):
+            return JsonResponse({"ok": False, "error": "page_ids ungültig."}, status=400)
+        for val in (module_id, target_module_id):
+            if val is not None and (isinstance(val, bool) or not isinstance(val, int)):
+                return JsonResponse({"ok": False, "error": "module_id ungültig."}, status=400)
+
+        if wave.survey:
+            return_url = reverse("waves:survey_detail", kwargs={"survey_name": wave.survey.name})
+            return_url = f"{return_url}?wave={wave.id}"
+        else:
+            return_url = reverse("waves:survey_list")
+
+        try:
+            ids = resolve_wave_page_ids(wave=wave, page_ids=page_ids, module_id=module_id)
+
+            if action == "move":
+                result = bulk_move_pages(wave=wave, page_ids=ids, target_module_id=target_module_id)
+                return JsonResponse({"ok": True, "moved": result.moved_pages})
+
+            result = bulk_delete_pages(page_ids=ids)
+        except (TypeError, ValueError):
+            return JsonResponse({"ok": False, "error": "page_ids enthält ungültige IDs."}, status=400)
+        except BulkPageOperationError as e:
+            return JsonResponse({"ok": False, "error": str(e)}, status=400)
+
+        # Eine gemeinsame Orphan-Prüfung für alle gelöschten Seiten
+        if result.orphan_question_ids:
+            request.session[ORPHAN_REVIEW_SESSION_KEY] = {
+                "question_ids": result.orphan_question_ids,
+                "return_url": return_url,
+            }
+            redirect_url = reverse("pages:orphan_questions_review")
+        else:
+            redirect_url = return_url
+
+        messages.success(request, f"{result.deleted_pages} Seite(n) wurden gelöscht.")
+        return JsonResponse({
+            "ok": True,
+            "deleted": result.deleted_pages,
+            "orphans": len(result.orphan_question_ids),
+            "redirect_url": redirect_url,
+        })
+
+
 # View zur Überprüfung verwaister Fragen
 class OrphanQuestionsReviewView(EditorRequiredMixin, View):
     template_name = "pages/orphan_questions_review.html"
@@ -743,54 +821,122 @@ class WavePagePVView(EditorRequiredMixin, DetailView):
     template_name = "pages/pv.html"
     context_object_name = "page"
 
+    # Befragtengruppe aus ?wave= (None = alle)
+    def _requested_wave_id(self):
+        try:
+            return int(self.request.GET.get("wave") or 0) or None
+        except ValueError:
+            return None
+
+    # Versionsstempel direkt mit der Seite laden (keine Zusatzquery)
+    def get_queryset(self):
+        return with_pv_stamp(super().get_queryset(), self._requested_wave_id())
+
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         page = self.object
 
         # active_wave 
-        wave_id = self.request.GET.get("wave")
+        wave_id = self._requested_wave_id()
         active_wave = None
+        stamp = page.pv_stamp
         if wave_id:
-            try:
-                active_wave = Wave.objects.get(pk=int(wave_id))
-            except (ValueError, Wave.DoesNotExist):
-                active_wave = None
+            active_wave = Wave.objects.filter(pk=wave_id).first()
+            if active_wave is None:
+                # unbekannte Befragtengruppe -> PV über alle Gruppen
+                wave_id = None
+                stamp = compute_pv_stamp(page.pk)
+
+        def _build():
+            # Seite, Fragen und Variablen mit konstanter Anzahl Queries laden
+            return build_pv(load_pv_context(page, active_wave=active_wave))
+
+        # PV nur neu bauen, wenn sich Seite, Fragen oder Variablen geändert haben
+        pv_text = get_or_build_pv(
+            page_id=page.pk,
+            wave_id=wave_id,
+            stamp=stamp,
+            builder=_build,
+        )
 
+        ctx["active_wave"] = active_wave
+        ctx["pv_text"] = pv_text
+        return ctx
 
-        # Fragen der Seite
-        links = page.page_questions.select_related("question").order_by("sort_order", "id")
-        questions = [l.question for l in links]
-        q_ids = [q.id for q in questions]
 
-        # Variablen der Fragen, jede Frage bekommt einen Key (auch wenn leer)
-        vars_by_qid = {q.id: [] for q in questions}
+# Helper: Befragtengruppen A/B für den PV-Vergleich aus ?a= und ?b= ermitteln
+def _resolve_pv_diff_waves(request, survey):
+    waves = list(Wave.objects.filter(survey=survey).order_by("cycle", "instrument", "id"))
+    by_id = {w.id: w for w in waves}
 
-        if q_ids:
-            qvw_qs = QuestionVariableWave.objects.filter(question_id__in=q_ids)
-    
-            if active_wave:
-                qvw_qs = qvw_qs.filter(wave=active_wave)
-         
-      
-            for qid, varname in (
-                qvw_qs.values_list("question_id", "variable__varname")
-                .distinct()
-                .order_by("question_id", "variable__varname")
-            ):
-                vars_by_qid[qid].append(varname)
-
-        pv_text = build_pv(PVContext(
-            page=page,
-            questions=questions,
-            vars_by_qid=vars_by_qid,
-            active_wave=active_wave,
-        ))
+    def pick(param):
+        try:
+            return by_id.get(int(request.GET.get(param) or 0))
+        except ValueError:
+            return None
 
-        ctx["active_wave"] = active_wave
-        ctx["pv_text"] = pv_text
+    return waves, pick("a"), pick("b")
+
+
+# View: PV-Vergleich aller Seiten einer Befragung zwischen zwei Befragtengruppen
+class SurveyPVDiffView(EditorRequiredMixin, TemplateView):
+    template_name = "pages/pv_diff.html"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        survey = get_object_or_404(Survey, pk=self.kwargs["survey_id"])
+        waves, wave_a, wave_b = _resolve_pv_diff_waves(self.request, survey)
+
+        result = None
+        if wave_a and wave_b and wave_a.id != wave_b.id:
+            result = diff_survey_pvs(wave_a=wave_a, wave_b=wave_b)
+
+        ctx.update({
+            "survey": survey,
+            "waves": waves,
+            "wave_a": wave_a,
+            "wave_b": wave_b,
+            "result": result,
+            "show_all": self.request.GET.get("all") == "1",
+        })
         return ctx
 
 
+# API-View: PV-Vergleich als JSON
+class SurveyPVDiffApiView(EditorRequiredMixin, View):
+    http_method_names = ["get"]
+
+    def get(self, request, survey_id, *args, **kwargs):
+        survey = get_object_or_404(Survey, pk=survey_id)
+        _, wave_a, wave_b = _resolve_pv_diff_waves(request, survey)
+
+        if not wave_a or not wave_b:
+            return JsonResponse({"ok": False, "error": "Ungültige Befragtengruppen (a, b)."}, status=400)
+        if wave_a.id == wave_b.id:
+            return JsonResponse({"ok": False, "error": "Bitte zwei unterschiedliche Befragtengruppen wählen."}, status=400)
+
+        result = diff_survey_pvs(wave_a=wave_a, wave_b=wave_b)
+        pages = result.pages if request.GET.get("all") == "1" else result.changed_pages
+
+        return JsonResponse({
+            "ok": True,
+            "wave_a": wave_a.id,
+            "wave_b": wave_b.id,
+            "rediffed": result.rediffed,
+            "pages": [
+                {
+                    "id": d.page_id,
+                    "pagename": d.pagename,
+                    "status": d.status,
+                    "added": d.added,
+                    "removed": d.removed,
+                    "lines": [[op, text] for op, text in d.lines],
+                }
+                for d in pages
+            ],
+        })
+
+
 # API-View: Liste der Surveys für Modal zum Duplizieren von Seiten
 class SurveyListApiView(EditorRequiredMixin, View):
     http_method_names = ["get"]
@@ -834,10 +980,10 @@ class WavesBySurveyApiView(EditorRequiredMixin, View):
 
 
 # API-View: Live-Prüfung, ob ein Seitenname in einem Survey schon existiert
-class CheckPageNameApiView(EditorRequiredMixin, View):
+class CheckPageNameApiView(AsyncEditorRequiredMixin, View):
     http_method_names = ["get"]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         survey_id = request.GET.get("survey_id")
         pagename = (request.GET.get("pagename") or "").strip()
 
@@ -846,11 +992,10 @@ class CheckPageNameApiView(EditorRequiredMixin, View):
 
         # Name darf im Ziel-Survey nicht schon existieren
         # (konkret: existiert eine Seite mit diesem Namen, die an irgendeiner Gruppe dieses Surveys hängt?)
-        exists = (
+        exists = await (
             WavePage.objects
             .filter(pagename=pagename, waves__survey_id=survey_id)
-            .distinct()
-            .exists()
+            .aexists()
         )
         return JsonResponse({"ok": not exists})
 
@@ -887,152 +1032,107 @@ class WavePageCopyView(EditorRequiredMixin, View):
         if not new_pagename:
             return err("Bitte einen neuen Seitennamen angeben.")
 
-        # target-Befragungsgruppen sauber bestimmen (Gruppe muss zum ausgewählten Survey gehören)
-        # (IDs normalisieren, damit count/vergleich stabil bleibt)
+        # Zielgruppen prüfen, Seite samt Fragen/Variablen kopieren (Service)
         try:
-            target_wave_ids_int = sorted({int(x) for x in target_wave_ids})
-        except ValueError:
-            return err("Ungültige Gruppenauswahl.")
-
-        target_waves_qs = Wave.objects.filter(id__in=target_wave_ids_int, survey_id=target_survey_id)
-        target_waves = list(target_waves_qs.order_by("cycle", "instrument", "id"))
-
-        if len(target_waves) != len(target_wave_ids_int):
-            return err("Ungültige Gruppen (gehören nicht zur gewählten Befragung).")
-
-        if any(w.is_locked for w in target_waves):
-            return err("Mindestens eine ausgewählte Gruppe ist gesperrt. Kopieren nicht möglich.", status=403)
-
-        name_exists = (
-            WavePage.objects
-            .filter(pagename=new_pagename, waves__survey_id=target_survey_id)
-            .distinct()
-            .exists()
-        )
-        if name_exists:
-            return err("Dieser Seitenname existiert in der Ziel-Befragung bereits.")
-        
-
-
-        # --- 1) Seite duplizieren (Inhalte kopieren)
-        new_page = WavePage.objects.create(
-            pagename=new_pagename,
-            page_heading=source_page.page_heading,
-            introduction=source_page.introduction,
-            transition_control=source_page.transition_control,
-            visibility_conditions=source_page.visibility_conditions,
-            answer_validations=source_page.answer_validations,
-            correction_notes=source_page.correction_notes,
-            forcing_variables=source_page.forcing_variables,
-            helper_variables=source_page.helper_variables,
-            control_variables=source_page.control_variables,
-            formatting=source_page.formatting,
-            transitions=source_page.transitions,
-            page_programming_notes=source_page.page_programming_notes,
-        )
-
-        try:
-            with transaction.atomic():
-                for w in target_waves:
-                    next_pos = (WavePageWave.objects.filter(wave=w).aggregate(m=Max("sort_order"))["m"] or 0) + 1
-                    WavePageWave.objects.create(wave=w, page=new_page, sort_order=next_pos)
-                    
+            target_waves = load_target_waves(survey_id=target_survey_id, wave_ids=target_wave_ids)
+            result = copy_pages(
+                sources=[(source_page.pk, new_pagename)],
+                target_waves=target_waves,
+                include_questions=include_questions,
+                include_variables=include_variables,
+            )
+        except PageCopyError as e:
+            if e.collisions:
+                return err("Dieser Seitenname existiert in der Ziel-Befragung bereits.")
+            return err(str(e), status=e.status)
         except IntegrityError:
             return err(
             "Kopieren nicht möglich: Ziel verletzt Datenbank-Regeln "
             "(Seitenname im Survey bereits vorhanden oder Survey-Zuordnung nicht eindeutig)."
             )
-        
-        # Bestimme alle Fragen auf der Quell-Seite
-        source_page_links = []
-        qids: list[int] = []
-
-        if include_questions or include_variables:
-            source_page_links = list(
-                WavePageQuestion.objects
-                .filter(wave_page=source_page)
-                .order_by("sort_order", "id")
-            )
-            qids = [link.question_id for link in source_page_links]
 
-        # aktuell: ohne Fragen auch keine Vars
-        # --> evtl. später anpassen, wenn es technische Vars auf Seiten geben sollte, die unabhängig von Fragen sind
-        if not qids:
-            include_variables = False
+        return JsonResponse({"ok": True, "new_page_id": result.new_page_ids[0]})
 
 
+# API-View: mehrere Seiten (Liste oder ganzes Modul) einer Befragtengruppe in andere Gruppen kopieren
+# Payload: {"page_ids": [...]} oder {"module_id": X}, dazu "target_survey_id", "target_wave_ids",
+#          optional "pagename_suffix", "include_questions", "include_variables"
+class WavePagesBulkCopyApiView(EditorRequiredMixin, View):
+    http_method_names = ["post"]
 
-        # --- 2) Fragen übernehmen
-        if include_questions:
-            WavePageQuestion.objects.bulk_create(
-                [
-                    WavePageQuestion(
-                        wave_page=new_page,
-                        question_id=link.question_id,
-                        sort_order=link.sort_order,
-                    )
-                    for link in source_page_links
-                ],
-                ignore_conflicts=True,
-            )
+    def post(self, request, wave_id, *args, **kwargs):
+        source_wave = get_object_or_404(Wave, pk=wave_id)
 
-            # Links Frage->Gruppe kopieren
-            WaveQuestion.objects.bulk_create(
-                [WaveQuestion(wave_id=w.id, question_id=qid) for w in target_waves for qid in qids],
-                ignore_conflicts=True,
-            )
+        try:
+            payload = json.loads(request.body.decode("utf-8"))
+        except Exception:
+            return JsonResponse({"ok": False, "error": "Ungültiges JSON."}, status=400)
+
+        if not isinstance(payload, dict):
+            return JsonResponse({"ok": False, "error": "Payload ungültig."}, status=400)
+
+        page_ids = payload.get("page_ids")
+        module_id = payload.get("module_id")
+        target_survey_id = payload.get("target_survey_id")
+        target_wave_ids = payload.get("target_wave_ids")
+        suffix = (payload.get("pagename_suffix") or "").strip()
+        include_questions = bool(payload.get("include_questions", True))
+        include_variables = bool(payload.get("include_variables", False))
+
+        # wie beim Kopieren einer einzelnen Seite: ohne Fragen auch keine Vars
+        if include_variables and not include_questions:
+            include_variables = False
 
+        def err(msg, status=400):
+            return JsonResponse({"ok": False, "error": msg}, status=status)
 
-        # --- 3) Variablen übernehmen
-        # Quell-Survey bestimmen. Es werden nur Variablen kopiert, die im Quell-Survey an den Seitenfragen hängen.
-        if include_variables:
+        # IDs vorab einzeln prüfen, damit Fehler der richtigen Angabe zugeordnet werden
+        if page_ids is not None:
+            page_ids = _json_id_list(page_ids)
+            if page_ids is None:
+                return err("page_ids enthält ungültige IDs.")
+        if module_id is not None:
+            module_id = _json_id(module_id)
+            if module_id is None:
+                return err("module_id ungültig.")
+
+        if target_survey_id in (None, ""):
+            return err("Bitte eine Ziel-Befragung auswählen.")
+        target_survey_id = _json_id(target_survey_id)
+        if target_survey_id is None:
+            return err("target_survey_id ungültig.")
 
-            source_survey_ids = list(
-                source_page.waves.values_list("survey_id", flat=True).distinct()
-            )
-        
-            if not source_survey_ids:
-                return err("Quelle konnte nicht bestimmt werden (Seite hat keine Waves).")
-            if len(source_survey_ids) > 1:
-                return err("Quelle ist nicht eindeutig (Seite hängt an mehreren Befragungen).")
-            source_survey_id = source_survey_ids[0]
-
-            # Alle Gruppen des Quell-Surveys bestimmen
-            source_wave_ids = list(
-                Wave.objects.filter(survey_id=source_survey_id).values_list("id", flat=True)
-            )
+        if not target_wave_ids:
+            return err("Bitte mindestens eine Gruppe auswählen.")
+        target_wave_ids = _json_id_list(target_wave_ids)
+        if target_wave_ids is None:
+            return err("target_wave_ids enthält ungültige IDs.")
 
-            # Alle (question, variable)-Paare, die irgendwo im Quell-Survey an den Seitenfragen hängen
-            qv_pairs = list(
-                QuestionVariableWave.objects.filter(
-                    question_id__in=qids,
-                    wave_id__in=source_wave_ids
-                )
-                .values_list("question_id", "variable_id")
-                .distinct()
+        try:
+            ids = resolve_wave_page_ids(wave=source_wave, page_ids=page_ids, module_id=module_id)
+            target_waves = load_target_waves(survey_id=target_survey_id, wave_ids=target_wave_ids)
+
+            names = dict(WavePage.objects.filter(id__in=ids).values_list("id", "pagename"))
+            module_name = None
+            if page_ids is None and module_id is not None:
+                module_name = WaveModule.objects.values_list("name", flat=True).get(pk=module_id)
+
+            result = copy_pages(
+                sources=[(pid, f"{names[pid]}{suffix}") for pid in ids],
+                target_waves=target_waves,
+                include_questions=include_questions,
+                include_variables=include_variables,
+                target_module_name=module_name,
             )
-
-            if qv_pairs:
-                target_wave_ids_for_pairs = [w.id for w in target_waves]
-
-                # 3a) Triaden für alle Ziel-Waves setzen
-                qvw_rows = [
-                    QuestionVariableWave(question_id=qid, variable_id=vid, wave_id=wid)
-                    for (qid, vid) in qv_pairs
-                    for wid in target_wave_ids_for_pairs
-                ]
-                QuestionVariableWave.objects.bulk_create(qvw_rows, ignore_conflicts=True)
-
-                # 3b) Direktes Variable↔Wave M2M setzen
-                var_ids = sorted({vid for (_, vid) in qv_pairs})
-
-                through = Variable.waves.through
-                m2m_rows = [
-                    through(variable_id=vid, wave_id=wid)
-                    for vid in var_ids
-                    for wid in target_wave_ids_for_pairs
-                ]
-                through.objects.bulk_create(m2m_rows, ignore_conflicts=True)
-
-        
-        return JsonResponse({"ok": True, "new_page_id": new_page.pk})
+        except BulkPageOperationError as e:
+            return JsonResponse({"ok": False, "error": str(e)}, status=400)
+        except PageCopyError as e:
+            if e.collisions:
+                return JsonResponse({"ok": False, "error": str(e), "collisions": list(e.collisions)}, status=409)
+            return JsonResponse({"ok": False, "error": str(e)}, status=e.status)
+
+        return JsonResponse({
+            "ok": True,
+            "copied": len(result.page_map),
+            "new_page_ids": result.new_page_ids,
+        })
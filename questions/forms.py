@@ -35,17 +35,39 @@ class QuestionEditForm(forms.ModelForm):
             "required": "Bitte gib einen Fragetext ein.",
         })
 
-        # Sort the construct and keyword querysets
-        self.fields["construct"].queryset = Construct.objects.order_by("level_1", "level_2")
-        self.fields["keywords"].queryset = Keyword.objects.order_by("name")
-
-
-        # Rendering: nur selected options ausgeben (verhindert lokale Suche ab 1 Zeichen)
-        selected = []
-        if self.instance and self.instance.pk:
-            selected = list(self.instance.keywords.order_by("name").values_list("pk", "name"))
-
-        self.fields["keywords"].choices = selected
+        # Konstrukt und Schlagworte werden asynchron gesucht (TomSelect):
+        # Validierung lädt nur die übermittelten PKs, gerendert werden nur die ausgewählten Optionen
+        self.fields["construct"].queryset = Construct.objects.all()
+        self.fields["keywords"].queryset = Keyword.objects.all()
+
+        self.fields["construct"].choices = [("", self.fields["construct"].empty_label or "")] + [
+            (c.pk, str(c))
+            for c in Construct.objects.filter(pk__in=self._selected_pks("construct")).order_by("level_1", "level_2")
+        ]
+        self.fields["keywords"].choices = list(
+            Keyword.objects.filter(pk__in=self._selected_pks("keywords")).order_by("name").values_list("pk", "name")
+        )
+
+    # Helper: aktuell ausgewählte PKs eines Auswahlfelds (POST-Daten bzw. Werte der Frage)
+    def _selected_pks(self, name) -> list[int]:
+        if self.is_bound:
+            widget = self.fields[name].widget
+            raw = widget.value_from_datadict(self.data, self.files, self.add_prefix(name))
+        else:
+            raw = self.initial.get(name)
+
+        if raw in (None, ""):
+            return []
+        if not isinstance(raw, (list, tuple)):
+            raw = [raw]
+
+        pks = []
+        for value in raw:
+            try:
+                pks.append(int(getattr(value, "pk", value)))
+            except (TypeError, ValueError):
+                continue
+        return pks
 
 
     def clean(self):
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+# Prefix-Suche (LIKE 'abc%') auf lower(name) für das Keyword-Autocomplete;
+# der Unique-Index auf lower(name) ist dafür bei nicht-C-Collation nicht nutzbar.
+SQL_FORWARDS = """
+CREATE INDEX IF NOT EXISTS ix_keyword_name_prefix
+  ON questions_keyword
+  (lower(name) varchar_pattern_ops);
+"""
+
+SQL_BACKWARDS = """
+DROP INDEX IF EXISTS ix_keyword_name_prefix;
+"""
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_FORWARDS)
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_BACKWARDS)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("questions", "0023_question_updated_at"),
+    ]
+
+    operations = [migrations.RunPython(forwards, backwards)]
@@ -0,0 +1,142 @@
+from django.db import migrations, models
+
+# Vollständigkeit einer Frage wird beim Schreiben per Trigger berechnet und gespeichert,
+# statt bei jedem Lesen zwei korrelierte EXISTS-Subqueries auszuwerten.
+# Unvollständig = Fragetext/Fragetyp/Antwortoptionen fehlen, keine Variable (Triade)
+# oder kein Schlagwort. Neben der Frage selbst lösen auch Änderungen an den
+# Schlagwort-Zuordnungen und an den Triaden eine Neuberechnung aus.
+SQL_FORWARDS = """
+CREATE OR REPLACE FUNCTION questions_question_is_incomplete(
+  q_id bigint, q_text text, q_type text, q_answer_options jsonb
+) RETURNS boolean AS $$
+  SELECT coalesce(q_text, '') = ''
+      OR coalesce(q_type, '') = ''
+      OR q_answer_options IS NULL
+      OR q_answer_options = '[]'::jsonb
+      OR NOT EXISTS (SELECT 1 FROM variables_questionvariablewave t WHERE t.question_id = q_id)
+      OR NOT EXISTS (SELECT 1 FROM questions_question_keywords k WHERE k.question_id = q_id);
+$$ LANGUAGE sql STABLE;
+
+-- Frage selbst
+CREATE OR REPLACE FUNCTION questions_question_incomplete_fn() RETURNS trigger AS $$
+BEGIN
+  NEW.is_incomplete := questions_question_is_incomplete(
+    NEW.id, NEW.questiontext, NEW.question_type, NEW.answer_options::jsonb
+  );
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS questions_question_incomplete_trg ON questions_question;
+CREATE TRIGGER questions_question_incomplete_trg
+BEFORE INSERT OR UPDATE OF questiontext, question_type, answer_options, is_incomplete ON questions_question
+FOR EACH ROW
+EXECUTE FUNCTION questions_question_incomplete_fn();
+
+-- Neuberechnung für betroffene Fragen (nur Zeilen, deren Wert sich ändert)
+CREATE OR REPLACE FUNCTION questions_question_refresh_incomplete(q_ids bigint[]) RETURNS void AS $$
+  UPDATE questions_question q
+  SET is_incomplete = questions_question_is_incomplete(q.id, q.questiontext, q.question_type, q.answer_options::jsonb)
+  WHERE q.id = ANY(q_ids)
+    AND q.is_incomplete IS DISTINCT FROM
+        questions_question_is_incomplete(q.id, q.questiontext, q.question_type, q.answer_options::jsonb);
+$$ LANGUAGE sql;
+
+-- Schlagwort-Zuordnungen und Triaden (statement-level, Transition Tables)
+CREATE OR REPLACE FUNCTION questions_question_incomplete_related_fn() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM questions_question_refresh_incomplete(ARRAY(SELECT DISTINCT question_id FROM new_rows));
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM questions_question_refresh_incomplete(ARRAY(SELECT DISTINCT question_id FROM old_rows));
+  ELSE
+    PERFORM questions_question_refresh_incomplete(ARRAY(
+      SELECT question_id FROM new_rows UNION SELECT question_id FROM old_rows
+    ));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS questions_kw_incomplete_ins_trg ON questions_question_keywords;
+CREATE TRIGGER questions_kw_incomplete_ins_trg
+AFTER INSERT ON questions_question_keywords
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION questions_question_incomplete_related_fn();
+
+DROP TRIGGER IF EXISTS questions_kw_incomplete_del_trg ON questions_question_keywords;
+CREATE TRIGGER questions_kw_incomplete_del_trg
+AFTER DELETE ON questions_question_keywords
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION questions_question_incomplete_related_fn();
+
+DROP TRIGGER IF EXISTS questions_qvw_incomplete_ins_trg ON variables_questionvariablewave;
+CREATE TRIGGER questions_qvw_incomplete_ins_trg
+AFTER INSERT ON variables_questionvariablewave
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION questions_question_incomplete_related_fn();
+
+DROP TRIGGER IF EXISTS questions_qvw_incomplete_del_trg ON variables_questionvariablewave;
+CREATE TRIGGER questions_qvw_incomplete_del_trg
+AFTER DELETE ON variables_questionvariablewave
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION questions_question_incomplete_related_fn();
+
+DROP TRIGGER IF EXISTS questions_qvw_incomplete_upd_trg ON variables_questionvariablewave;
+CREATE TRIGGER questions_qvw_incomplete_upd_trg
+AFTER UPDATE ON variables_questionvariablewave
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION questions_question_incomplete_related_fn();
+
+-- Bestand berechnen
+UPDATE questions_question q
+SET is_incomplete = questions_question_is_incomplete(q.id, q.questiontext, q.question_type, q.answer_options::jsonb);
+"""
+
+SQL_BACKWARDS = """
+DROP TRIGGER IF EXISTS questions_qvw_incomplete_upd_trg ON variables_questionvariablewave;
+DROP TRIGGER IF EXISTS questions_qvw_incomplete_del_trg ON variables_questionvariablewave;
+DROP TRIGGER IF EXISTS questions_qvw_incomplete_ins_trg ON variables_questionvariablewave;
+DROP TRIGGER IF EXISTS questions_kw_incomplete_del_trg ON questions_question_keywords;
+DROP TRIGGER IF EXISTS questions_kw_incomplete_ins_trg ON questions_question_keywords;
+DROP TRIGGER IF EXISTS questions_question_incomplete_trg ON questions_question;
+DROP FUNCTION IF EXISTS questions_question_incomplete_related_fn();
+DROP FUNCTION IF EXISTS questions_question_refresh_incomplete(bigint[]);
+DROP FUNCTION IF EXISTS questions_question_incomplete_fn();
+DROP FUNCTION IF EXISTS questions_question_is_incomplete(bigint, text, text, jsonb);
+"""
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_FORWARDS)
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_BACKWARDS)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0024_keyword_name_prefix_index'),
+        ('variables', '0016_variable_is_incomplete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='is_incomplete',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('is_incomplete', True)), fields=['id'], name='idx_question_incomplete'),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
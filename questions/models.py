@@ -1,38 +1,14 @@
 from django.db import models
 from django.urls import reverse
 from django.db.models.functions import Lower 
-from django.db.models import BooleanField, Case, When, Value, Q, OuterRef, Exists
-from variables.models import QuestionVariableWave  
+from django.db.models import Q
 
 
-# Completeness check for Question model
+# QuerySet für Fragen (Vollständigkeit wird per DB-Trigger in `is_incomplete` gepflegt)
 class QuestionQuerySet(models.QuerySet):
 
-    def with_completeness(self):
-
-        # Triad: hat die Frage überhaupt Variablen?
-        triad_exists = QuestionVariableWave.objects.filter(question_id=OuterRef("pk"))
-
-        # Keywords Exists auf M2M-through
-        kw_through = Question.keywords.through
-        kw_exists = kw_through.objects.filter(question_id=OuterRef("pk"))
-
-        # Fehlende Kernelemente
-        missing_core = (
-            Q(questiontext__isnull=True) | Q(questiontext="") |
-            Q(question_type__isnull=True) | Q(question_type="") |
-            Q(answer_options__isnull=True) | Q(answer_options=[])
-        )
-
-        incomplete_expr = missing_core | ~Exists(triad_exists) | ~Exists(kw_exists)
-
-        return self.annotate(
-            is_incomplete=Case(
-                When(incomplete_expr, then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
-            )
-        )
+    def incomplete(self):
+        return self.filter(is_incomplete=True)
 
 
 class Keyword(models.Model):
@@ -184,6 +160,17 @@ class Question(models.Model):
         related_name="questions",
     )
 
+    # Zeitpunkt der letzten Änderung (u. a. für den Versionsstempel der PV)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Unvollständig (Kernelemente, Variablen oder Schlagworte fehlen); per DB-Trigger gepflegt
+    is_incomplete = models.BooleanField(default=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["id"], condition=Q(is_incomplete=True), name="idx_question_incomplete"),
+        ]
+
     def __str__(self):
         text = (self.questiontext or "").strip()
 
@@ -1,48 +1,77 @@
 from import_export import resources, fields
-from import_export.widgets import ManyToManyWidget, ForeignKeyWidget
+from SLC.slc_import import (
+    BULK_BATCH_SIZE,
+    BulkImportMixin,
+    CachedForeignKeyWidget,
+    CachedManyToManyWidget,
+    bulk_m2m_attribute,
+)
 from .models import Question, Keyword, ConstructPaper, Construct
+from .services.keyword_search import invalidate_keyword_cache
 
-class ConstructPaperResource(resources.ModelResource):
+class ConstructPaperResource(BulkImportMixin, resources.ModelResource):
     class Meta:
         model = ConstructPaper
         fields = ("id", "legacy_id", "title", "filepath",)
         import_id_fields = ("legacy_id",)
+        use_bulk = True
+        batch_size = BULK_BATCH_SIZE
 
 
-class ConstructResource(resources.ModelResource):
+class ConstructResource(BulkImportMixin, resources.ModelResource):
     constructpaper = fields.Field(
         column_name="constructpaper_legacy_id",
         attribute="constructpaper",
-        widget=ForeignKeyWidget(ConstructPaper, "legacy_id"),
+        widget=CachedForeignKeyWidget(ConstructPaper, "legacy_id"),
     )
 
     class Meta:
         model = Construct
         fields = ("id","legacy_id","level_1","level_2","constructpaper",)
         import_id_fields = ("legacy_id",)
+        use_bulk = True
+        batch_size = BULK_BATCH_SIZE
 
-class KeywordResource(resources.ModelResource):
+class KeywordResource(BulkImportMixin, resources.ModelResource):
     class Meta:
         model = Keyword
         fields = ("id", "legacy_id", "name",)
         import_id_fields = ("legacy_id",)
+        use_bulk = True
+        batch_size = BULK_BATCH_SIZE
 
+    def after_import(self, dataset, result, **kwargs):
+        super().after_import(dataset, result, **kwargs)
+        # bulk_create löst kein post_save aus
+        invalidate_keyword_cache()
 
-class QuestionResource(resources.ModelResource):
+
+class QuestionResource(BulkImportMixin, resources.ModelResource):
 
     construct = fields.Field(
         column_name="construct_legacy_id",
         attribute="construct",
-        widget=ForeignKeyWidget(Construct, "legacy_id"),
+        widget=CachedForeignKeyWidget(Construct, "legacy_id"),
     )
 
+    # Schlagwörter werden gesammelt in die Zwischentabelle geschrieben
     keywords = fields.Field(
         column_name="keywords",
-        attribute="keywords",
-        widget=ManyToManyWidget(Keyword, field="legacy_id")  
+        attribute=bulk_m2m_attribute("keywords"),
+        widget=CachedManyToManyWidget(Keyword, field="legacy_id"),
     )
 
+    bulk_m2m_fields = ("keywords",)
+
     class Meta:
         model = Question
         fields = ("id", "legacy_id", "questiontext","construct", "keywords",)
         import_id_fields = ("legacy_id",)
+        use_bulk = True
+        batch_size = BULK_BATCH_SIZE
+
+    def filter_export(self, queryset, **kwargs):
+        return super().filter_export(queryset, **kwargs).prefetch_related("keywords")
+
+    def dehydrate_keywords(self, obj):
+        return ",".join(str(k.legacy_id) for k in obj.keywords.all() if k.legacy_id is not None)
@@ -0,0 +1,133 @@
+# questions/services/keyword_search.py
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models.functions import Length, Lower
+
+from questions.models import Keyword
+
+
+# Lebensdauer der prozesslokalen Keyword-Liste (Sekunden).
+# Innerhalb des eigenen Prozesses wird per Signal sofort invalidiert,
+# andere Worker sehen Änderungen spätestens nach Ablauf der TTL.
+KEYWORD_CACHE_TTL = 300
+
+# Oberhalb dieser Anzahl wird nicht mehr im Speicher, sondern direkt in der DB gesucht
+KEYWORD_CACHE_MAX = 20000
+
+# Ab dieser Länge werden fehlende Treffer per Trigramm-Ähnlichkeit ergänzt
+TRIGRAM_MIN_LENGTH = 3
+
+_lock = threading.Lock()
+_entries: Optional[tuple[tuple[str, int, str], ...]] = None  # (lower(name), id, name)
+_loaded_at = 0.0
+
+
+def invalidate_keyword_cache() -> None:
+    global _entries, _loaded_at
+    with _lock:
+        _entries = None
+        _loaded_at = 0.0
+
+
+def _get_entries() -> Optional[tuple[tuple[str, int, str], ...]]:
+    """
+    Keyword-Liste aus dem Prozess-Cache (lädt bei Bedarf neu).
+    Gibt None zurück, wenn es zu viele Keywords für die Suche im Speicher gibt.
+    """
+    global _entries, _loaded_at
+
+    now = time.monotonic()
+    entries = _entries
+    if entries is not None and now - _loaded_at < KEYWORD_CACHE_TTL:
+        return entries or None
+
+    with _lock:
+        if _entries is not None and time.monotonic() - _loaded_at < KEYWORD_CACHE_TTL:
+            return _entries or None
+
+        rows = list(Keyword.objects.values_list("id", "name")[:KEYWORD_CACHE_MAX + 1])
+        if len(rows) > KEYWORD_CACHE_MAX:
+            # leeres Tupel = "zu groß", bis zur nächsten TTL direkt in der DB suchen
+            _entries = ()
+        else:
+            _entries = tuple(sorted(((name or "").lower(), kid, name) for kid, name in rows))
+        _loaded_at = time.monotonic()
+        return _entries or None
+
+
+def _rank(name_lower: str, q_lower: str) -> Optional[int]:
+    # 0 = exakt, 1 = Präfix, 2 = Wortanfang, 3 = Teilstring
+    if name_lower == q_lower:
+        return 0
+    if name_lower.startswith(q_lower):
+        return 1
+    pos = name_lower.find(q_lower)
+    if pos < 0:
+        return None
+    if not name_lower[pos - 1].isalnum():
+        return 2
+    return 3
+
+
+def search_keywords(q: str, *, limit: int = 15) -> list[tuple[int, str]]:
+    """
+    Keyword-Autocomplete: exakte Treffer vor Präfix- vor Teilstring-Treffern,
+    bei zu wenigen Treffern ergänzt um ähnliche Schreibweisen (Trigramm, Index).
+    Liefert (id, name)-Paare.
+    """
+    q_lower = (q or "").strip().lower()
+    if not q_lower:
+        return []
+
+    entries = _get_entries()
+    if entries is not None:
+        ranked = []
+        for name_lower, kid, name in entries:
+            r = _rank(name_lower, q_lower)
+            if r is not None:
+                ranked.append((r, len(name_lower), name_lower, kid, name))
+        ranked.sort()
+        results = [(kid, name) for *_, kid, name in ranked[:limit]]
+    else:
+        # Indexierter Präfix-Pfad (lower(name) varchar_pattern_ops)
+        keywords = Keyword.objects.annotate(nl=Lower("name"))
+        results = list(
+            keywords
+            .filter(nl__startswith=q_lower)
+            .order_by("nl")
+            .values_list("id", "name")[:limit]
+        )
+
+        # Teilstring-Treffer wie im Speicher-Pfad ergänzen (Trigramm-Index auf lower(name))
+        if len(results) < limit:
+            infix = (
+                keywords
+                .filter(nl__contains=q_lower)
+                .exclude(nl__startswith=q_lower)
+                .annotate(nlen=Length("name"))
+                .order_by("nlen", "nl")
+                .values_list("id", "name")[: limit - len(results)]
+            )
+            results.extend(infix)
+            results.sort(key=lambda r: (_rank((r[1] or "").lower(), q_lower), len(r[1] or ""), (r[1] or "").lower()))
+
+    if len(results) < limit and len(q_lower) >= TRIGRAM_MIN_LENGTH:
+        found = {kid for kid, _ in results}
+        fuzzy = (
+            Keyword.objects
+            .annotate(nl=Lower("name"))
+            .filter(nl__trigram_similar=q_lower)
+            .exclude(id__in=found)
+            .annotate(sim=TrigramSimilarity("nl", q_lower))
+            .order_by("-sim", "nl")
+            .values_list("id", "name")[: limit - len(results)]
+        )
+        results.extend(fuzzy)
+
+    return results
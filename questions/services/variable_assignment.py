@@ -0,0 +1,139 @@
+# questions/services/variable_assignment.py
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from django.db import connection
+
+
+@dataclass(frozen=True)
+class VariableAssignmentResult:
+    added: int
+    removed: int
+    released_variable_links: int  # gelöschte Variable↔Wave-Einträge
+
+
+# Variable↔Wave-Einträge löschen, die durch die Änderung an Frage %(question_id)s
+# nicht mehr gebraucht werden (Anti-Join gegen die Triaden aller anderen Fragen).
+# {pairs} liefert die Kandidaten (variable_id, wave_id).
+_RELEASE_SQL = """
+    DELETE FROM variables_variable_waves vw
+    USING (SELECT DISTINCT variable_id, wave_id FROM {pairs}) r,
+          variables_variable v
+    WHERE vw.variable_id = r.variable_id
+      AND vw.wave_id = r.wave_id
+      AND v.id = r.variable_id
+      AND (NOT %(protect_technical)s OR v.is_technical = false)
+      AND NOT EXISTS (
+          SELECT 1
+          FROM variables_questionvariablewave q2
+          WHERE q2.variable_id = r.variable_id
+            AND q2.wave_id = r.wave_id
+            AND q2.question_id <> %(question_id)s
+      )
+    RETURNING vw.id
+"""
+
+# Ein Statement: Soll-Triaden als Arrays, Löschen/Anlegen per Anti-Join,
+# Variable↔Wave für neue Paare anlegen und für entfernte Paare ggf. aufräumen.
+_ASSIGN_SQL = """
+    WITH desired AS (
+        SELECT DISTINCT d.variable_id, d.wave_id
+        FROM unnest(%(variable_ids)s::bigint[], %(wave_ids)s::bigint[]) AS d(variable_id, wave_id)
+    ),
+    removed AS (
+        DELETE FROM variables_questionvariablewave qvw
+        WHERE qvw.question_id = %(question_id)s
+          AND NOT EXISTS (
+              SELECT 1 FROM desired d
+              WHERE d.variable_id = qvw.variable_id
+                AND d.wave_id = qvw.wave_id
+          )
+        RETURNING qvw.variable_id, qvw.wave_id
+    ),
+    added AS (
+        INSERT INTO variables_questionvariablewave (question_id, variable_id, wave_id, created_at)
+        SELECT %(question_id)s, d.variable_id, d.wave_id, now()
+        FROM desired d
+        ON CONFLICT DO NOTHING
+        RETURNING variable_id, wave_id
+    ),
+    through_added AS (
+        INSERT INTO variables_variable_waves (variable_id, wave_id)
+        SELECT DISTINCT variable_id, wave_id FROM added
+        ON CONFLICT DO NOTHING
+        RETURNING id
+    ),
+    released AS (
+        {release}
+    )
+    SELECT
+        (SELECT count(*) FROM added),
+        (SELECT count(*) FROM removed),
+        (SELECT count(*) FROM released),
+        (SELECT count(*) FROM through_added)
+""".format(release=_RELEASE_SQL.format(pairs="removed"))
+
+_RELEASE_PAIRS_SQL = """
+    WITH released AS (
+        {release}
+    )
+    SELECT count(*) FROM released
+""".format(release=_RELEASE_SQL.format(
+    pairs="unnest(%(variable_ids)s::bigint[], %(wave_ids)s::bigint[]) AS c(variable_id, wave_id)"
+))
+
+
+def assign_variables_to_question(
+    *,
+    question_id: int,
+    desired_pairs: Iterable[tuple[int, int]],
+    protect_technical: bool = False,
+) -> VariableAssignmentResult:
+    """
+    Setzt die Triaden einer Frage auf die Soll-Menge (variable_id, wave_id).
+    Neue Paare werden auch im Variable↔Wave-M2M ergänzt; entfernte Paare werden
+    dort gelöscht, wenn keine andere Frage die Variable in der Befragung mehr nutzt.
+    """
+    pairs = sorted(set(desired_pairs))
+
+    with connection.cursor() as cur:
+        cur.execute(_ASSIGN_SQL, {
+            "question_id": question_id,
+            "variable_ids": [v for v, _ in pairs],
+            "wave_ids": [w for _, w in pairs],
+            "protect_technical": protect_technical,
+        })
+        added, removed, released, _ = cur.fetchone()
+
+    return VariableAssignmentResult(
+        added=int(added),
+        removed=int(removed),
+        released_variable_links=int(released),
+    )
+
+
+def release_variable_links(
+    *,
+    question_id: int,
+    pairs: Iterable[tuple[int, int]],
+    protect_technical: bool = True,
+) -> int:
+    """
+    Räumt Variable↔Wave-Einträge für (variable_id, wave_id)-Paare auf, die an Frage
+    `question_id` hingen (z. B. nach deren Löschung) und sonst nirgends mehr genutzt werden.
+    """
+    pairs = sorted(set(pairs))
+    if not pairs:
+        return 0
+
+    with connection.cursor() as cur:
+        cur.execute(_RELEASE_PAIRS_SQL, {
+            "question_id": question_id,
+            "variable_ids": [v for v, _ in pairs],
+            "wave_ids": [w for _, w in pairs],
+            "protect_technical": protect_technical,
+        })
+        return int(cur.fetchone()[0])
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Keyword
+from .services.keyword_search import invalidate_keyword_cache
+
+
+# Keyword-Liste für das Autocomplete neu laden, sobald sich Keywords ändern
+@receiver(post_save, sender=Keyword)
+@receiver(post_delete, sender=Keyword)
+def keyword_changed(sender, **kwargs):
+    invalidate_keyword_cache()
@@ -11,19 +11,24 @@ from django.http import Http404, JsonResponse
 from django.views import View
 from django.views.generic import DetailView, UpdateView
 
-from accounts.mixins import EditorRequiredMixin
+from asgiref.sync import sync_to_async
+
+from accounts.mixins import AsyncEditorRequiredMixin, EditorRequiredMixin
 
 from django.db.models import Prefetch, Q
 from django.db import transaction
 
-from .models import Question, Keyword
+from .models import Question, Keyword, Construct
 from variables.models import Variable, QuestionVariableWave
 from waves.models import Wave, WaveQuestion
+from waves.services.lock_state import get_lock_state
 from pages.models import WavePage, WavePageQuestion
 
 from .forms import QuestionEditForm, AnswerOptionFormSet, ItemFormSet, AttachWavePageForm, QuestionVariableLinkFormSet
 
 from .utils import create_question_for_page
+from .services.keyword_search import search_keywords
+from .services.variable_assignment import assign_variables_to_question, release_variable_links
 
 
 # ---- Allgemeine Helper-Funktionen ---------------------------------------
@@ -98,10 +103,6 @@ class QuestionDetail(DetailView):
             )
         )
 
-        # Vollständigkeitsinfo ran hängen (nur für Editoren erforderlich)
-        if self.can_edit:
-            qs = qs.with_completeness()
-
         return qs
 
 
@@ -124,6 +125,7 @@ class QuestionDetail(DetailView):
         triad_qs = QuestionVariableWave.objects.none()
         variables = Variable.objects.none()
         locked_variable_ids = set()
+        lock_state = get_lock_state(self.request)
         pages = []
         active_page = None
         screenshots = []
@@ -143,28 +145,12 @@ class QuestionDetail(DetailView):
                 .order_by("varname")
             )
 
-            # Vollständigkeitsinfo ran hängen (nur für Editoren erforderlich)
-            if self.can_edit:
-                variables = variables.with_completeness()
-
             # Variablen, die in der aktiven Wave gesperrt sind
             var_ids = list(variables.values_list("id", flat=True))
 
             if var_ids:
-                locked_variable_ids = set(
-                    QuestionVariableWave.objects.filter(
-                        variable_id__in=var_ids,
-                        wave__is_locked=True,
-                    ).values_list("variable_id", flat=True)
-                )
-
-                # auch über M2M
-                locked_variable_ids |= set(
-                    Variable.objects.filter(
-                        id__in=var_ids,
-                        waves__is_locked=True,
-                    ).values_list("id", flat=True)
-                )
+                # Triade und M2M in einer Query (pro Request gemerkt)
+                locked_variable_ids = lock_state.locked_variable_ids(var_ids)
 
             # Seite(n) der Frage der aktiven Wave
             page_param = self.request.GET.get("page")
@@ -193,7 +179,7 @@ class QuestionDetail(DetailView):
             "variables": variables,
             "locked_variable_ids": locked_variable_ids,
             "question_variable_wave_links": triad_qs,
-            "question_is_locked": question.waves.filter(is_locked=True).exists(),
+            "question_is_locked": lock_state.is_question_locked(question.pk),
             "pages": pages,
             "active_page": active_page, 
             "screenshots": screenshots,
@@ -526,22 +512,38 @@ class QuestionUpdateView(EditorRequiredMixin, UpdateView):
 
 
 # Views für Keyword-Suche und -Anlage
-class KeywordSearchView(EditorRequiredMixin, View):
+class KeywordSearchView(AsyncEditorRequiredMixin, View):
     http_method_names = ["get"]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         q = (request.GET.get("q") or "").strip()
 
         if len(q) < 2:
             return JsonResponse([], safe=False)
 
-        qs = (
-            Keyword.objects
-            .filter(name__icontains=q)
-            .order_by("name")[:15]
-        )
+        # Relevanz: exakt > Präfix > Teilstring, ergänzt um ähnliche Schreibweisen
+        # (meist aus dem prozesslokalen Keyword-Cache, daher synchron im Thread)
+        hits = await sync_to_async(search_keywords)(q, limit=15)
+        data = [{"value": kid, "text": name} for kid, name in hits]
+        return JsonResponse(data, safe=False)
+
+
+# View für die Konstrukt-Suche (asynchrone Auswahl im Frageformular)
+class ConstructSearchView(AsyncEditorRequiredMixin, View):
+    http_method_names = ["get"]
+
+    async def get(self, request, *args, **kwargs):
+        q = (request.GET.get("q") or "").strip()
+
+        if len(q) < 2:
+            return JsonResponse([], safe=False)
 
-        data = [{"value": kw.id, "text": kw.name} for kw in qs]
+        constructs = (
+            Construct.objects
+            .filter(Q(level_1__icontains=q) | Q(level_2__icontains=q))
+            .order_by("level_1", "level_2", "id")[:20]
+        )
+        data = [{"value": c.pk, "text": str(c)} async for c in constructs]
         return JsonResponse(data, safe=False)
 
 
@@ -658,35 +660,9 @@ class QuestionDeleteView(EditorRequiredMixin, View):
 
         question.delete()
 
-        if affected_pairs:
-            # Hängen die von der Löschung betroffenen Variablen noch an irgendeiner anderen Frage in der gleichen Befragung?
-            q = Q()
-            for v_id, w_id in affected_pairs:
-                q |= Q(variable_id=v_id, wave_id=w_id)
-
-            still_used_pairs = set(
-                QuestionVariableWave.objects
-                .filter(q)
-                .values_list("variable_id", "wave_id")
-            )
-
-            cleanup_pairs = affected_pairs - still_used_pairs
-
-            if cleanup_pairs:
-                # technische Variablen schützen (Failsafe)
-                non_technical_pairs = [
-                    (v_id, w_id)
-                    for v_id, w_id in cleanup_pairs
-                    if not Variable.objects.filter(id=v_id, is_technical=True).exists()
-                ]
-
-                # Variablen, die durch die Löschung der Frage nicht mehr in der Befragung verwendet werden, aus WaveVar entfernen
-                if non_technical_pairs:
-                    WaveVarThrough = Variable.waves.through
-                    q = Q()
-                    for v_id, w_id in non_technical_pairs:
-                        q |= Q(variable_id=v_id, wave_id=w_id)
-                    WaveVarThrough.objects.filter(q).delete()
+        # Variablen, die durch die Löschung der Frage nicht mehr in der Befragung verwendet werden,
+        # aus WaveVar entfernen (technische Variablen bleiben als Failsafe unangetastet)
+        release_variable_links(question_id=pk, pairs=affected_pairs, protect_technical=True)
 
         messages.success(request, "Frage wurde gelöscht.")
         return redirect("waves:survey_list")
@@ -822,54 +798,9 @@ class QuestionVariableAssignView(EditorRequiredMixin, View):
                 used_var_ids.add(var.id)
                 used_wave_ids.add(w.id)
 
-        existing_qs = QuestionVariableWave.objects.filter(question=question)
-        existing = set(existing_qs.values_list("variable_id", "wave_id"))
-
-        to_add = desired - existing
-        to_remove = existing - desired
-
+        # Soll-/Ist-Abgleich, Anlegen/Löschen und M2M-Bereinigung in einem Statement
         with transaction.atomic():
-            # delete QuestionVariableWave-Einträge
-            if to_remove:
-                q = Q()
-                for v_id, w_id in to_remove:
-                    q |= Q(variable_id=v_id, wave_id=w_id)
-                QuestionVariableWave.objects.filter(question=question).filter(q).delete()
-
-            # create QuestionVariableWave-Einträge & Konsistenz QuestionVariableWave ⇒ WaveVar
-            if to_add:
-                QuestionVariableWave.objects.bulk_create(
-                    [QuestionVariableWave(question=question, variable_id=v, wave_id=w) for v, w in to_add],
-                    ignore_conflicts=True,
-                )
-
-                WavesThrough = Variable._meta.get_field("waves").remote_field.through
-                through_rows = [WavesThrough(variable_id=v, wave_id=w) for v, w in to_add]
-                WavesThrough.objects.bulk_create(through_rows, ignore_conflicts=True)
-
-
-            if to_remove:
-                candidate_pairs = set(to_remove)
-
-                # Welche Variablen-Befragungs-Paare existieren weiterhin QuestionVariableWave (über alle Fragen)?
-                q = Q()
-                for v_id, w_id in candidate_pairs:
-                    q |= Q(variable_id=v_id, wave_id=w_id)
-
-                still_used_pairs = set(
-                    QuestionVariableWave.objects
-                    .filter(q)
-                    .values_list("variable_id", "wave_id")
-                )
-
-                # Nur die Paare, die nirgendwo mehr im QuestionVariableWave vorkommen, aus WaveVar entfernen
-                cleanup_pairs = candidate_pairs - still_used_pairs
-                if cleanup_pairs:
-                    WavesThrough = Variable._meta.get_field("waves").remote_field.through
-                    q = Q()
-                    for v_id, w_id in cleanup_pairs:
-                        q |= Q(variable_id=v_id, wave_id=w_id)
-                    WavesThrough.objects.filter(q).delete()
+            assign_variables_to_question(question_id=question.pk, desired_pairs=desired)
 
 
         messages.success(request, "Variablen-Zuordnung wurde gespeichert.")
@@ -0,0 +1,503 @@
+# search/services/engine.py
+
+"""
+Ranking für die Hauptsuche (Fragen und Variablen).
+
+Jeder Zweig liefert zunächst nur eine Score-Map (ID -> Relevanz) aus mehreren
+schlanken values()-Queries. Materialisiert werden danach entweder alle Treffer
+(Tabs "Fragen"/"Variablen") oder im Top-N-Modus (Tab "Alle") nur die besten N;
+Trefferzahl und Wellen-Facetten kommen dann per Aggregat aus der Zwischentabelle.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+    TrigramWordSimilarity,
+)
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.db.models import Count, F, Prefetch, Q
+from django.db.models.functions import Lower
+
+from questions.models import Keyword, Question
+from variables.models import QuestionVariableWave, Variable
+from waves.models import Wave
+
+logger = logging.getLogger(__name__)
+
+SORT_RELEVANCE = "relevance"
+SORT_ALPHA = "alpha"
+
+BRANCH_QUESTIONS = "questions"
+BRANCH_VARIABLES = "variables"
+
+
+@dataclass(frozen=True)
+class BranchResult:
+    items: tuple                 # sortierte Objekte (alle bzw. nur Top-N), mit .relevance
+    count: int                   # Anzahl aller Treffer
+    facet_counts: dict[int, int] = field(default_factory=dict)  # Wellen-ID -> Anzahl Treffer
+
+
+EMPTY_RESULT = BranchResult(items=(), count=0)
+
+
+def _wave_prefetch():
+    return Prefetch("waves", queryset=Wave.objects.select_related("survey"))
+
+
+def _keyword_scores(q_lower: str) -> dict[int, float]:
+    # Bestes passendes Keyword (entweder direkter Treffer per contains oder fuzzy per trgm)
+    kw_rows = (
+        Keyword.objects
+        .annotate(nl=Lower("name"))
+        .annotate(sim=TrigramSimilarity(F("nl"), q_lower))
+        .filter(Q(nl__istartswith=q_lower) | Q(sim__gt=0.6))
+        .values("id", "sim")[:15]
+    )
+    return {r["id"]: float(r["sim"] or 0.0) for r in kw_rows}
+
+
+def _combine(text_score: float, kw_score: float) -> float:
+    #   Finaler Score = Textscore + Keyword-Score * 0.15 (wenn Textscore > 0) bzw. + Keyword-Score * 0.10 (wenn kein Textscore)
+    #   Falls beide Scores > 0 sind, wird ein Bonus von +0.15 vergeben (max. 1.2 insgesamt)
+    if text_score > 0:
+        relevance = text_score + 0.15 * kw_score
+    else:
+        relevance = 0.10 * kw_score
+    if text_score > 0.0 and kw_score > 0.0:
+        relevance = min(1.2, relevance + 0.15)
+    return relevance
+
+
+def score_questions(q: str, wave_ids=None, include_keywords=True) -> dict[int, float]:
+    """
+    Score-Map FrageID -> Relevanz.
+    """
+    q = (q or "").strip()
+    if len(q) < 2:
+        return {}
+
+    q_lower = q.lower()
+
+    # Basis-QuerySet nur mit Wellen-Filter
+    base_qs_q = Question.objects.all()
+    if wave_ids:
+        base_qs_q = base_qs_q.filter(waves__id__in=wave_ids)
+
+    # ---- 1) Volltextsuche (tsvector) mit deutschem Analyzer
+    ts_query = SearchQuery(q, config="german", search_type="websearch")
+    ts_rows = (
+        base_qs_q
+        .annotate(sv=SearchVector("questiontext", weight="A", config="german"))
+        .filter(sv=ts_query)
+        .annotate(ts_rank=SearchRank(F("sv"), ts_query, normalization=32))
+        .values("id", "ts_rank")
+    )
+    ts_map = {r["id"]: float(r["ts_rank"] or 0.0) for r in ts_rows}
+
+    # ---- 2) Trigram-Suche im Fragetext (Fuzzy-Fallback) für Tippfehler/Teilstrings
+    tg_rows = (
+        base_qs_q
+        .annotate(sim=TrigramWordSimilarity(q_lower, "questiontext"))
+        .filter(sim__gt=0.6)  # Mindestähnlichkeit
+        .values("id", "sim")
+    )
+    tg_map = {r["id"]: float(r["sim"] or 0.0) for r in tg_rows}
+
+    # ---- 3) Wortgrenzen-Boost: wenn der Suchbegriff als eigenes Wort im Text steht
+    word_boundary = rf"\m{re.escape(q_lower)}\M"
+    wb_ids = set(
+        base_qs_q
+        .annotate(qt=Lower("questiontext"))
+        .filter(qt__iregex=word_boundary)
+        .values_list("id", flat=True)
+    )
+
+    # ---- 4) Keyword-Score: FrageID -> bestes Keyword-Score
+    kw_map: dict[int, float] = {}
+    if include_keywords:
+        kw_id_to_score = _keyword_scores(q_lower)
+        if kw_id_to_score:
+            kw_links = (
+                base_qs_q
+                .filter(keywords__in=list(kw_id_to_score.keys()))
+                .values("id", "keywords__id")
+                .distinct()
+            )
+            for r in kw_links:
+                qid = r["id"]
+                kw_map[qid] = max(kw_map.get(qid, 0.0), kw_id_to_score.get(r["keywords__id"], 0.0))
+
+    # ---- 5) Finaler Score pro Frage aus den Einzelkomponenten
+    #   Textscore = max(TS, TG*0.6, WB*0.95), Keyword-Score (KW) = bestes Keyword * 0.8
+    candidate_ids = set(ts_map) | set(tg_map) | wb_ids | set(kw_map)
+
+    final_score_map = {}
+    for qid in candidate_ids:
+        ts = ts_map.get(qid, 0.0)
+        tg = tg_map.get(qid, 0.0) * 0.6
+        wb = 0.95 if qid in wb_ids else 0.0
+        text_score = max(ts, tg, wb)
+
+        if include_keywords:
+            final_score_map[qid] = _combine(text_score, kw_map.get(qid, 0.0) * 0.8)
+        else:
+            final_score_map[qid] = text_score
+
+    return final_score_map
+
+
+def score_variables(q: str, wave_ids=None) -> dict[int, float]:
+    """
+    Score-Map VariablenID -> Relevanz.
+    """
+    q = (q or "").strip()
+    if len(q) < 2:
+        return {}
+
+    q_lower = q.lower()
+
+    # Basis-QuerySet der Variablen inkl. optionalem Wellenfilter
+    base_qs_v = Variable.objects.all()
+    if wave_ids:
+        base_qs_v = base_qs_v.filter(waves__id__in=wave_ids)
+
+    # ---- 1) Volltext (tsvector) auf varlab
+    ts_query_v = SearchQuery(q, config="german", search_type="websearch")
+    ts_rows_v = (
+        base_qs_v
+        .annotate(sv=SearchVector("varlab", weight="A", config="german"))
+        .filter(sv=ts_query_v)
+        .annotate(ts_rank=SearchRank(F("sv"), ts_query_v, normalization=32))
+        .values("id", "ts_rank")
+    )
+    ts_map_v = {r["id"]: float(r["ts_rank"] or 0.0) for r in ts_rows_v}
+
+    # ---- 2) Trigram (Fuzzy) auf varlab (Tippfehler/Teilstrings)
+    tg_rows_v = (
+        base_qs_v
+        .annotate(sim=TrigramWordSimilarity(q_lower, "varlab"))
+        .filter(sim__gt=0.6)
+        .values("id", "sim")
+    )
+    tg_map_v = {r["id"]: float(r["sim"] or 0.0) for r in tg_rows_v}
+
+    # ---- 3) Wortgrenzen-Boost auf varlab
+    word_boundary = rf"\m{re.escape(q_lower)}\M"
+    wb_ids_v = set(
+        base_qs_v
+        .annotate(vl=Lower("varlab"))
+        .filter(vl__iregex=word_boundary)
+        .values_list("id", flat=True)
+    )
+
+    # ---- 4) Varname: nur Prefix-Match (keine Fuzzy/Volltext), fester Bonus
+    vn_rows = (
+        base_qs_v
+        .annotate(vn=Lower("varname"))
+        .filter(vn__startswith=q_lower)
+        .values_list("id", "vn")
+    )
+    vn_map: dict[int, float] = {}
+    for vid, vn in vn_rows:
+        score = 1.05 if vn == q_lower else 1.0
+        vn_map[vid] = max(vn_map.get(vid, 0.0), score)
+
+    # ---- 5) Keywords über die zugeordneten Fragen
+    kw_map_v: dict[int, float] = {}
+    kw_id_to_score_v = _keyword_scores(q_lower)
+    if kw_id_to_score_v:
+        var_kw_links = (
+            QuestionVariableWave.objects
+            .filter(
+                variable__in=base_qs_v,
+                question__keywords__in=list(kw_id_to_score_v.keys()),
+            )
+            .values("variable_id", "question__keywords__id")
+            .distinct()
+        )
+        for r in var_kw_links:
+            vid = r["variable_id"]
+            kw_score = kw_id_to_score_v.get(r["question__keywords__id"], 0.0)
+            kw_map_v[vid] = max(kw_map_v.get(vid, 0.0), kw_score)
+
+    # ---- 6) Finaler Score pro Variable
+    #   Textscore = max(TS, TG*0.6, WB*0.95, VN), Keyword-Score (KW) = bestes Keyword * 0.8
+    candidate_ids_v = set(ts_map_v) | set(tg_map_v) | wb_ids_v | set(vn_map) | set(kw_map_v)
+    final_var_score_map = {}
+    for vid in candidate_ids_v:
+        ts = ts_map_v.get(vid, 0.0)
+        tg = tg_map_v.get(vid, 0.0) * 0.6
+        wb = 0.95 if vid in wb_ids_v else 0.0
+        vn = vn_map.get(vid, 0.0)
+        text_score = max(ts, tg, wb, vn)
+        final_var_score_map[vid] = _combine(text_score, kw_map_v.get(vid, 0.0) * 0.8)
+
+    return final_var_score_map
+
+
+# ---------------------------------------------------------------------------
+# Materialisieren
+# ---------------------------------------------------------------------------
+
+def _top_ids_by_score(score_map: dict[int, float], n: int) -> list[int]:
+    # Teilsortierung statt sorted() über alle Kandidaten
+    return heapq.nlargest(n, score_map, key=score_map.__getitem__)
+
+
+def _hydrate(qs, ids: list[int]) -> list:
+    # Nur die angegebenen IDs laden, Reihenfolge der IDs beibehalten
+    by_id = {obj.id: obj for obj in qs.filter(id__in=ids).prefetch_related(_wave_prefetch())}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def _wave_facet_counts(model, ids) -> dict[int, int]:
+    """
+    Treffer pro Welle per Aggregat auf der Zwischentabelle (ohne Objekte zu laden).
+    """
+    m2m = model._meta.get_field("waves")
+    through = m2m.remote_field.through
+    source = through._meta.get_field(m2m.m2m_field_name()).attname
+    target = through._meta.get_field(m2m.m2m_reverse_field_name()).attname
+    rows = (
+        through.objects
+        .filter(**{f"{source}__in": list(ids)})
+        .values(target)
+        .annotate(n=Count(source, distinct=True))
+        .values_list(target, "n")
+    )
+    return dict(rows)
+
+
+def _alpha_key(values) -> str:
+    # Erstes nicht-leeres Feld, kleingeschrieben (z. B. varname, sonst varlab)
+    return next((v for v in values if v), "").lower()
+
+
+def _build_branch(
+    *,
+    model,
+    score_map: dict[int, float],
+    only: tuple[str, ...],
+    alpha_fields: tuple[str, ...],
+    sort: str,
+    top_n: Optional[int],
+) -> BranchResult:
+    if not score_map:
+        return EMPTY_RESULT
+
+    base_qs = model.objects.only(*only)
+
+    if top_n is None:
+        # Alle Treffer materialisieren (für Paginierung im eigenen Tab)
+        found = _hydrate(base_qs, list(score_map))
+        if sort == SORT_ALPHA:
+            items = sorted(found, key=lambda obj: (_alpha_key(getattr(obj, f) for f in alpha_fields), obj.id))
+        else:
+            items = sorted(found, key=lambda obj: score_map.get(obj.id, 0.0), reverse=True)
+
+        facet_counts: dict[int, int] = defaultdict(int)
+        for obj in found:
+            for w in obj.waves.all():
+                facet_counts[w.id] += 1
+    else:
+        # Top-N: nur die besten N IDs laden, Facetten per Aggregat
+        if sort == SORT_ALPHA:
+            # Gleiche Sortierung wie im eigenen Tab (Python, nicht DB-Collation): nur die
+            # Sortierfelder laden, die ersten N bestimmen
+            rows = model.objects.filter(id__in=list(score_map)).values_list("id", *alpha_fields)
+            ids = [row[0] for row in heapq.nsmallest(top_n, rows, key=lambda row: (_alpha_key(row[1:]), row[0]))]
+        else:
+            ids = _top_ids_by_score(score_map, top_n)
+        items = _hydrate(base_qs, ids)
+        facet_counts = _wave_facet_counts(model, score_map.keys())
+
+    # Debug/Anzeige
+    for obj in items:
+        obj.relevance = score_map.get(obj.id, 0.0)
+
+    return BranchResult(items=tuple(items), count=len(score_map), facet_counts=dict(facet_counts))
+
+
+def search_question_branch(q: str, *, wave_ids=None, sort=SORT_RELEVANCE, top_n=None) -> BranchResult:
+    """
+    Fragen-Zweig der Hauptsuche. Mit top_n werden nur die besten N Fragen geladen.
+    """
+    return _build_branch(
+        model=Question,
+        score_map=score_questions(q, wave_ids=wave_ids, include_keywords=True),
+        only=("id", "questiontext"),
+        alpha_fields=("questiontext",),
+        sort=sort,
+        top_n=top_n,
+    )
+
+
+def search_variable_branch(q: str, *, wave_ids=None, sort=SORT_RELEVANCE, top_n=None) -> BranchResult:
+    """
+    Variablen-Zweig der Hauptsuche. Mit top_n werden nur die besten N Variablen geladen.
+    """
+    return _build_branch(
+        model=Variable,
+        score_map=score_variables(q, wave_ids=wave_ids),
+        only=("id", "varname", "varlab"),
+        alpha_fields=("varname", "varlab"),
+        sort=sort,
+        top_n=top_n,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Zweige parallel ausführen
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class SearchOutcome:
+    results: dict[str, BranchResult]   # Zweig -> Ergebnis (fehlt bei Zeitüberschreitung)
+    timed_out: tuple[str, ...] = ()    # Zweige ohne Ergebnis -> Teilergebnis anzeigen
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.timed_out)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "SEARCH_MAX_THREADS", 4),
+                thread_name_prefix="slc-search",
+            )
+        return _executor
+
+
+class BranchTimeout(Exception):
+    """Frist eines Suchzweigs abgelaufen."""
+
+
+# Toleranz beim Warten auf einen laufenden Zweig, der seine Frist selbst überwacht
+_DEADLINE_SLACK = 0.5
+
+
+class _DeadlineWrapper:
+    """
+    execute_wrapper: prüft vor jeder Query die Restzeit des Zweigs (nur in Python).
+    Ist sie abgelaufen, werden keine weiteren Queries gestellt. Laufende Queries begrenzt
+    das einmal je Zweig gesetzte statement_timeout.
+    """
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+
+    def __call__(self, execute, sql, params, many, context):
+        if time.monotonic() >= self.deadline:
+            raise BranchTimeout()
+        return execute(sql, params, many, context)
+
+
+def _run_in_thread(fn: Callable[[], BranchResult], timeout: float, starts: dict, name: str) -> BranchResult:
+    """
+    Führt einen Zweig in einem Pool-Thread aus (eigene DB-Verbindung je Thread).
+    Die Frist läuft ab Start im Thread (nicht ab Einreihen in den Pool).
+    """
+    starts[name] = time.monotonic()
+    deadline = starts[name] + timeout
+    try:
+        # Eigene Transaktion, damit SET LOCAL die Verbindung nicht überdauert
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cur:
+                    cur.execute(f"SET LOCAL statement_timeout = {max(int(timeout * 1000), 1)}")
+            with connection.execute_wrapper(_DeadlineWrapper(deadline)):
+                return fn()
+    finally:
+        # Wie am Ende eines Requests: Verbindung nach CONN_MAX_AGE bzw. bei Fehlern schließen
+        # (mit DB_POOL an den Pool zurückgeben), sonst im Pool-Thread weiterverwenden
+        close_old_connections()
+
+
+def run_search(
+    q: str,
+    *,
+    branches: tuple[str, ...],
+    wave_ids=None,
+    sort: str = SORT_RELEVANCE,
+    top_n: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> SearchOutcome:
+    """
+    Führt die gewünschten Zweige aus; sind es mehrere, laufen sie parallel.
+
+    Jeder Zweig hat `timeout` Sekunden ab seinem Start (Standard: settings.SEARCH_BRANCH_TIMEOUT).
+    Zweige ohne Ergebnis bis dahin fehlen im Ergebnis und stehen in `timed_out`;
+    ein Zweig, der bis dahin nicht einmal starten konnte, wird verworfen.
+    Das Ranking ist identisch zur seriellen Ausführung.
+    """
+    branch_funcs = {
+        BRANCH_QUESTIONS: search_question_branch,
+        BRANCH_VARIABLES: search_variable_branch,
+    }
+    jobs = {
+        name: (lambda fn=branch_funcs[name]: fn(q, wave_ids=wave_ids, sort=sort, top_n=top_n))
+        for name in branches
+    }
+
+    parallel = len(jobs) > 1 and getattr(settings, "SEARCH_PARALLEL", True)
+    if not parallel:
+        return SearchOutcome(results={name: job() for name, job in jobs.items()})
+
+    if timeout is None:
+        timeout = getattr(settings, "SEARCH_BRANCH_TIMEOUT", 10)
+
+    executor = _get_executor()
+    starts: dict[str, float] = {}
+    futures = {
+        name: executor.submit(_run_in_thread, job, timeout, starts, name)
+        for name, job in jobs.items()
+    }
+    wait(futures.values(), timeout=timeout)
+
+    for name, future in futures.items():
+        if future.done() or future.cancel():
+            # fertig bzw. noch nicht gestartet (dann verworfen)
+            continue
+        # Läuft bereits: der Zweig hält seine Frist ab eigenem Start selbst ein
+        remaining = starts.get(name, time.monotonic()) + timeout + _DEADLINE_SLACK - time.monotonic()
+        wait([future], timeout=max(remaining, 0))
+
+    results: dict[str, BranchResult] = {}
+    timed_out: list[str] = []
+    for name, future in futures.items():
+        if future.cancelled() or not future.done():
+            timed_out.append(name)
+            continue
+        try:
+            results[name] = future.result()
+        except (BranchTimeout, OperationalError):
+            # Frist abgelaufen bzw. statement_timeout hat die Query abgebrochen
+            logger.warning("Suchzweig %s abgebrochen (q=%r)", name, q, exc_info=True)
+            timed_out.append(name)
+
+    if timed_out:
+        logger.warning("Suche nur teilweise beantwortet, Zeitüberschreitung in: %s", ", ".join(timed_out))
+    return SearchOutcome(results=results, timed_out=tuple(timed_out))
@@ -1,21 +1,22 @@
-import re
+import heapq
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
 from django.views.decorators.http import require_GET
 
-from django.db.models import Q, F, Prefetch
-from django.db.models.functions import Lower
+from django.db.models import F
 
 from django.core.paginator import Paginator
-from django.contrib.postgres.search import TrigramSimilarity, SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
 
 from collections import defaultdict
 from pages.models import WavePage
-from questions.models import Question, Keyword
-from variables.models import Variable, QuestionVariableWave
+from questions.models import Question
+from variables.models import Variable
 from waves.models import Wave, Survey
 
+from .services.engine import BRANCH_QUESTIONS, BRANCH_VARIABLES, run_search, score_questions
+
 ALLOWED_TYPES = {"all", "questions", "variables", "constructs"}
 ALLOWED_SORTS = {"relevance", "alpha"}
 RESULTS_PER_PAGE = 20
@@ -33,126 +34,6 @@ def search_landing(request):
     return render(request, "search/landing.html", ctx)
 
 
-# Hilfsfunktion: Suche nach Fragen (für Hauptsuche und für API-Endpunkt)
-# Später evtl. auslagern in search/utils.py und für Vars erweitern (aktuell nicht einheitlich)
-def search_questions(q: str, wave_ids=None, include_keywords=True):
-    q = (q or "").strip()
-    if len(q) < 2:
-        return []
-
-    q_lower = q.lower()
-    wave_ids = wave_ids or []
-
-    # Basis-QuerySet nur mit Wellen-Filter
-    base_qs_q = Question.objects.all()
-    if wave_ids:
-        base_qs_q = base_qs_q.filter(waves__id__in=wave_ids)
-
-    # ---- 1) Volltextsuche (tsvector) mit deutschem Analyzer
-    ts_query = SearchQuery(q, config="german", search_type="websearch")
-    ts_rows = (
-        base_qs_q
-        .annotate(sv=SearchVector("questiontext", weight="A", config="german"))
-        .filter(sv=ts_query)
-        .annotate(ts_rank=SearchRank(F("sv"), ts_query, normalization=32))
-        .values("id", "ts_rank")
-    )
-    ts_map = {r["id"]: float(r["ts_rank"] or 0.0) for r in ts_rows}
-
-    # ---- 2) Trigram-Suche im Fragetext (Fuzzy-Fallback) für Tippfehler/Teilstrings
-    tg_rows = (
-        base_qs_q
-        .annotate(sim=TrigramWordSimilarity(q_lower, "questiontext"))
-        .filter(sim__gt=0.6) # Mindestähnlichkeit
-        .values("id", "sim")
-    )
-    tg_map = {r["id"]: float(r["sim"] or 0.0) for r in tg_rows}
-
-    # ---- 3) Wortgrenzen-Boost: wenn der Suchbegriff als eigenes Wort im Text steht
-    word_boundary = rf"\m{re.escape(q_lower)}\M"
-    wb_ids = set(
-        base_qs_q
-        .annotate(qt=Lower("questiontext"))
-        .filter(qt__iregex=word_boundary)
-        .values_list("id", flat=True)
-    )
-
-    # ---- 4) Keyword-Score: bestes passendes Keyword (entweder direkter Treffer per contains oder fuzzy per trgm)
-    kw_map = {}
-    if include_keywords:
-        kw_rows = (
-            Keyword.objects
-            .annotate(nl=Lower("name"))
-            .annotate(sim=TrigramSimilarity(F("nl"), q_lower))
-            .filter(Q(nl__istartswith=q_lower) | Q(sim__gt=0.6))
-            .values("id", "sim")[:15]
-        )
-        kw_id_to_score = {r["id"]: float(r["sim"] or 0.0) for r in kw_rows}
-
-        # Hole die zu den keywords aus kw_id_to_score gehörenden Fragen
-        kw_links = (
-            base_qs_q
-            .filter(keywords__in=list(kw_id_to_score.keys()))
-            .values("id", "keywords__id")
-            .distinct()
-        )
-
-        # SearchMap: FrageID -> bestes Keyword-Score
-        kw_map = {}
-        for r in kw_links:
-            qid = r["id"]; kwid = r["keywords__id"]
-            kw_map[qid] = max(kw_map.get(qid, 0.0), kw_id_to_score.get(kwid, 0.0))
-
-
-    # ---- 5) Finaler Score pro Frage aus den Einzelkomponenten
-    #   Logik:
-    #     Textscore = max(TS, TG*0.6, WB*0.95)
-    #     Score aus dem Fragetext wird gebildet aus dem höchsten Wert der drei Komponenten:
-    #       - Volltext-Score per ts_vector (TS) 
-    #       - Trigram-Score (TG), aber nur 60% Gewicht, damit Textrelevanz höher gewichtet wird
-    #       - Wortgrenzen-Bonus (WB), fester Wert 0.95 --> bei direktem Worttreffer im Fragetext wird geboostet
-    #     Keyword-Score (KW) = bestes Keyword * 0.8
-    #     Bestes Keyword (entweder direkter Treffer oder fuzzy) bekommt 80% Gewicht, damit Fragetext-Relevanz höher gewichtet wird
-    #     Finaler Score = Textscore + Keyword-Score * 0.15 (wenn Textscore > 0) bzw. + Keyword-Score * 0.10 (wenn kein Textscore)
-    #     Falls beide Scores > 0 sind, wird ein Bonus von +0.15 vergeben (max. 1.2 insgesamt), damit Fragen mit sowohl Text- als auch Keyword-Treffern bevorzugt werden.
-
-    candidate_ids = set(ts_map) | set(tg_map) | wb_ids | (set(kw_map) if include_keywords else set())
-    if not candidate_ids:
-        return [], {}
-
-    final_score_map = {}
-    for qid in candidate_ids:
-        ts = ts_map.get(qid, 0.0)
-        tg = tg_map.get(qid, 0.0) * 0.6
-        wb = 0.95 if qid in wb_ids else 0.0
-        text_score = max(ts, tg, wb)
-
-        if include_keywords:
-            kw_score = kw_map.get(qid, 0.0) * 0.8
-            both = (text_score > 0.0 and kw_score > 0.0)
-            if text_score > 0:
-                relevance = text_score + 0.15 * kw_score
-            else:
-                relevance = 0.10 * kw_score 
-            if both:
-                relevance = min(1.2, relevance + 0.15)
-        else:
-            relevance = text_score
-
-        final_score_map[qid] = relevance
-
-     # ---- 6) Materialisieren, Facetten zählen, sortieren, paginieren
-    found = list(
-        base_qs_q
-        .filter(id__in=final_score_map.keys())
-        .only("id", "questiontext")
-        .prefetch_related(Prefetch("waves", queryset=Wave.objects.select_related("survey")))
-        .distinct()
-    )
-
-    return found, final_score_map
-
-
 # Paginierungs-Hilfsfunktionen
 def paginate_list(items, request, per_page=RESULTS_PER_PAGE):
     """
@@ -219,52 +100,38 @@ def search(request):
         "show_relevance": settings.DEBUG, # Debug: show Relevance-Scores
     }
 
-    # Für Facetten: Zähler und Set
+    # Für Facetten: Zähler pro Welle
     facet_counter = defaultdict(int)
-    facet_waves_set = set()
 
 
 
+    # Im Tab "Alle" nur die besten TOP_N Treffer laden (Anzahl + Facetten per Aggregat)
+    top_n = ctx["TOP_N"] if search_type == "all" else None
+
+    # Fragen- und Variablen-Zweig laufen parallel; bei Zeitüberschreitung fehlt ein Zweig
+    branches = tuple(b for b in (BRANCH_QUESTIONS, BRANCH_VARIABLES) if search_type in {"all", b})
+    outcome = run_search(q, branches=branches, wave_ids=wave_ids, sort=sort, top_n=top_n)
+    ctx["search_timed_out"] = outcome.timed_out
+    ctx["questions_count"] = 0
+    ctx["variables_count"] = 0
+
     # =========================
     # QUESTIONS 
     # =========================
-    if search_type in {"all", "questions"}:
-        questions_found, final_score_map = search_questions(
-        q=q,
-        wave_ids=wave_ids,
-        include_keywords=True,
-        )
-
-        if sort == "alpha":
-            questions_sorted = sorted(
-                questions_found,
-                key=lambda obj: (obj.questiontext or "").lower()
-            )
-        else:
-            questions_sorted = sorted(
-                questions_found,
-                key=lambda obj: final_score_map.get(obj.id, 0.0),
-                reverse=True
-            )
-
-        # Facetten-Zähler
-        for obj in questions_found:
-            for w in obj.waves.all():
-                facet_counter[w.id] += 1
-                facet_waves_set.add(w)
-
-        # Debug/Anzeige
-        for obj in questions_sorted:
-            obj.relevance = final_score_map.get(obj.id, 0.0)
+    if BRANCH_QUESTIONS in outcome.results:
+        result = outcome.results[BRANCH_QUESTIONS]
+
+        for wave_id, n in result.facet_counts.items():
+            facet_counter[wave_id] += n
 
         if search_type == "all":
-            ctx["questions"] = questions_sorted[:ctx["TOP_N"]]
+            ctx["questions"] = result.items
         else:
-            page_obj = paginate_list(questions_sorted, request)
+            page_obj = paginate_list(result.items, request)
             ctx["questions_page"] = page_obj
             ctx["questions"] = page_obj.object_list
 
-        ctx["questions_count"] = len(questions_sorted)
+        ctx["questions_count"] = result.count
         ctx.setdefault("questions_count", 0)
 
 
@@ -272,166 +139,20 @@ def search(request):
     # VARIABLES
     # =========================
 
-    if search_type in {"all", "variables"}:
-        q_lower = q.lower()
-
-        # Basis-QuerySet der Variablen inkl. optionalem Wellenfilter
-        base_qs_v = Variable.objects.all()
-        if wave_ids:
-            base_qs_v = base_qs_v.filter(waves__id__in=wave_ids)
-
-        # ---- 1) Volltext (tsvector) auf varlab
-        ts_query_v = SearchQuery(q, config="german", search_type="websearch")
-        ts_rows_v = (
-            base_qs_v
-            .annotate(sv=SearchVector("varlab", weight="A", config="german"))
-            .filter(sv=ts_query_v)
-            .annotate(ts_rank=SearchRank(F("sv"), ts_query_v, normalization=32))
-            .values("id", "ts_rank")
-        )
-        ts_map_v = {r["id"]: float(r["ts_rank"] or 0.0) for r in ts_rows_v}
-
-        # ---- 2) Trigram (Fuzzy) auf varlab (Tippfehler/Teilstrings)
-        tg_rows_v = (
-            base_qs_v
-            .annotate(sim=TrigramWordSimilarity(q_lower, "varlab"))
-            .filter(sim__gt=0.6)
-            .values("id", "sim")
-        )
-        tg_map_v = {r["id"]: float(r["sim"] or 0.0) for r in tg_rows_v}
-
-
-        # ---- 3) Wortgrenzen-Boost auf varlab
-        word_boundary = rf"\m{re.escape(q_lower)}\M"
-        wb_ids_v = set(
-            base_qs_v
-            .annotate(vl=Lower("varlab"))
-            .filter(vl__iregex=word_boundary)
-            .values_list("id", flat=True)
-        )
-
-        # ---- 4) Varname: nur Prefix-Match (keine Fuzzy/Volltext)
-        vn_rows = (
-            base_qs_v
-            .annotate(vn=Lower("varname"))
-            .filter(vn__startswith=q_lower)
-            .values_list("id", "vn")
-        )
-
-        # fester Bonus für Prefix
-        vn_map = {}
-        for vid, vn in vn_rows:
-            score = 1.0
-            if vn == q_lower:
-                score = 1.05
-            vn_map[vid] = max(vn_map.get(vid, 0.0), score)
-
-
-        # ---- 5) Keywords
-        kw_rows_v = (
-            Keyword.objects
-            .annotate(nl=Lower("name"))
-            .annotate(sim=TrigramSimilarity(F("nl"), q_lower))
-            .filter(Q(nl__istartswith=q_lower) | Q(sim__gt=0.6))
-            .values("id", "sim")[:15]
-        )
-        kw_id_to_score_v = {r["id"]: float(r["sim"] or 0.0) for r in kw_rows_v}
-
-        if kw_id_to_score_v:
-            var_kw_links = (
-                QuestionVariableWave.objects
-                .filter(
-                    variable__in=base_qs_v,
-                    question__keywords__in=list(kw_id_to_score_v.keys()),
-                )
-                .values("variable_id", "question__keywords__id")
-                .distinct()
-            )
-        else:
-            var_kw_links = []
-
-
-        kw_map_v = {}
-        for r in var_kw_links:
-            vid = r["variable_id"]
-            kwid = r["question__keywords__id"]
-            kw_score = kw_id_to_score_v.get(kwid, 0.0)
-            kw_map_v[vid] = max(kw_map_v.get(vid, 0.0), kw_score)
-
-        # ---- 6) Finaler Score pro Frage aus den Einzelkomponenten
-        #   Logik:
-        #     Textscore = max(TS, TG*0.6, WB*0.95)
-        #     Score aus dem Variablenlabel wird gebildet aus dem höchsten Wert der vier Komponenten:
-        #       - Volltext-Score per ts_vector (TS) 
-        #       - Trigram-Score (TG), aber nur 60% Gewicht, damit Textrelevanz höher gewichtet wird
-        #       - Wortgrenzen-Bonus (WB), fester Wert 0.95 --> bei direktem Worttreffer im Fragetext wird geboostet
-        #       - Varname-Prefix-Bonus (VN), fester Wert 1.0 bzw. 1.05 bei exaktem Treffer
-        #     Keyword-Score (KW) = bestes Keyword * 0.8
-        #     Bestes Keyword (entweder direkter Treffer oder fuzzy) bekommt 80% Gewicht, damit Varlabel-Relevanz höher gewichtet wird
-        #     Finaler Score = Textscore + Keyword-Score * 0.15 (wenn Textscore > 0) bzw. + Keyword-Score * 0.10 (wenn kein Textscore)
-        #     Falls beide Scores > 0 sind, wird ein Bonus von +0.15 vergeben (max. 1.2 insgesamt), damit Fragen mit sowohl Text- als auch Keyword-Treffern bevorzugt werden.
-
-        candidate_ids_v = set(ts_map_v) | set(tg_map_v) | wb_ids_v | set(vn_map) | set(kw_map_v)
-        final_var_score_map = {}
-        for vid in candidate_ids_v:
-            ts = ts_map_v.get(vid, 0.0)
-            tg = tg_map_v.get(vid, 0.0) * 0.6
-            wb = 0.95 if vid in wb_ids_v else 0.0
-            vn = vn_map.get(vid, 0.0)    
-            text_score = max(ts, tg, wb, vn)
-
-            kw_score = kw_map_v.get(vid, 0.0) * 0.8
-            both = (text_score > 0.0 and kw_score > 0.0)
-
-            if text_score > 0:
-                relevance = text_score + 0.15 * kw_score
-            else:
-                relevance = 0.10 * kw_score 
-
-            if both:
-                relevance = min(1.2, relevance + 0.15)
-
-            final_var_score_map[vid] = relevance
-
-        # ---- 7) Materialisieren, Facetten zählen, sortieren, paginieren
-        variables_found = list(
-            base_qs_v
-            .filter(id__in=final_var_score_map.keys())
-            .only("id", "varname", "varlab")
-            .prefetch_related(Prefetch("waves", queryset=Wave.objects.select_related("survey")))
-            .distinct()
-        )
-
-        if sort == "alpha":
-            variables_sorted = sorted(
-                variables_found,
-                key=lambda obj: ((obj.varname or obj.varlab or "")).lower()
-            )
-        else:
-            variables_sorted = sorted(
-                variables_found,
-                key=lambda obj: final_var_score_map.get(obj.id, 0.0),
-                reverse=True
-            )
-
-        # Facetten (Wellen)
-        for obj in variables_found:
-            for w in obj.waves.all():
-                facet_counter[w.id] += 1
-                facet_waves_set.add(w)
-
-        # Debug/Anzeige
-        for obj in variables_sorted:
-            obj.relevance = final_var_score_map.get(obj.id, 0.0)
+    if BRANCH_VARIABLES in outcome.results:
+        result = outcome.results[BRANCH_VARIABLES]
+
+        for wave_id, n in result.facet_counts.items():
+            facet_counter[wave_id] += n
 
         if search_type == "all":
-            ctx["variables"] = variables_sorted[:ctx["TOP_N"]]
+            ctx["variables"] = result.items
         else:
-            page_obj = paginate_list(variables_sorted, request)
+            page_obj = paginate_list(result.items, request)
             ctx["variables_page"] = page_obj
             ctx["variables"] = page_obj.object_list
 
-        ctx["variables_count"] = len(variables_sorted)
+        ctx["variables_count"] = result.count
         ctx.setdefault("variables_count", 0)
 
   
@@ -476,6 +197,9 @@ def search(request):
     #   ctx.setdefault("constructs_count", 0)
 
 
+    # Wellen mit Treffern (aus der ohnehin geladenen Wellenliste, keine Extra-Query)
+    facet_waves_set = {w for w in all_waves if w.id in facet_counter}
+
     # Facetten-Wellen sortieren nach Anzahl Treffer + Jahr
     facet_waves_sorted = sorted(
         facet_waves_set,
@@ -519,7 +243,7 @@ def search(request):
 # API-Endpunkt: "Kleine" Suche nach Fragen für den Frage-Picker im Page-Editor
 #  Nur Fragen, keine Keywords, keine Facetten, nur Relevanz-Sortierung, Top 20
 @require_GET
-def search_questions_api(request):
+async def search_questions_api(request):
     q = (request.GET.get("q") or "").strip()
     if len(q) < 2:
         return JsonResponse({"ok": True, "results": []})
@@ -530,21 +254,18 @@ def search_questions_api(request):
     except Exception:
         wave_ids = []
 
-    found, score_map = search_questions(
-        q=q,
-        wave_ids=wave_ids,
-        include_keywords=False,
-    )
+    # Suche selbst bleibt synchron (mehrere Ranking-Queries), läuft aber im Thread
+    results = await sync_to_async(_api_question_results)(q, wave_ids)
+    return JsonResponse({"ok": True, "results": results})
 
-    # API: immer nach Relevanz + Top 20
-    found_sorted = sorted(
-        found,
-        key=lambda obj: score_map.get(obj.id, 0.0),
-        reverse=True
-    )[:20]
 
-    results = [
-        {"id": obj.id, "label": (obj.questiontext or "")[:200]}
-        for obj in found_sorted
+def _api_question_results(q, wave_ids, limit=20):
+    # API: immer nach Relevanz + Top 20, nur diese Fragen laden
+    score_map = score_questions(q, wave_ids=wave_ids, include_keywords=False)
+    top_ids = heapq.nlargest(limit, score_map, key=score_map.__getitem__)
+    texts = dict(Question.objects.filter(id__in=top_ids).values_list("id", "questiontext"))
+    return [
+        {"id": qid, "label": (texts[qid] or "")[:200]}
+        for qid in top_ids
+        if qid in texts
     ]
-    return JsonResponse({"ok": True, "results": results})
@@ -0,0 +1,35 @@
+document.addEventListener("DOMContentLoaded", function () {
+
+  const container = document.getElementById("construct-widget");
+  if (!container) return;
+
+  const selectEl = container.querySelector("select");
+  if (!selectEl) return;
+
+  const searchUrl = container.dataset.searchUrl;
+
+  // Nur das ausgewählte Konstrukt wird gerendert, weitere werden serverseitig gesucht
+  new TomSelect(selectEl, {
+    maxItems: 1,
+    allowEmptyOption: true,
+    create: false,
+
+    valueField: "value",
+    labelField: "text",
+    searchField: "text",
+
+    shouldLoad: function (query) {
+      return (query || "").trim().length >= 2;
+    },
+
+    load: function (query, callback) {
+      query = (query || "").trim();
+      if (query.length < 2) return callback();
+
+      fetch(`${searchUrl}?q=${encodeURIComponent(query)}`)
+        .then(r => r.json())
+        .then(items => callback(items))
+        .catch(() => callback());
+    },
+  });
+});
@@ -3,6 +3,8 @@
 
 document.addEventListener("DOMContentLoaded", function () {
 
+  const scopeToggle = document.getElementById("vfs-scope-waves");
+
   function initVariableTomSelect(selectEl) {
     if (!selectEl) return;
     if (selectEl.tomselect) return;
@@ -13,6 +15,8 @@ document.addEventListener("DOMContentLoaded", function () {
     const searchUrl = wrapper.dataset.searchUrl;
     if (!searchUrl) return;
 
+    const questionId = wrapper.dataset.questionId;
+
     new TomSelect(selectEl, {
       maxItems: 1,
       create: false,
@@ -35,7 +39,14 @@ document.addEventListener("DOMContentLoaded", function () {
         query = (query || "").trim();
         if (query.length < 2) return callback();
 
-        fetch(`${searchUrl}?q=${encodeURIComponent(query)}`)
+        let url = `${searchUrl}?q=${encodeURIComponent(query)}`;
+
+        // optional: nur Variablen der Befragungen dieser Frage
+        if (questionId && scopeToggle && scopeToggle.checked) {
+          url += `&scope=waves&question=${encodeURIComponent(questionId)}`;
+        }
+
+        fetch(url)
           .then(r => r.json())
           .then(items => callback(items))
           .catch(() => callback());
@@ -51,6 +62,18 @@ document.addEventListener("DOMContentLoaded", function () {
   // initial
   initAll();
 
+  // Umschalten des Vorschlagsbereichs: bereits geladene Vorschläge verwerfen
+  if (scopeToggle) {
+    scopeToggle.addEventListener("change", () => {
+      document.querySelectorAll(".variable-widget select").forEach((el) => {
+        if (el.tomselect) {
+          el.tomselect.clearOptions();
+          el.tomselect.loadedSearches = {};
+        }
+      });
+    });
+  }
+
   // wenn neue Formset-Zeile hinzugefügt wird: nach dem Append initialisieren
   const addBtn = document.getElementById("vfs-add");
   if (addBtn) {
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VariablesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'variables'
+
+    def ready(self):
+        from . import signals  # noqa: F401
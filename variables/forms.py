@@ -2,6 +2,7 @@
 
 from django import forms
 from .models import Variable
+from .services.varname_registry import varname_exists
 
 # Form for creating and updating Variable instances
 class VariableForm(forms.ModelForm):
@@ -33,11 +34,8 @@ class VariableForm(forms.ModelForm):
         if len(varname) < 2:
             raise forms.ValidationError("Der Variablenname muss mindestens 2 Zeichen haben.")
 
-        qs = Variable.objects.filter(varname__iexact=varname)
-        if self.instance and self.instance.pk:
-            qs = qs.exclude(pk=self.instance.pk)
-
-        if qs.exists():
+        exclude_id = self.instance.pk if self.instance and self.instance.pk else None
+        if varname_exists(varname, exclude_id=exclude_id):
             raise forms.ValidationError("Dieser Variablenname ist bereits vergeben.")
 
         return varname
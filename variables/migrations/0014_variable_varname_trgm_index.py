@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# Teilstring-Suche (LIKE '%abc%') auf lower(varname) für den var-connector;
+# der Präfix-Pfad nutzt den bestehenden Index ix_variable_varname_btree (0004).
+SQL_FORWARDS = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_variable_varname_trgm
+  ON variables_variable
+  USING gin (lower(varname) gin_trgm_ops);
+"""
+
+SQL_BACKWARDS = """
+DROP INDEX IF EXISTS ix_variable_varname_trgm;
+"""
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_FORWARDS)
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_BACKWARDS)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("variables", "0013_alter_variable_varlab"),
+    ]
+
+    operations = [migrations.RunPython(forwards, backwards)]
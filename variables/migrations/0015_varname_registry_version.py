@@ -0,0 +1,60 @@
+from django.db import migrations
+
+# Versionszähler für Variablennamen: wird per Trigger erhöht, sobald Variablen angelegt,
+# gelöscht oder umbenannt werden. Die prozesslokale Varname-Registry vergleicht nur diesen
+# Zähler, statt die Namensliste neu zu laden (mehrere Gunicorn-Worker).
+SQL_FORWARDS = """
+CREATE TABLE IF NOT EXISTS variables_varname_version (
+  id smallint PRIMARY KEY,
+  version bigint NOT NULL DEFAULT 0
+);
+
+INSERT INTO variables_varname_version (id, version)
+VALUES (1, 0)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION variables_varname_version_bump_fn() RETURNS trigger AS $$
+BEGIN
+  UPDATE variables_varname_version SET version = version + 1 WHERE id = 1;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS variables_varname_version_ins_del_trg ON variables_variable;
+CREATE TRIGGER variables_varname_version_ins_del_trg
+AFTER INSERT OR DELETE ON variables_variable
+FOR EACH STATEMENT
+EXECUTE FUNCTION variables_varname_version_bump_fn();
+
+DROP TRIGGER IF EXISTS variables_varname_version_upd_trg ON variables_variable;
+CREATE TRIGGER variables_varname_version_upd_trg
+AFTER UPDATE OF varname ON variables_variable
+FOR EACH ROW
+WHEN (OLD.varname IS DISTINCT FROM NEW.varname)
+EXECUTE FUNCTION variables_varname_version_bump_fn();
+"""
+
+SQL_BACKWARDS = """
+DROP TRIGGER IF EXISTS variables_varname_version_upd_trg ON variables_variable;
+DROP TRIGGER IF EXISTS variables_varname_version_ins_del_trg ON variables_variable;
+DROP FUNCTION IF EXISTS variables_varname_version_bump_fn();
+DROP TABLE IF EXISTS variables_varname_version;
+"""
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_FORWARDS)
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_BACKWARDS)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("variables", "0014_variable_varname_trgm_index"),
+    ]
+
+    operations = [migrations.RunPython(forwards, backwards)]
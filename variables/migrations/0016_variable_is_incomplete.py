@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+# Vollständigkeit einer Variable wird beim Schreiben per Trigger berechnet und gespeichert,
+# statt bei jedem Lesen per Annotation (Listen, Übersichten, Arbeitsliste).
+SQL_FORWARDS = """
+CREATE OR REPLACE FUNCTION variables_variable_incomplete_fn() RETURNS trigger AS $$
+BEGIN
+  NEW.is_incomplete := coalesce(NEW.varname, '') = '' OR coalesce(NEW.varlab, '') = '';
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS variables_variable_incomplete_trg ON variables_variable;
+CREATE TRIGGER variables_variable_incomplete_trg
+BEFORE INSERT OR UPDATE OF varname, varlab, is_incomplete ON variables_variable
+FOR EACH ROW
+EXECUTE FUNCTION variables_variable_incomplete_fn();
+
+UPDATE variables_variable
+SET is_incomplete = coalesce(varname, '') = '' OR coalesce(varlab, '') = '';
+"""
+
+SQL_BACKWARDS = """
+DROP TRIGGER IF EXISTS variables_variable_incomplete_trg ON variables_variable;
+DROP FUNCTION IF EXISTS variables_variable_incomplete_fn();
+"""
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_FORWARDS)
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_BACKWARDS)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("variables", "0015_varname_registry_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='variable',
+            name='is_incomplete',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='variable',
+            index=models.Index(condition=models.Q(('is_incomplete', True)), fields=['id'], name='idx_variable_incomplete'),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,33 @@
+import importlib
+
+from django.db import migrations
+
+# Der Trigger-gepflegte Versionszähler (0015) sperrt bei jedem Anlegen/Löschen/Umbenennen
+# einer Variable dieselbe Zeile bis zum Commit und serialisiert so alle Schreibzugriffe
+# (z. B. Import gegen Bearbeitung). Die Varname-Registry nutzt stattdessen einen
+# Versionszähler im Cache, der nach dem Commit erhöht wird.
+SQL_FORWARDS = """
+DROP TRIGGER IF EXISTS variables_varname_version_upd_trg ON variables_variable;
+DROP TRIGGER IF EXISTS variables_varname_version_ins_del_trg ON variables_variable;
+DROP FUNCTION IF EXISTS variables_varname_version_bump_fn();
+DROP TABLE IF EXISTS variables_varname_version;
+"""
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_FORWARDS)
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        previous = importlib.import_module("variables.migrations.0015_varname_registry_version")
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(previous.SQL_FORWARDS)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("variables", "0016_variable_is_incomplete"),
+    ]
+
+    operations = [migrations.RunPython(forwards, backwards)]
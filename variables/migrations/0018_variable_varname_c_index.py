@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# Präfix-Vorschläge im var-connector: ix_variable_varname_btree (varchar_pattern_ops) kann
+# unter einer Nicht-C-Collation kein ORDER BY lower(varname) liefern, Postgres sortierte also
+# alle Präfix-Treffer vor dem LIMIT. Ein Index mit C-Collation dient für LIKE 'abc%' und
+# ORDER BY lower(varname) COLLATE "C" zugleich, die Abfrage bricht nach dem LIMIT ab.
+SQL_FORWARDS = """
+CREATE INDEX IF NOT EXISTS ix_variable_varname_c
+  ON variables_variable
+  ((lower(varname)) COLLATE "C");
+"""
+
+SQL_BACKWARDS = """
+DROP INDEX IF EXISTS ix_variable_varname_c;
+"""
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_FORWARDS)
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cur:
+            cur.execute(SQL_BACKWARDS)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("variables", "0017_drop_varname_version_table"),
+    ]
+
+    operations = [migrations.RunPython(forwards, backwards)]
@@ -2,26 +2,13 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.urls import reverse
-from django.db.models import Q, Case, When, Value, BooleanField
+from django.db.models import Q
 
 
-# QuerySet mit Annotations zur Vollständigkeitsprüfung von Variablen
+# QuerySet für Variablen (Vollständigkeit wird per DB-Trigger in `is_incomplete` gepflegt)
 class VariableQuerySet(models.QuerySet):
-    def with_completeness(self):
-        missing = (
-            Q(varname__isnull=True) | Q(varname="") |
-            Q(varlab__isnull=True) | Q(varlab="") 
-
-        )
-        return self.annotate(
-            is_incomplete=Case(
-                When(missing, then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
-            )
-        )
-
-
+    def incomplete(self):
+        return self.filter(is_incomplete=True)
 
 
 def validate_vallab_values(value):
@@ -107,10 +94,16 @@ class Variable(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Unvollständig (Name oder Label fehlt); per DB-Trigger gepflegt
+    is_incomplete = models.BooleanField(default=True, editable=False)
+
     class Meta:
         ordering = ["varname"]
         verbose_name = "Variable"
         verbose_name_plural = "Variablen"
+        indexes = [
+            models.Index(fields=["id"], condition=Q(is_incomplete=True), name="idx_variable_incomplete"),
+        ]
 
     def __str__(self):
         return f"{self.varname} ({self.varlab})"
@@ -1,14 +1,19 @@
 import json
 from import_export import resources, fields
-from variables.models import ValLab
-from import_export.widgets import ForeignKeyWidget, ManyToManyWidget
+from SLC.slc_import import (
+    BULK_BATCH_SIZE,
+    BulkImportMixin,
+    CachedForeignKeyWidget,
+    CachedManyToManyWidget,
+    bulk_m2m_attribute,
+)
 from .models import Variable, ValLab
-from questions.models import Question
+from .services.varname_registry import invalidate_varnames
 from waves.models import Wave
 
 
 
-class ValLabResource(resources.ModelResource):
+class ValLabResource(BulkImportMixin, resources.ModelResource):
     legacy_id = fields.Field(attribute="legacy_id", column_name="legacy_id")
     vallabname = fields.Field(attribute="vallabname", column_name="vallabname")
     values = fields.Field(attribute="values", column_name="values")
@@ -18,7 +23,9 @@ class ValLabResource(resources.ModelResource):
         import_id_fields = ["legacy_id"]
         fields = ("legacy_id", "vallabname", "values")
         skip_unchanged = True
-        report_skipped = True
+        report_skipped = False
+        use_bulk = True
+        batch_size = BULK_BATCH_SIZE
 
     def before_import_row(self, row, **kwargs):
 
@@ -36,25 +43,22 @@ class ValLabResource(resources.ModelResource):
             raise ValueError(f"Ungültiges JSON in 'values': {raw!r}. Fehler: {e}")
 
 
-class VariableResource(resources.ModelResource):
+class VariableResource(BulkImportMixin, resources.ModelResource):
     vallab = fields.Field(
         column_name="vallab_ID",
         attribute="vallab",
-        widget=ForeignKeyWidget(ValLab, field="legacy_id"),
-    )
-
-    question = fields.Field(
-        column_name="questionID",
-        attribute="question",
-        widget=ForeignKeyWidget(Question, field="legacy_id"),
+        widget=CachedForeignKeyWidget(ValLab, field="legacy_id"),
     )
 
+    # Zuordnung zu Befragtengruppen wird gesammelt in die Zwischentabelle geschrieben
     waves = fields.Field(
         column_name="waves",
-        attribute="waves",
-        widget=ManyToManyWidget(Wave, field="legacy_id"),
+        attribute=bulk_m2m_attribute("waves"),
+        widget=CachedManyToManyWidget(Wave, field="legacy_id"),
     )
 
+    bulk_m2m_fields = ("waves",)
+
     class Meta:
         model = Variable
         import_id_fields = ("legacy_id",)
@@ -63,7 +67,6 @@ class VariableResource(resources.ModelResource):
             "varname",
             "varlab",
             "vallab",
-            "question",
             "waves",
             "ver",
             "gen",
@@ -76,5 +79,17 @@ class VariableResource(resources.ModelResource):
             "comment",
         )
         skip_unchanged = True
-        report_skipped = True
+        report_skipped = False
+        use_bulk = True
+        batch_size = BULK_BATCH_SIZE
+
+    def after_import(self, dataset, result, **kwargs):
+        super().after_import(dataset, result, **kwargs)
+        # bulk_create/bulk_update lösen kein post_save aus
+        invalidate_varnames()
+
+    def filter_export(self, queryset, **kwargs):
+        return super().filter_export(queryset, **kwargs).prefetch_related("waves")
 
+    def dehydrate_waves(self, obj):
+        return ",".join(str(w.legacy_id) for w in obj.waves.all() if w.legacy_id is not None)
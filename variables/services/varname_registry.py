@@ -0,0 +1,140 @@
+# variables/services/varname_registry.py
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from SLC import slc_cache
+from variables.models import Variable
+
+
+# Namensraum des gemeinsamen Versionszählers (SLC/slc_cache.py) für Variablennamen
+VARNAMES_CACHE_NAMESPACE = "varnames"
+
+# Wie oft (Sekunden) der Versionszähler höchstens abgefragt wird
+VERSION_CHECK_INTERVAL = 2.0
+
+
+class VarnameRegistry:
+    """
+    Prozesslokale, sortierte Liste aller Variablennamen (lowercase) für
+    Existenzprüfungen und Präfix-Vorschläge ohne DB-Zugriff.
+
+    Aktualität: Der gemeinsame Versionszähler (Namensraum VARNAMES_CACHE_NAMESPACE, erhöht
+    per `invalidate_varnames()` nach dem Commit) wird höchstens alle VERSION_CHECK_INTERVAL
+    Sekunden gelesen; nur wenn er sich geändert hat, wird die Liste neu geladen. Nur für Vorschläge/Live-Prüfung beim Tippen –
+    beim Speichern prüft `varname_exists()` direkt in der DB.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: list[str] = []       # lower(varname), sortiert
+        self._names: list[str] = []      # Originalschreibweise, parallel zu _keys
+        self._ids: list[int] = []        # IDs, parallel zu _keys
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    # --- Aktualität
+
+    def mark_stale(self) -> None:
+        # nächster Zugriff prüft den Versionszähler (z. B. nach Speichern im eigenen Prozess)
+        self._checked_at = 0.0
+
+    def _shared_version(self) -> int:
+        return slc_cache.namespace_version(VARNAMES_CACHE_NAMESPACE)
+
+    def _ensure_fresh(self) -> None:
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return
+
+        with self._lock:
+            version = self._shared_version()
+            if self._version is not None and version == self._version:
+                self._checked_at = time.monotonic()
+                return
+
+            # Version vor dem Laden lesen: Änderungen währenddessen führen beim nächsten Check zum Reload
+            rows = sorted(
+                ((name or "").lower(), name, vid)
+                for vid, name in Variable.objects.values_list("id", "varname")
+            )
+            self._keys = [k for k, _, _ in rows]
+            self._names = [n for _, n, _ in rows]
+            self._ids = [i for _, _, i in rows]
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    # --- Abfragen
+
+    def exists(self, varname: str, *, exclude_id: Optional[int] = None) -> bool:
+        """
+        Case-insensitive Existenzprüfung aus der (bis zu VERSION_CHECK_INTERVAL alten) Liste.
+        """
+        key = (varname or "").strip().lower()
+        if not key:
+            return False
+
+        self._ensure_fresh()
+        keys, ids = self._keys, self._ids
+
+        i = bisect_left(keys, key)
+        while i < len(keys) and keys[i] == key:
+            if exclude_id is None or ids[i] != exclude_id:
+                return True
+            i += 1
+        return False
+
+    def prefix(self, q: str, *, limit: int = 12) -> list[str]:
+        """
+        Variablennamen (Originalschreibweise), die mit `q` beginnen (case-insensitive), sortiert.
+        """
+        key = (q or "").strip().lower()
+        if not key:
+            return []
+
+        self._ensure_fresh()
+        keys, names = self._keys, self._names
+
+        result: list[str] = []
+        i = bisect_left(keys, key)
+        while i < len(keys) and keys[i].startswith(key) and len(result) < limit:
+            result.append(names[i])
+            i += 1
+        return result
+
+
+registry = VarnameRegistry()
+
+
+def invalidate_varnames() -> None:
+    """
+    Registry aller Worker nach dem Commit neu laden lassen (Variablen angelegt, geändert,
+    gelöscht oder importiert). Erst nach dem Commit, damit kein Worker die Liste vor dem
+    Sichtbarwerden der Änderung lädt und die neue Version trotzdem übernimmt.
+    """
+    def _bump():
+        slc_cache.bump(VARNAMES_CACHE_NAMESPACE)
+        registry.mark_stale()
+
+    transaction.on_commit(_bump)
+
+
+def varname_exists(varname: str, *, exclude_id: Optional[int] = None) -> bool:
+    """
+    Verbindliche Prüfung für Submit-Pfade: eine Query über den Index auf lower(varname),
+    ohne Versionszähler und ohne Neuladen der Registry.
+    """
+    key = (varname or "").strip().lower()
+    if not key:
+        return False
+    qs = Variable.objects.annotate(vn=Lower("varname")).filter(vn=key)
+    if exclude_id is not None:
+        qs = qs.exclude(pk=exclude_id)
+    return qs.exists()
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Variable
+from .services.varname_registry import invalidate_varnames
+
+
+# Varname-Registry aller Worker nach dem Commit neu laden lassen
+@receiver(post_save, sender=Variable)
+@receiver(post_delete, sender=Variable)
+def variable_changed(sender, **kwargs):
+    invalidate_varnames()
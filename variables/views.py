@@ -7,21 +7,26 @@ from django.utils.decorators import method_decorator
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.http import JsonResponse
 
+from asgiref.sync import sync_to_async
+
 from accounts.mixins import EditorRequiredMixin
 
 from django.views import View
 from django.views.generic import DetailView
 from django.views.generic.edit import UpdateView
-from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.http import require_POST
 
 from waves.models import WaveQuestion
+from waves.services.lock_state import get_lock_state
 
 from .models import Variable, QuestionVariableWave
 from questions.models import Question
-from django.db.models import Prefetch, Q
+from django.db.models import Prefetch, Exists, OuterRef
+from django.db.models.functions import Collate, Length, Lower
 from django.db import transaction
 
 from .forms import VariableForm
+from .services.varname_registry import registry as varname_registry, varname_exists
 
 
 
@@ -56,10 +61,6 @@ class VariableDetail(DetailView):
             )
         )
 
-        # Vollständigkeit nur für Editoren
-        if self.can_edit:
-            qs = qs.with_completeness()
-
         return qs
     
 
@@ -72,21 +73,13 @@ class VariableDetail(DetailView):
         # --- Frage-IDs aus den Triad-Links ---
         question_ids = {link.question_id for link in links}
 
-        questions_qs = Question.objects.filter(id__in=question_ids).order_by("id")
-        if self.can_edit:
-            questions_qs = questions_qs.with_completeness()
-
-        questions = list(questions_qs)
+        questions = list(Question.objects.filter(id__in=question_ids).order_by("id"))
 
         # --- Gesperrte Fragen-IDs ---
+        lock_state = get_lock_state(self.request)
         locked_question_ids = set()
         if self.can_edit and question_ids:
-            locked_question_ids = set(
-                WaveQuestion.objects.filter(
-                    question_id__in=question_ids,
-                    wave__is_locked=True,
-                ).values_list("question_id", flat=True)
-            )
+            locked_question_ids = lock_state.locked_question_ids(question_ids)
 
 
         # Mapping: Frage -> Waves, in denen die Variable bei dieser Frage genutzt wird
@@ -103,15 +96,8 @@ class VariableDetail(DetailView):
                 seen_wids.add(w.id)
                 used_waves.append(w)
 
-        # Sperre prüfen
-        locked_via_triad = QuestionVariableWave.objects.filter(
-            variable=v,
-            wave__is_locked=True,
-        ).exists()
-
-        locked_via_m2m = v.waves.filter(is_locked=True).exists()
-
-
+        # Sperre prüfen (Triade oder M2M)
+        variable_is_locked = lock_state.is_variable_locked(v.pk)
 
         # Fragen: vorbereitet fürs Template
         ctx["triad_links"] = links
@@ -121,7 +107,7 @@ class VariableDetail(DetailView):
         ctx["single_question"] = questions[0] if len(questions) == 1 else None
         ctx["questions_preview"] = questions[:5]
         ctx["questions_more_count"] = max(len(questions) - 5, 0)
-        ctx["variable_is_locked"] = locked_via_triad or locked_via_m2m
+        ctx["variable_is_locked"] = variable_is_locked
 
         ctx["waves_by_question_id"] = waves_by_qid
         ctx["used_waves"] = used_waves  # Waves, in denen die Variable irgendwo genutzt wird
@@ -253,11 +239,15 @@ class VariableDeleteView(EditorRequiredMixin, View):
 
 
 
-# AJAX-Endpoint für Variablen-Vorschläge
+# Maximale Anzahl Vorschläge im Variablen-Connector
+SUGGEST_LIMIT = 30
+
+
+# AJAX-Endpoint für Variablen-Vorschläge (async, ORM ohne Worker-Blockade)
 # Liefert schnelle Vorschläge für den Variablen-Connector
 class VariableSuggestView(View):
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         q = (request.GET.get("q") or "").strip().lower()
 
         if len(q) < 2:
@@ -266,16 +256,50 @@ class VariableSuggestView(View):
         qs = (
             Variable.objects
             .filter(is_technical=False) # technische Variablen für den var-connector ausschließen
-            .filter(
-                Q(varname__istartswith=q) |
-                Q(varname__icontains=q)   # optional (Performance noch testen)
-            )
-            .order_by("varname")
-            .only("id", "varname", "varlab")[:30]
+            # vlc: Sortierung/Präfix in C-Collation, passend zu ix_variable_varname_c
+            .annotate(vl=Lower("varname"), vlc=Collate(Lower("varname"), "C"))
         )
 
+        # optional: nur Variablen, die bereits an den Befragungen der Frage hängen
+        question_id = request.GET.get("question")
+        if request.GET.get("scope") == "waves" and question_id:
+            try:
+                question_id = int(question_id)
+            except ValueError:
+                return JsonResponse([], safe=False)
+
+            question_waves = WaveQuestion.objects.filter(question_id=question_id).values("wave_id")
+            qs = qs.filter(Exists(
+                Variable.waves.through.objects.filter(
+                    variable_id=OuterRef("pk"),
+                    wave_id__in=question_waves,
+                )
+            ))
+
+        qs = qs.only("id", "varname", "varlab")
+
+        # 1) Präfix-Treffer über ix_variable_varname_c (Indexreihenfolge, bricht nach 30 ab)
+        found = [v async for v in qs.filter(vlc__startswith=q).order_by("vlc")[:SUGGEST_LIMIT]]
+
+        # 2) Nur wenn das nicht reicht: Teilstring-Treffer (ix_variable_varname_trgm ab 3 Zeichen)
+        if len(found) < SUGGEST_LIMIT:
+            more = (
+                qs.filter(vl__contains=q)
+                .exclude(vlc__startswith=q)
+                .annotate(vlen=Length("varname"))
+                .order_by("vlen", "vl")[:SUGGEST_LIMIT - len(found)]
+            )
+            found += [v async for v in more]
+
+        # Relevanz: exakt > Präfix > Teilstring, dann kürzere Namen zuerst
+        found.sort(key=lambda v: (
+            0 if v.vl == q else 1 if (v.vl or "").startswith(q) else 2,
+            len(v.varname or ""),
+            v.vl or "",
+        ))
+
         results = []
-        for v in qs:
+        for v in found:
             label = v.varname
             if v.varlab:
                 lab = v.varlab.strip()
@@ -292,10 +316,10 @@ class VariableSuggestView(View):
     
     
 # AJAX-Endpoint: Prüft, ob ein Variablenname bereits existiert (case-insensitive)
-@method_decorator(require_GET, name="dispatch")
 class VariableVarnameCheckView(View):
+    http_method_names = ["get"]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         q_raw = (request.GET.get("q") or "").strip()
         q = q_raw.lower()
 
@@ -308,24 +332,22 @@ class VariableVarnameCheckView(View):
                 "suggestions": [],
             })
 
-        exists_exact = Variable.objects.filter(varname__iexact=q).exists()
-
-        suggestions_qs = (
-            Variable.objects
-            .filter(varname__istartswith=q)
-            .order_by("varname")
-            .values_list("varname", flat=True)[:12]
-        )
-
+        # Prüfung und Vorschläge aus der prozesslokalen Varname-Registry
+        # (synchron, prüft ggf. den Versionszähler in der DB)
+        exists_exact, suggestions = await sync_to_async(_varname_lookup)(q)
         return JsonResponse({
             "query": q_raw,
             "normalized": q,
             "is_valid_length": True,
             "exists_exact": exists_exact,
-            "suggestions": list(suggestions_qs),
+            "suggestions": suggestions,
         })
 
 
+def _varname_lookup(q):
+    return varname_registry.exists(q), varname_registry.prefix(q, limit=12)
+
+
 # AJAX: Quickcreate für neue Variable (nur varname, ohne Verknüpfung mit Befragungen / Questions)
 # Minimalvariante für den Question-Variable-Connector
 @method_decorator(require_POST, name="dispatch")
@@ -337,7 +359,7 @@ class VariableQuickCreateView(View):
         if len(varname) <2:
             return JsonResponse({"ok": False, "error": "Der Variablenname muss mindestens 2 Zeichen haben."}, status=400)
         
-        if Variable.objects.filter(varname__iexact=varname).exists():
+        if varname_exists(varname):
             return JsonResponse({"ok": False, "error": "Dieser Variablenname ist bereits vergeben."}, status=409)
 
         v = Variable.objects.create(
@@ -368,7 +390,7 @@ class VariableQuickCreateForQuestionView(EditorRequiredMixin, View):
         if len(varname) < 2:
             return JsonResponse({"ok": False, "error": "Der Variablenname muss mindestens 2 Zeichen haben."}, status=400)
 
-        if Variable.objects.filter(varname__iexact=varname).exists():
+        if varname_exists(varname):
             return JsonResponse({"ok": False, "error": "Dieser Variablenname ist bereits vergeben."}, status=409)
 
         if not question_id:
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from waves.models import Wave
+from waves.services.wave_clone import WaveCloneError, clone_wave
+
+
+class Command(BaseCommand):
+    help = (
+        "Klont die Struktur einer Befragtengruppe (Module, Seiten, Fragen, Variablen) "
+        "in eine bestehende oder neue Gruppe derselben Befragung."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source_wave_id", type=int, help="ID der Quellgruppe")
+
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--target", type=int, dest="target_wave_id", help="ID einer bestehenden, leeren Zielgruppe")
+        target.add_argument("--cycle", help="Name (Befragtengruppe) einer neu anzulegenden Zielgruppe")
+
+        parser.add_argument(
+            "--instrument",
+            choices=[c for c, _ in Wave.Instrument.choices],
+            help="Erhebungsmodus der neuen Gruppe (Standard: wie Quellgruppe)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            source = Wave.objects.select_related("survey").get(pk=options["source_wave_id"])
+        except Wave.DoesNotExist:
+            raise CommandError(f"Quellgruppe {options['source_wave_id']} existiert nicht.")
+
+        try:
+            with transaction.atomic():
+                if options["target_wave_id"]:
+                    try:
+                        target = Wave.objects.get(pk=options["target_wave_id"])
+                    except Wave.DoesNotExist:
+                        raise CommandError(f"Zielgruppe {options['target_wave_id']} existiert nicht.")
+                else:
+                    target = Wave.objects.create(
+                        survey=source.survey,
+                        cycle=options["cycle"],
+                        instrument=options["instrument"] or source.instrument,
+                    )
+
+                result = clone_wave(source_wave=source, target_wave=target)
+        except WaveCloneError as e:
+            raise CommandError(str(e))
+        except IntegrityError as e:
+            raise CommandError(f"Klonen nicht möglich (Datenbank-Regel verletzt): {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Gruppe {result.source_wave_id} -> {result.target_wave_id} geklont: "
+            f"{result.modules} Module, {result.page_links} Seiten, {result.wavequestions} Fragen, "
+            f"{result.question_variable_links} Triaden, {result.variable_links} Variablen."
+        ))
@@ -1,25 +1,26 @@
 from import_export import resources, fields
-from import_export.widgets import ForeignKeyWidget
+from SLC.slc_import import BULK_BATCH_SIZE, BulkImportMixin, CachedForeignKeyWidget
 from waves.models import Wave, WaveQuestion
 from questions.models import Question
 
 
-class WaveResource(resources.ModelResource):
+class WaveResource(BulkImportMixin, resources.ModelResource):
+    # Kein use_bulk: Wave.save() ergänzt surveyyear, Signale halten den Sperr-Cache aktuell
     class Meta:
         model = Wave
         fields = ('id','legacy_id','surveyyear','cycle','instrument','start_date','end_date','is_locked',)
 
 
-class WaveQuestionResource(resources.ModelResource):
+class WaveQuestionResource(BulkImportMixin, resources.ModelResource):
     wave = fields.Field(
         column_name='wave_legacy_id',
         attribute='wave',
-        widget=ForeignKeyWidget(Wave, 'legacy_id')
+        widget=CachedForeignKeyWidget(Wave, 'legacy_id')
     )
     question = fields.Field(
         column_name='question_legacy_id',
         attribute='question',
-        widget=ForeignKeyWidget(Question, 'legacy_id')
+        widget=CachedForeignKeyWidget(Question, 'legacy_id')
     )
     legacy_screenshot_id = fields.Field(
         column_name='screenshotID',
@@ -29,6 +30,8 @@ class WaveQuestionResource(resources.ModelResource):
     class Meta:
         model = WaveQuestion
         fields = ('id', 'wave', 'question', 'legacy_screenshot_id',)
-
-
-
+        # (wave, question) ist eindeutig -> erneuter Import aktualisiert statt zu duplizieren
+        import_id_fields = ('wave', 'question',)
+        skip_unchanged = True
+        use_bulk = True
+        batch_size = BULK_BATCH_SIZE
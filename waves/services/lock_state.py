@@ -0,0 +1,119 @@
+# waves/services/lock_state.py
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from SLC import slc_cache
+from waves.models import Wave, WaveQuestion
+
+
+# Gesperrte Befragtengruppen ändern sich selten: Menge der IDs liegt im gemeinsamen Cache
+# und wird bei Änderungen an Wave per Signal (Namensraum-Version) verworfen.
+LOCKS_CACHE_NAMESPACE = "locks"
+LOCKED_WAVES_CACHE_TIMEOUT = 60 * 60
+
+
+def get_locked_wave_ids() -> frozenset[int]:
+    return slc_cache.get_or_build(
+        LOCKS_CACHE_NAMESPACE,
+        "locked_wave_ids",
+        builder=lambda: frozenset(Wave.objects.filter(is_locked=True).values_list("id", flat=True)),
+        timeout=LOCKED_WAVES_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_locked_wave_ids() -> None:
+    transaction.on_commit(lambda: slc_cache.bump(LOCKS_CACHE_NAMESPACE))
+
+
+class LockState:
+    """
+    Sperrstatus von Fragen, Variablen und Seiten für eine Anfrage.
+    Je Objekttyp höchstens eine Query pro Aufruf (nur für noch unbekannte IDs),
+    Ergebnisse werden für die Dauer der Anfrage gemerkt.
+    """
+
+    def __init__(self, locked_wave_ids: Optional[frozenset[int]] = None):
+        self._locked_wave_ids = locked_wave_ids
+        self._questions: dict[int, bool] = {}
+        self._variables: dict[int, bool] = {}
+        self._pages: dict[int, bool] = {}
+
+    @property
+    def locked_wave_ids(self) -> frozenset[int]:
+        if self._locked_wave_ids is None:
+            self._locked_wave_ids = get_locked_wave_ids()
+        return self._locked_wave_ids
+
+    def is_wave_locked(self, wave_id: int) -> bool:
+        return wave_id in self.locked_wave_ids
+
+    # Helper: nur fehlende IDs nachladen, Ergebnis im Memo ablegen
+    def _resolve(self, memo: dict[int, bool], ids: Iterable[int], load) -> set[int]:
+        ids = {int(x) for x in ids if x is not None}
+        missing = ids - memo.keys()
+        if missing:
+            locked = set(load(missing)) if self.locked_wave_ids else set()
+            for i in missing:
+                memo[i] = i in locked
+        return {i for i in ids if memo[i]}
+
+    def locked_question_ids(self, question_ids: Iterable[int]) -> set[int]:
+        # Frage ist gesperrt, wenn sie in einer gesperrten Befragung vorkommt
+        return self._resolve(self._questions, question_ids, lambda ids: (
+            WaveQuestion.objects
+            .filter(question_id__in=ids, wave_id__in=self.locked_wave_ids)
+            .values_list("question_id", flat=True)
+        ))
+
+    def locked_variable_ids(self, variable_ids: Iterable[int]) -> set[int]:
+        # Variable ist gesperrt, wenn sie über Triade oder M2M an einer gesperrten Befragung hängt
+        from variables.models import QuestionVariableWave, Variable
+
+        def load(ids):
+            locked = list(self.locked_wave_ids)
+            return (
+                Variable.objects
+                .filter(id__in=ids)
+                .filter(
+                    Q(Exists(QuestionVariableWave.objects.filter(variable_id=OuterRef("pk"), wave_id__in=locked)))
+                    | Q(Exists(Variable.waves.through.objects.filter(variable_id=OuterRef("pk"), wave_id__in=locked)))
+                )
+                .values_list("id", flat=True)
+            )
+
+        return self._resolve(self._variables, variable_ids, load)
+
+    def locked_page_ids(self, page_ids: Iterable[int]) -> set[int]:
+        # Seite ist gesperrt, wenn sie mit einer gesperrten Befragung verknüpft ist
+        from pages.models import WavePageWave
+
+        return self._resolve(self._pages, page_ids, lambda ids: (
+            WavePageWave.objects
+            .filter(page_id__in=ids, wave_id__in=self.locked_wave_ids)
+            .values_list("page_id", flat=True)
+        ))
+
+    def is_question_locked(self, question_id: int) -> bool:
+        return bool(self.locked_question_ids([question_id]))
+
+    def is_variable_locked(self, variable_id: int) -> bool:
+        return bool(self.locked_variable_ids([variable_id]))
+
+    def is_page_locked(self, page_id: int) -> bool:
+        return bool(self.locked_page_ids([page_id]))
+
+
+def get_lock_state(request) -> LockState:
+    """
+    LockState der aktuellen Anfrage (einmal pro Request angelegt).
+    """
+    state = getattr(request, "_slc_lock_state", None)
+    if state is None:
+        state = LockState()
+        request._slc_lock_state = state
+    return state
@@ -0,0 +1,107 @@
+# waves/services/wave_clone.py
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+
+from waves.models import Wave
+
+
+class WaveCloneError(Exception):
+    """Fachlicher Fehler beim Klonen einer Befragtengruppe."""
+
+
+@dataclass(frozen=True)
+class WaveCloneResult:
+    source_wave_id: int
+    target_wave_id: int
+    modules: int
+    page_links: int
+    wavequestions: int
+    question_variable_links: int
+    variable_links: int
+
+
+# INSERT ... SELECT je Tabelle; %(source)s / %(target)s sind die Wave-IDs.
+# Module werden über ihren Namen den neuen Modulen der Zielgruppe zugeordnet.
+_CLONE_STEPS = (
+    ("modules", """
+        INSERT INTO waves_wavemodule (wave_id, name, sort_order)
+        SELECT %(target)s, m.name, m.sort_order
+        FROM waves_wavemodule m
+        WHERE m.wave_id = %(source)s
+    """),
+    ("page_links", """
+        INSERT INTO pages_wavepagewave (page_id, wave_id, sort_order, module_id)
+        SELECT l.page_id, %(target)s, l.sort_order, tm.id
+        FROM pages_wavepagewave l
+        LEFT JOIN waves_wavemodule sm ON sm.id = l.module_id
+        LEFT JOIN waves_wavemodule tm ON tm.wave_id = %(target)s AND tm.name = sm.name
+        WHERE l.wave_id = %(source)s
+    """),
+    ("wavequestions", """
+        INSERT INTO waves_wavequestion (wave_id, question_id)
+        SELECT %(target)s, wq.question_id
+        FROM waves_wavequestion wq
+        WHERE wq.wave_id = %(source)s
+        ON CONFLICT DO NOTHING
+    """),
+    ("question_variable_links", """
+        INSERT INTO variables_questionvariablewave (question_id, variable_id, wave_id, created_at)
+        SELECT qvw.question_id, qvw.variable_id, %(target)s, now()
+        FROM variables_questionvariablewave qvw
+        WHERE qvw.wave_id = %(source)s
+        ON CONFLICT DO NOTHING
+    """),
+    ("variable_links", """
+        INSERT INTO variables_variable_waves (variable_id, wave_id)
+        SELECT vw.variable_id, %(target)s
+        FROM variables_variable_waves vw
+        WHERE vw.wave_id = %(source)s
+        ON CONFLICT DO NOTHING
+    """),
+)
+
+
+def clone_wave(*, source_wave: Wave, target_wave: Wave) -> WaveCloneResult:
+    """
+    Übernimmt die Struktur einer Befragtengruppe in eine andere Gruppe derselben Befragung:
+    Module, Seitenverknüpfungen inkl. Reihenfolge, WaveQuestion, Triaden und Variable↔Wave.
+    Fragen, Variablen und Seiten selbst werden nicht kopiert, sondern weiterverwendet.
+
+    Regeln wie bei der Seitenverknüpfung (vgl. pages/migrations/0009):
+    - beide Gruppen müssen einer Befragung zugeordnet sein
+    - Seiten dürfen nicht an mehreren Befragungen hängen -> nur innerhalb derselben Befragung
+    - Seitennamen bleiben eindeutig, weil dieselben Seiten verknüpft werden
+    """
+    if source_wave.pk == target_wave.pk:
+        raise WaveCloneError("Quell- und Zielgruppe sind identisch.")
+    if source_wave.survey_id is None or target_wave.survey_id is None:
+        raise WaveCloneError("Beide Gruppen müssen einer Befragung zugeordnet sein.")
+    if source_wave.survey_id != target_wave.survey_id:
+        raise WaveCloneError("Klonen ist nur innerhalb derselben Befragung möglich.")
+    if target_wave.is_locked:
+        raise WaveCloneError("Die Zielgruppe ist gesperrt.")
+
+    counts: dict[str, int] = {}
+    params = {"source": source_wave.pk, "target": target_wave.pk}
+
+    with transaction.atomic():
+        # Zielgruppe sperren, damit parallel keine Seiten/Module angelegt werden
+        Wave.objects.select_for_update().filter(pk=target_wave.pk).first()
+
+        if target_wave.modules.exists() or target_wave.page_links.exists():
+            raise WaveCloneError("Die Zielgruppe enthält bereits Module oder Seiten.")
+
+        with connection.cursor() as cur:
+            for key, sql in _CLONE_STEPS:
+                cur.execute(sql, params)
+                counts[key] = max(cur.rowcount, 0)
+
+    return WaveCloneResult(
+        source_wave_id=source_wave.pk,
+        target_wave_id=target_wave.pk,
+        **counts,
+    )
@@ -0,0 +1,190 @@
+# waves/services/worklist.py
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from django.db.models import Count, Exists, F, OuterRef
+
+from pages.models import WavePage, WavePageQuestion, WavePageWave
+from questions.models import Question
+from variables.models import QuestionVariableWave, Variable
+from waves.models import Wave, WaveModule, WaveQuestion
+
+
+# Maximale Anzahl Einträge je Liste in der Detailansicht einer Gruppe
+WORKLIST_ITEM_LIMIT = 200
+
+# Wert für module_id / ?module=: nur Seiten ohne Modul
+NO_MODULE = "none"
+
+
+@dataclass
+class WorklistModuleRow:
+    module_id: Optional[int]
+    module_name: str
+    sort_order: int
+    pages: int = 0
+    questions: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.pages + self.questions
+
+
+@dataclass
+class WorklistWaveRow:
+    wave: Wave
+    modules: list[WorklistModuleRow] = field(default_factory=list)
+    pages: int = 0
+    questions: int = 0
+    variables: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.pages + self.questions + self.variables
+
+
+@dataclass(frozen=True)
+class WorklistItems:
+    pages: tuple
+    questions: tuple
+    variables: tuple
+
+
+def build_worklist(*, survey_id: Optional[int] = None) -> list[WorklistWaveRow]:
+    """
+    Anzahl unvollständiger Seiten/Fragen je Befragtengruppe und Modul sowie
+    unvollständiger Variablen je Gruppe. Vier aggregierte Queries (GROUP BY Gruppe/Modul)
+    über die partiellen Indizes auf `is_incomplete`, plus Gruppen und Module zur Anzeige.
+
+    Die Fragen-Summe einer Gruppe wird eigens gezählt (alle unvollständigen Fragen der
+    Gruppe, wie in worklist_items): eine Frage auf Seiten mehrerer Module zählt einmal,
+    Fragen ohne Seite zählen mit.
+    """
+    page_links = WavePageWave.objects.filter(page__is_incomplete=True)
+    question_links = (
+        WavePageQuestion.objects
+        .filter(question__is_incomplete=True)
+        # ein Join auf die Seiten-Gruppen-Links, alle weiteren Bedingungen über die Annotationen
+        .annotate(wave_id=F("wave_page__wave_links__wave_id"), module_id=F("wave_page__wave_links__module_id"))
+        # nur Fragen, die in dieser Gruppe auch gestellt werden
+        .filter(Exists(WaveQuestion.objects.filter(
+            wave_id=OuterRef("wave_id"),
+            question_id=OuterRef("question_id"),
+        )))
+    )
+    wave_questions = WaveQuestion.objects.filter(question__is_incomplete=True)
+    variable_links = QuestionVariableWave.objects.filter(variable__is_incomplete=True)
+
+    if survey_id is not None:
+        page_links = page_links.filter(wave__survey_id=survey_id)
+        question_links = question_links.filter(wave_id__in=Wave.objects.filter(survey_id=survey_id).values("id"))
+        wave_questions = wave_questions.filter(wave__survey_id=survey_id)
+        variable_links = variable_links.filter(wave__survey_id=survey_id)
+
+    counts: dict[tuple[int, Optional[int]], dict[str, int]] = defaultdict(lambda: {"pages": 0, "questions": 0})
+
+    for row in page_links.values("wave_id", "module_id").annotate(n=Count("page_id", distinct=True)).order_by():
+        counts[(row["wave_id"], row["module_id"])]["pages"] = row["n"]
+
+    for row in question_links.values("wave_id", "module_id").annotate(n=Count("question_id", distinct=True)).order_by():
+        counts[(row["wave_id"], row["module_id"])]["questions"] = row["n"]
+
+    questions_by_wave = dict(
+        wave_questions.values("wave_id").annotate(n=Count("question_id", distinct=True)).order_by()
+        .values_list("wave_id", "n")
+    )
+
+    variables_by_wave = dict(
+        variable_links.values("wave_id").annotate(n=Count("variable_id", distinct=True)).order_by()
+        .values_list("wave_id", "n")
+    )
+
+    wave_ids = {wid for wid, _ in counts} | set(questions_by_wave) | set(variables_by_wave)
+    if not wave_ids:
+        return []
+
+    waves = (
+        Wave.objects
+        .filter(id__in=wave_ids)
+        .select_related("survey")
+        .order_by("-survey__year", "survey__name", "cycle", "instrument", "id")
+    )
+    modules = WaveModule.objects.in_bulk({mid for _, mid in counts if mid is not None})
+
+    rows: list[WorklistWaveRow] = []
+    for wave in waves:
+        row = WorklistWaveRow(
+            wave=wave,
+            questions=questions_by_wave.get(wave.id, 0),
+            variables=variables_by_wave.get(wave.id, 0),
+        )
+        for (wid, mid), c in counts.items():
+            if wid != wave.id:
+                continue
+            module = modules.get(mid)
+            row.modules.append(WorklistModuleRow(
+                module_id=mid,
+                module_name=module.name if module else "Ohne Modul",
+                sort_order=module.sort_order if module else -1,
+                pages=c["pages"],
+                questions=c["questions"],
+            ))
+            row.pages += c["pages"]
+        row.modules.sort(key=lambda m: (m.sort_order, m.module_name))
+        rows.append(row)
+    return rows
+
+
+def _module_filter(module_id: Union[int, str]) -> dict:
+    if module_id == NO_MODULE:
+        return {"module__isnull": True}
+    return {"module_id": module_id}
+
+
+def worklist_items(
+    *,
+    wave: Wave,
+    module_id: Union[int, str, None] = None,
+    limit: int = WORKLIST_ITEM_LIMIT,
+) -> WorklistItems:
+    """
+    Unvollständige Seiten, Fragen und Variablen einer Befragtengruppe
+    (optional je Modul, NO_MODULE = Seiten ohne Modul).
+    """
+    page_links = WavePageWave.objects.filter(wave=wave, page__is_incomplete=True)
+    if module_id is not None:
+        page_links = page_links.filter(**_module_filter(module_id))
+
+    pages = tuple(
+        WavePage.objects
+        .filter(is_incomplete=True, id__in=page_links.values("page_id"))
+        .order_by("pagename", "id")
+        .only("id", "pagename")[:limit]
+    )
+
+    questions_qs = Question.objects.incomplete().filter(
+        Exists(WaveQuestion.objects.filter(wave=wave, question_id=OuterRef("pk")))
+    )
+    if module_id is not None:
+        questions_qs = questions_qs.filter(Exists(
+            WavePageQuestion.objects.filter(
+                question_id=OuterRef("pk"),
+                wave_page_id__in=WavePageWave.objects.filter(wave=wave, **_module_filter(module_id)).values("page_id"),
+            )
+        ))
+    questions = tuple(questions_qs.order_by("id").only("id", "questiontext")[:limit])
+
+    variables = ()
+    if module_id is None:
+        variables = tuple(
+            Variable.objects.incomplete()
+            .filter(Exists(QuestionVariableWave.objects.filter(wave=wave, variable_id=OuterRef("pk"))))
+            .order_by("varname")
+            .only("id", "varname", "varlab")[:limit]
+        )
+
+    return WorklistItems(pages=pages, questions=questions, variables=variables)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Wave
+from .services.lock_state import invalidate_locked_wave_ids
+
+
+# Gecachte Menge gesperrter Befragtengruppen verwerfen
+@receiver(post_save, sender=Wave)
+@receiver(post_delete, sender=Wave)
+def wave_changed(sender, **kwargs):
+    invalidate_locked_wave_ids()
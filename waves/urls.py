@@ -1,7 +1,7 @@
 #waves/urls.py
 
 from django.urls import path
-from .views import SurveyListView, SurveyDetailView, SurveyCreateView, SurveyUpdateView, WaveDocumentPdfView, WavePagesReorderApiView, WaveModulesManageView  
+from .views import SurveyListView, SurveyDetailView, SurveyCreateView, SurveyUpdateView, WaveDocumentPdfView, WavePagesReorderApiView, WaveModulesManageView, WorklistView
 
 app_name = "waves"
 
@@ -11,6 +11,7 @@ urlpatterns = [
     path("<int:pk>/edit/", SurveyUpdateView.as_view(), name="survey_edit"),
 
     path("documents/<int:pk>/pdf/", WaveDocumentPdfView.as_view(), name="wave_document_pdf"),
+    path("worklist/", WorklistView.as_view(), name="worklist"),
     path("<str:survey_name>/",SurveyDetailView.as_view(),name="survey_detail",),
 
 
@@ -16,6 +16,7 @@ from .models import Survey, Wave, WaveModule, WaveQuestion, WaveDocument
 from pages.models import WavePageQuestion, WavePage, WavePageWave
 
 from .forms import SurveyCreateForm, WaveFormSet
+from .services.worklist import NO_MODULE, build_worklist, worklist_items
 from pages.forms import WavePageCreateForm
 
 from django.core.exceptions import PermissionDenied
@@ -289,10 +290,7 @@ class SurveyDetailView(TemplateView):
             page_links_qs = (
                 WavePageWave.objects
                 .filter(wave_id__in=instrument_wave_ids)
-                .select_related("wave", "module")
-                .prefetch_related(
-                    Prefetch("page", queryset=WavePage.objects.with_completeness())
-                )
+                .select_related("wave", "module", "page")
                 .order_by(
                     "module__sort_order",
                     "module__name",
@@ -467,10 +465,7 @@ class SurveyDetailView(TemplateView):
         page_links_qs = (
             WavePageWave.objects
             .filter(wave=active_wave)
-            .select_related("module")  # module direkt
-            .prefetch_related(
-                Prefetch("page", queryset=WavePage.objects.with_completeness())
-            )
+            .select_related("module", "page")  # module und Seite (inkl. is_incomplete) direkt
             .order_by("sort_order", "page__pagename")
         )
 
@@ -912,3 +907,41 @@ class WaveModulesManageView(View):
 
         messages.success(request, "Module gespeichert.")
         return redirect(f"{reverse('waves:survey_detail', kwargs={'survey_name': wave.survey.name})}?wave={wave.id}")
+
+
+
+# Arbeitsliste: unvollständige Seiten, Fragen und Variablen je Befragtengruppe/Modul
+class WorklistView(EditorRequiredMixin, TemplateView):
+    template_name = "waves/worklist.html"
+
+    def _int_param(self, name):
+        try:
+            return int(self.request.GET.get(name) or "")
+        except ValueError:
+            return None
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+
+        survey_id = self._int_param("survey")
+        wave_id = self._int_param("wave")
+        module_id = NO_MODULE if self.request.GET.get("module") == NO_MODULE else self._int_param("module")
+
+        ctx["surveys"] = Survey.objects.order_by("-year", "name")
+        ctx["selected_survey_id"] = survey_id
+        ctx["rows"] = build_worklist(survey_id=survey_id)
+
+        active_wave = None
+        if wave_id is not None:
+            active_wave = get_object_or_404(Wave.objects.select_related("survey"), pk=wave_id)
+            ctx["items"] = worklist_items(wave=active_wave, module_id=module_id)
+            ctx["module_filtered"] = module_id is not None
+            if module_id == NO_MODULE:
+                ctx["active_module_name"] = "Ohne Modul"
+            elif module_id is not None:
+                module = WaveModule.objects.filter(pk=module_id, wave=active_wave).first()
+                ctx["active_module_name"] = module.name if module else ""
+
+        ctx["active_wave"] = active_wave
+        return ctx
+